@@ -1,16 +1,17 @@
 # ktune/ktune/cli/commands.py
 import os
 import json
-from datetime import datetime
+import re
+from datetime import datetime, timedelta
 import click
 import yaml
 from typing import Optional, Dict
-from ktune.config.validation import ConfigValidator
-from ktune.core.tune import Tune
-from ktune.core.sysid.testbed.pendulum import PendulumBench, PendulumConfig
-from ktune.core.utils import metrics
-from pykos import KOS
 import random
+from ktune.core.utils.constants import TELEMETRY_ADDRESS
+
+# The tuning, sysid and analysis modules pull in pykos, numpy, scipy and
+# matplotlib. Commands import them when they run, so that servo enable and
+# disable, catalog queries and --help start without that cost.
 @click.group()
 def cli():
     """KTune - Motor tuning and system identification toolkit"""
@@ -31,6 +32,9 @@ def create_mode_command(mode: str):
             f = click.option('--stream-delay', type=float, default=0.0, help='Simulation stream delay (seconds)')(f)
         elif mode == 'real':
             f = click.option('--real-ip', default="192.168.42.1", help='Real robot KOS IP address')(f)
+        elif mode == 'fleet':
+            f = click.option('--endpoints', required=True,
+                             help='Comma-separated KOS IP addresses of the robots to test')(f)
         elif mode == 'sim':
             f = click.option('--sim-ip', default="127.0.0.1", help='Simulator KOS IP address')(f)
             f = click.option('--sim-kp', type=float, default=20.0, help='Simulation proportional gain')(f)
@@ -61,6 +65,18 @@ def create_test_command(test_type: str):
             f = click.option('--chirp-init-freq', type=float, default=1.0, help='Initial frequency (Hz)')(f)
             f = click.option('--chirp-sweep-rate', type=float, default=0.5, help='Sweep rate (Hz/s)')(f)
             f = click.option('--chirp-duration', type=float, default=5.0, help='Duration (seconds)')(f)
+            f = click.option('--frf-segment', type=int,
+                             help='Welch segment length for the frequency response (samples, default 256)')(f)
+            f = click.option('--frf-overlap', type=float, default=0.5,
+                             help='Welch segment overlap (fraction of the segment)')(f)
+            f = click.option('--sweep-cycles', type=int, default=2,
+                             help='Chirp cycles per point of the streaming estimate')(f)
+            f = click.option('--sweep-max-gain', type=float,
+                             help='Stop the sweep when the gain exceeds this (dB), e.g. at a resonance')(f)
+            f = click.option('--sweep-min-gain', type=float,
+                             help='Stop the sweep when the gain falls below this (dB), e.g. -6')(f)
+            f = click.option('--sweep-max-lag', type=float,
+                             help='Stop the sweep when the phase lag exceeds this (degrees)')(f)
         elif test_type == 'sin_sin':
             f = click.option('--freq1', type=float, default=0.5, help='First sine frequency (Hz)')(f)
             f = click.option('--amp1', type=float, default=10.0, help='First sine amplitude (degrees)')(f)
@@ -85,6 +101,9 @@ def add_common_options(command):
         click.option('--config', type=click.Path(exists=True), help='Path to config file'),
         click.option('--name', default="NoName", help='Name for plot titles'),
         click.option('--actuator-id', type=int, default=11, help='Actuator ID to test'),
+        click.option('--actuator-ids', help='Comma delimited list of actuator IDs to test together'),
+        click.option('--joint-override', multiple=True,
+                    help='Per-joint override, e.g. 12:amp=5,phase=90,kp=30 (repeatable)'),
         click.option('--start-pos', type=float, default=0.0, help='Start position (degrees)'),
         click.option('--kp', type=float, default=20.0, help='Proportional gain'),
         click.option('--kd', type=float, default=5.0, help='Derivative gain'),
@@ -96,6 +115,39 @@ def add_common_options(command):
         click.option('--log-duration-pad', type=float, default=2.0,
                     help='Pad (seconds) after motion ends to keep logging'),
         click.option('--sample-rate', type=float, default=50.0, help='Data collection rate (Hz)'),
+        click.option('--pipeline', is_flag=True,
+                    help='Run command writer and state sampler as separate tasks per system'),
+        click.option('--state-rate', type=float,
+                    help='State sampling rate (Hz) in pipeline mode (default: sample rate)'),
+        click.option('--realtime', is_flag=True,
+                    help='Low-jitter mode: no GC pauses and spin before deadlines during the test'),
+        click.option('--realtime-cpu', type=int, help='CPU to pin the process to in realtime mode'),
+        click.option('--realtime-priority', type=int,
+                    help='SCHED_FIFO priority (1-99) in realtime mode, needs privileges'),
+        click.option('--rpc-deadline', is_flag=True,
+                    help='Cancel RPCs that do not complete before the next tick deadline'),
+        click.option('--stale-policy', type=click.Choice(['reuse', 'gap', 'abort']), default='reuse',
+                    help='Missed state reads: repeat last sample, record a gap, or abort'),
+        click.option('--max-misses', type=int, default=3,
+                    help='Consecutive missed reads before aborting (abort policy)'),
+        click.option('--record-dtype', type=click.Choice(['float64', 'float32']), default='float64',
+                    help='Storage type of recorded values (float32 halves memory on long runs)'),
+        click.option('--log-format', type=click.Choice(['json', 'binary']), default='json',
+                    help='Data file format; binary logs load as memory-mapped columns'),
+        click.option('--journal', is_flag=True,
+                    help='Stream samples to a crash-safe journal file during the test'),
+        click.option('--journal-chunk', type=int, default=256,
+                    help='Samples per journal chunk (bounds memory use during the test)'),
+        click.option('--plots', type=click.Choice(['deferred', 'inline', 'none']), default='deferred',
+                    help='Render plots in background worker processes, before continuing, or not at all'),
+        click.option('--live', is_flag=True,
+                    help='Show a live tracking error readout during the test'),
+        click.option('--tracking-cycle', type=float,
+                    help='Cycle length (seconds) of the streaming tracking metrics (default: test period)'),
+        click.option('--abort-error', type=float,
+                    help='Stop the test when the RMS position error of a cycle exceeds this (degrees)'),
+        click.option('--telemetry', is_flag=False, flag_value=TELEMETRY_ADDRESS,
+                    help=f'Publish samples to a `ktune watch` viewer (default address: {TELEMETRY_ADDRESS})'),
         click.option('--enable-servos', help='Comma delimited list of servo IDs to enable'),
         click.option('--disable-servos', help='Comma delimited list of servo IDs to disable')
     ]
@@ -103,6 +155,21 @@ def add_common_options(command):
         command = option(command)
     return command
 
+def _parse_joint_overrides(values):
+    """Parse repeated ID:key=value,key=value joint override options"""
+    overrides = {}
+    for value in values:
+        try:
+            actuator_id, params = value.split(':', 1)
+            overrides[int(actuator_id)] = {
+                key.strip(): float(val)
+                for key, val in (param.split('=') for param in params.split(','))
+            }
+        except ValueError:
+            click.echo(f"Invalid joint override '{value}', expected ID:key=value,...", err=True)
+            raise click.Abort()
+    return overrides
+
 def _handle_common_setup(ctx, kwargs, mode):
     """Common setup for all modes"""
     ctx.ensure_object(dict)
@@ -117,6 +184,17 @@ def _handle_common_setup(ctx, kwargs, mode):
             click.echo(f"Error loading config file: {e}", err=True)
             raise click.Abort()
 
+    # Process actuator lists
+    if kwargs.get('actuator_ids'):
+        kwargs['actuator_ids'] = [int(x.strip()) for x in kwargs['actuator_ids'].split(',')]
+    if kwargs.get('joint_override'):
+        kwargs['joint_overrides'] = _parse_joint_overrides(kwargs['joint_override'])
+    kwargs.pop('joint_override', None)
+
+    # Process fleet endpoints
+    if kwargs.get('endpoints'):
+        kwargs['endpoints'] = [x.strip() for x in kwargs['endpoints'].split(',') if x.strip()]
+
     # Process servo lists
     if kwargs.get('enable_servos'):
         kwargs['enable_servos'] = [int(x.strip()) for x in kwargs['enable_servos'].split(',')]
@@ -203,6 +281,17 @@ def sim():
     - chirp: Run frequency sweep tests"""
     pass
 
+@cli.group()
+def fleet():
+    """Run the same test concurrently on several real robots.
+    
+    Available tests:
+    - sine: Run sinusoidal motion tests
+    - step: Run step response tests
+    - chirp: Run frequency sweep tests
+    - sin_sin: Run dual sinusoid tests"""
+    pass
+
 @real.command(name='sin_sin')
 @create_mode_command('real')
 @create_test_command('sin_sin')
@@ -372,6 +461,66 @@ def compare_chirp(ctx, **kwargs):
     --chirp-duration: Test duration in seconds"""
     handle_test(ctx, kwargs, 'compare', 'chirp')
 
+# Fleet mode commands
+@fleet.command(name='sine')
+@create_mode_command('fleet')
+@create_test_command('sine')
+@click.pass_context
+def fleet_sine(ctx, **kwargs):
+    """Run sine wave test on every robot of a fleet.
+    
+    Parameters:
+    --endpoints: Comma-separated KOS IP addresses
+    --freq: Sine frequency in Hz
+    --amp: Sine amplitude in degrees
+    --duration: Test duration in seconds"""
+    handle_test(ctx, kwargs, 'fleet', 'sine')
+
+@fleet.command(name='step')
+@create_mode_command('fleet')
+@create_test_command('step')
+@click.pass_context
+def fleet_step(ctx, **kwargs):
+    """Run step response test on every robot of a fleet.
+    
+    Parameters:
+    --endpoints: Comma-separated KOS IP addresses
+    --step-size: Size of step in degrees
+    --step-hold-time: Hold time at each step in seconds
+    --step-count: Number of steps to perform"""
+    handle_test(ctx, kwargs, 'fleet', 'step')
+
+@fleet.command(name='chirp')
+@create_mode_command('fleet')
+@create_test_command('chirp')
+@click.pass_context
+def fleet_chirp(ctx, **kwargs):
+    """Run chirp (frequency sweep) test on every robot of a fleet.
+    
+    Parameters:
+    --endpoints: Comma-separated KOS IP addresses
+    --chirp-amp: Amplitude in degrees
+    --chirp-init-freq: Initial frequency in Hz
+    --chirp-sweep-rate: Rate of frequency increase in Hz/s
+    --chirp-duration: Test duration in seconds"""
+    handle_test(ctx, kwargs, 'fleet', 'chirp')
+
+@fleet.command(name='sin_sin')
+@create_mode_command('fleet')
+@create_test_command('sin_sin')
+@click.pass_context
+def fleet_sin_sin(ctx, **kwargs):
+    """Run sin_sin test on every robot of a fleet.
+    
+    Parameters:
+    --endpoints: Comma-separated KOS IP addresses
+    --freq1: First sine frequency in Hz
+    --amp1: First sine amplitude in degrees
+    --freq2: Second sine frequency in Hz
+    --amp2: Second sine amplitude in degrees
+    --duration: Test duration in seconds"""
+    handle_test(ctx, kwargs, 'fleet', 'sin_sin')
+
 # ... existing code ...
 
 for mode_group in [compare, real, sim]:
@@ -395,6 +544,11 @@ for mode_group in [compare, real, sim]:
 
 def _validate_and_run(config: Dict):
     """Helper function to validate config and run tune"""
+    from ktune.config.validation import ConfigValidator
+    from ktune.core.fleet import Fleet
+    from ktune.core.tune import Tune
+    from ktune.core.utils import catalog, plotting
+
     validator = ConfigValidator()
     try:
         # Apply defaults to missing values
@@ -405,6 +559,15 @@ def _validate_and_run(config: Dict):
     except ValueError as e:
         click.echo(f"Configuration error: {e}", err=True)
         raise click.Abort()
+    # Saved runs are indexed in the run catalog
+    config['tune']['catalog'] = catalog.DEFAULT_PATH
+
+    # Run the same test on every robot of a fleet
+    endpoints = config['tune'].pop('endpoints', None)
+    if endpoints:
+        Fleet(config, endpoints).run_test(config['tune'].get('test'))
+        plotting.wait_all()
+        return
 
     # Initialize and run tuner
     ktune = Tune(config)
@@ -414,6 +577,248 @@ def _validate_and_run(config: Dict):
         ktune.run_test(None)  # This will just do the setup and servo operations
     else:
         ktune.run_test(config['tune'].get('test'))
+    # Deferred plots finish rendering in worker processes
+    plotting.wait_all()
+
+@cli.command()
+@click.argument('journal_file', type=click.Path(exists=True))
+def recover(journal_file):
+    """Recover the data of an interrupted test from its journal file.
+
+    Every complete chunk is kept, and the data is saved and plotted like
+    the results of a finished test."""
+    from ktune.core.tune import Tune
+    from ktune.core.utils import catalog, plotting
+
+    try:
+        tune = Tune.from_journal(journal_file)
+    except ValueError as e:
+        click.echo(f"Error reading journal: {e}", err=True)
+        raise click.Abort()
+    tune.config.no_log = False
+    tune.config.catalog = catalog.DEFAULT_PATH
+    tune.save_and_plot_results()
+    plotting.wait_all()
+
+@cli.command()
+@click.argument('json_files', nargs=-1, type=click.Path(exists=True), required=True)
+@click.option('--output-dir', type=click.Path(file_okay=False),
+              help='Directory for the binary logs (default: next to each JSON file)')
+def convert(json_files, output_dir):
+    """Convert JSON data/sysid logs to the binary log format."""
+    from ktune.core.utils import binlog
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    for json_file in json_files:
+        output = None
+        if output_dir:
+            name = os.path.splitext(os.path.basename(json_file))[0] + binlog.EXTENSION
+            output = os.path.join(output_dir, name)
+        try:
+            output = binlog.convert(json_file, output)
+        except (ValueError, OSError) as e:
+            click.echo(f"Skipping {json_file}: {e}", err=True)
+            continue
+        click.echo(f"{json_file} -> {output}")
+
+@cli.command()
+@click.argument('patterns', nargs=-1, required=True)
+@click.option('--output', type=click.Path(file_okay=False),
+              help='Fresh output directory (default: analysis_<timestamp>)')
+@click.option('--workers', type=int, help='Worker processes (default: number of CPUs)')
+@click.option('--no-plots', is_flag=True, help='Only recompute metrics, skip plots')
+def analyze(patterns, output, workers, no_plots):
+    """Recompute metrics and plots of saved runs.
+
+    Takes log files or glob patterns (e.g. 'data/**/*.json' 'logs/*.ktlog'),
+    reanalyzes them in parallel and writes the results to a new directory."""
+    from ktune.core import analyze as reanalysis
+
+    paths = reanalysis.expand_paths(patterns)
+    if not paths:
+        click.echo("No logs match the given patterns", err=True)
+        raise click.Abort()
+    output = output or f"analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    if os.path.isdir(output) and os.listdir(output):
+        click.echo(f"Output directory {output} is not empty", err=True)
+        raise click.Abort()
+    os.makedirs(output, exist_ok=True)
+
+    click.echo(f"Analyzing {len(paths)} logs into {output}")
+    report = reanalysis.analyze(paths, output, workers=workers, plots=not no_plots)
+    click.echo(f"Done: {report['ok']} ok, {report['skipped']} skipped, {report['failed']} failed "
+               f"({report['workers']} workers), see {os.path.join(output, 'analysis.json')}")
+
+@cli.command()
+@click.argument('patterns', nargs=-1, required=True)
+@click.option('--segment', type=int, help='Welch segment length in samples (default 256)')
+@click.option('--overlap', type=float, default=0.5, show_default=True,
+              help='Welch segment overlap (fraction of the segment)')
+@click.option('--output', type=click.Path(dir_okay=False),
+              help='JSON file for the responses (default: frf_<timestamp>.json)')
+def frf(patterns, segment, overlap, output):
+    """Frequency response of a campaign of chirp runs.
+
+    Takes chirp logs or glob patterns and estimates H1, H2 and coherence
+    of every run and their average over all repetitions, per system, in
+    one batched pass. Runs of a system must share the sample rate."""
+    from ktune.core import analyze as reanalysis
+
+    paths = reanalysis.expand_paths(patterns)
+    if not paths:
+        click.echo("No logs match the given patterns", err=True)
+        raise click.Abort()
+    try:
+        report = reanalysis.frf_campaign(paths, segment, overlap)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    output = output or f"frf_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, "w") as f:
+        json.dump(report, f)
+
+    click.echo(f"{len(report['runs'])} chirp runs of {len(paths)} logs, "
+               f"{len(report['skipped'])} skipped")
+    for system in ("sim", "real"):
+        if system in report["systems"]:
+            result = report["systems"][system]
+            bandwidth = result["bandwidth"]
+            bandwidth = f"{bandwidth:.1f} Hz" if bandwidth else "-"
+            click.echo(f"{system}: {result['runs']} runs, {result['segments']} segments, "
+                       f"bandwidth (-3dB) {bandwidth}")
+    click.echo(f"Saved to {output}")
+
+@cli.command()
+@click.option('--address', default=TELEMETRY_ADDRESS, show_default=True,
+              help='Address to listen on: host:port (UDP) or a Unix socket path')
+@click.option('--window', type=float, default=10.0, show_default=True,
+              help='Seconds of history to show')
+@click.option('--fps', type=float, default=30.0, show_default=True, help='Frame rate limit')
+def watch(address, window, fps):
+    """Watch a running test live.
+
+    Start tests or sysid experiments with --telemetry to publish their
+    samples; this viewer plots rolling position, velocity and tracking error
+    traces in its own process, so watching does not affect the run."""
+    import matplotlib
+    if matplotlib.get_backend().lower() == "agg":
+        click.echo("ktune watch needs a display; no interactive matplotlib backend is available",
+                   err=True)
+        raise click.Abort()
+    from ktune.core.watch import TelemetryViewer
+
+    try:
+        viewer = TelemetryViewer(address, window=window, fps=fps)
+    except (OSError, ValueError) as e:
+        click.echo(f"Cannot listen on {address}: {e}", err=True)
+        raise click.Abort()
+    click.echo(f"Listening for telemetry on {address}, close the window to stop")
+    try:
+        viewer.run()
+    except KeyboardInterrupt:
+        pass
+
+@cli.group()
+def runs():
+    """Find saved runs through the run catalog"""
+    pass
+
+def _parse_where(expression):
+    """Parse a 'field<op>value' filter, e.g. 'kp>=20' or 'robot_name like %zbot%'."""
+    match = re.match(r"^\s*(\w+)\s*(<=|>=|!=|=|<|>|\s+like\s+)\s*(.+?)\s*$", expression)
+    if not match:
+        click.echo(f"Invalid filter '{expression}', expected FIELD<op>VALUE", err=True)
+        raise click.Abort()
+    field, operator, value = match.groups()
+    try:
+        value = float(value)
+    except ValueError:
+        pass
+    return field, operator.strip().lower(), value
+
+def _parse_since(value):
+    """Start of a --since window: an ISO date or a number of days ('30d')."""
+    match = re.fullmatch(r"(\d+)d", value)
+    if match:
+        start = datetime.now() - timedelta(days=int(match.group(1)))
+        return start.strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        return datetime.fromisoformat(value).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        click.echo(f"Invalid --since '{value}', expected YYYY-MM-DD or a number of days like 30d",
+                   err=True)
+        raise click.Abort()
+
+@runs.command(name='query')
+@click.option('--catalog', 'catalog_path', help='Catalog file (default: data/catalog.sqlite)')
+@click.option('--test', 'test_type', help='Test type (sine, step, chirp, sin_sin, sysid)')
+@click.option('--actuator-id', type=int, help='Actuator ID')
+@click.option('--robot', help='Robot name')
+@click.option('--trajectory', help='SysID trajectory')
+@click.option('--since', help='Only runs since a date (YYYY-MM-DD) or for the last N days (30d)')
+@click.option('--where', multiple=True,
+              help="Filter on any catalog field, e.g. 'kp>=20' or 'real_pos_rms<0.5'")
+@click.option('--sort', default='timestamp', help='Field to sort by')
+@click.option('--asc', is_flag=True, help='Sort in ascending order')
+@click.option('--limit', type=int, default=50, help='Maximum number of runs')
+@click.option('--paths', is_flag=True, help='Only print the file paths')
+def runs_query(catalog_path, test_type, actuator_id, robot, trajectory, since, where, sort,
+               asc, limit, paths):
+    """Query the run catalog.
+
+    Example: ktune runs query --test chirp --actuator-id 33 --where 'kp>=20' --since 30d"""
+    from ktune.core.utils import catalog
+
+    catalog_path = catalog_path or catalog.DEFAULT_PATH
+    filters = [_parse_where(expression) for expression in where]
+    for field, value in (('test_type', test_type), ('actuator_id', actuator_id),
+                         ('robot_name', robot), ('trajectory', trajectory)):
+        if value is not None:
+            filters.append((field, '=', value))
+    if since:
+        filters.append(('timestamp', '>=', _parse_since(since)))
+
+    try:
+        with catalog.Catalog(catalog_path) as run_catalog:
+            rows = run_catalog.query(filters, order_by=sort, descending=not asc, limit=limit)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+
+    if paths:
+        for row in rows:
+            click.echo(row['path'])
+        return
+
+    def number(value, fmt):
+        return format(value, fmt) if value is not None else '-'
+
+    click.echo(f"{'Timestamp':<20} {'Test':<14} {'ID':>3} {'Robot':<16} {'Kp':>6} {'Kd':>6} "
+               f"{'Real RMS':>9} {'Sim RMS':>8}  File")
+    for row in rows:
+        test = row['trajectory'] if row['kind'] == 'sysid' else row['test_type']
+        click.echo(f"{row['timestamp']:<20} {test or '-':<14.14} "
+                   f"{number(row['actuator_id'], 'd'):>3} {row['robot_name'] or '-':<16.16} "
+                   f"{number(row['kp'], '.1f'):>6} {number(row['kd'], '.1f'):>6} "
+                   f"{number(row['real_pos_rms'], '.3f'):>9} {number(row['sim_pos_rms'], '.3f'):>8}  "
+                   f"{os.path.relpath(row['path'])}")
+    click.echo(f"{len(rows)} runs")
+
+@runs.command(name='rebuild')
+@click.argument('directories', nargs=-1, type=click.Path(file_okay=False))
+@click.option('--catalog', 'catalog_path', help='Catalog file (default: data/catalog.sqlite)')
+def runs_rebuild(directories, catalog_path):
+    """Rescan log directories into the run catalog (default: data/ and logs/)."""
+    from ktune.core.utils import catalog
+
+    catalog_path = catalog_path or catalog.DEFAULT_PATH
+    with catalog.Catalog(catalog_path) as run_catalog:
+        counts = run_catalog.rebuild(directories or catalog.DEFAULT_DIRS)
+        total = len(run_catalog)
+    click.echo(f"Added {counts['added']}, unchanged {counts['unchanged']}, "
+               f"skipped {counts['skipped']}, removed {counts['removed']} "
+               f"({total} runs in {catalog_path})")
 
 @cli.command()
 def version():
@@ -446,6 +851,19 @@ def sysid():
 # Test configuration
 @click.option('--trajectory', type=str, help='Trajectory type: lift_and_drop, sin_time_square, up_and_down, sin_sin, brutal, nothing')
 @click.option('--sample-rate', type=float, default=50.0, help='Data collection rate (Hz)')
+@click.option('--realtime', is_flag=True,
+              help='Low-jitter mode: no GC pauses and spin before deadlines during the experiment')
+@click.option('--realtime-cpu', type=int, help='CPU to pin the process to in realtime mode')
+@click.option('--realtime-priority', type=int,
+              help='SCHED_FIFO priority (1-99) in realtime mode, needs privileges')
+@click.option('--record-dtype', type=click.Choice(['float64', 'float32']),
+              help='Storage type of recorded values (float32 halves memory on long runs)')
+@click.option('--log-format', type=click.Choice(['json', 'binary']),
+              help='Log file format; binary logs load as memory-mapped columns')
+@click.option('--plots', type=click.Choice(['deferred', 'inline', 'none']),
+              help='Render plots in background worker processes (default), before the next experiment, or not at all')
+@click.option('--telemetry', is_flag=False, flag_value=TELEMETRY_ADDRESS,
+              help=f'Publish samples to a `ktune watch` viewer (default address: {TELEMETRY_ADDRESS})')
 @click.pass_context
 def pendulum(ctx, **kwargs):
     """Run pendulum system identification experiment"""
@@ -504,8 +922,16 @@ def pendulum(ctx, **kwargs):
         # Validate and run single test
         _validate_and_run_sysid(cfg)
 
+    # Deferred plots of all experiments render while the next one runs
+    from ktune.core.utils import plotting
+    plotting.wait_all()
+
 def _validate_and_run_sysid(config: Dict):
     """Helper function to validate config and run sysid experiment"""
+    from pykos import KOS
+    from ktune.core.sysid.testbed.pendulum import PendulumBench, PendulumConfig
+    from ktune.core.utils import binlog, catalog
+
     try:
         cfg = config['sysid']
 
@@ -523,7 +949,13 @@ def _validate_and_run_sysid(config: Dict):
             acceleration=0.0,  # Fixed for pendulum experiments
             sample_rate=cfg.get('sample_rate', 50.0),
             vin=cfg.get('vin', 15.0),
-            offset=cfg.get('offset', 0.0)
+            offset=cfg.get('offset', 0.0),
+            realtime=cfg.get('realtime', False),
+            realtime_cpu=cfg.get('realtime_cpu'),
+            realtime_priority=cfg.get('realtime_priority'),
+            record_dtype=cfg.get('record_dtype', 'float64'),
+            plots=cfg.get('plots', 'deferred'),
+            telemetry=cfg.get('telemetry')
         )
 
         # Initialize bench
@@ -542,10 +974,17 @@ def _validate_and_run_sysid(config: Dict):
         # Save data
         os.makedirs('logs', exist_ok=True)
         timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
-        filename = f"logs/sysid_{cfg['motor_name']}_{cfg['trajectory']}_{timestamp}.json"
-        
-        with open(filename, 'w') as f:
-            json.dump(data, f)
+        filename = f"logs/sysid_{cfg['motor_name']}_{cfg['trajectory']}_{timestamp}"
+
+        if cfg.get('log_format') == 'binary':
+            # Binary logs store the recorded sample columns as they are
+            filename = binlog.save(filename + binlog.EXTENSION, data)
+        else:
+            filename += ".json"
+            with open(filename, 'w') as f:
+                json.dump(PendulumBench.to_log(data), f)
+        catalog.record(filename, {key: value for key, value in data.items() if key != 'samples'},
+                       catalog.DEFAULT_PATH)
             
         click.echo(f"Data saved to {filename}")
 
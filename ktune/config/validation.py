@@ -1,14 +1,60 @@
 # ktune/config/validation.py
+import copy
 import json
 import jsonschema
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+SCHEMA_DIR = Path(__file__).parent / "schemas"
+
+
+@lru_cache(maxsize=None)
+def _schemas() -> Dict[str, Dict]:
+    """All JSON schemas of the schemas directory, read once per process"""
+    schemas = {}
+    for schema_file in SCHEMA_DIR.glob("*.json"):
+        with open(schema_file) as f:
+            schemas[schema_file.stem] = json.load(f)
+    return schemas
+
+
+@lru_cache(maxsize=None)
+def _validator(schema_name: str):
+    """Compiled validator of a schema, checked once and reused"""
+    schema = _schemas()[schema_name]
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+def _defaults_plan(schema: Dict) -> tuple:
+    """Defaults of a schema as (property, default, nested plan) entries"""
+    plan = []
+    for prop, details in schema.get('properties', {}).items():
+        nested = None
+        if details.get('type') == 'object' and 'properties' in details:
+            nested = _defaults_plan(details)
+        if 'default' in details or nested:
+            plan.append((prop, details.get('default'), 'default' in details, nested))
+    return tuple(plan)
+
+
+@lru_cache(maxsize=None)
+def _defaults(schema_name: str) -> tuple:
+    """Precomputed defaults plan of a schema"""
+    return _defaults_plan(_schemas()[schema_name])
+
+
 class ConfigValidator:
-    """Validates KTune configuration files against JSON schemas"""
+    """Validates KTune configuration files against JSON schemas
+
+    Schemas are read, checked and compiled once per process and shared by
+    every validator, so creating one per config costs nothing.
+    """
     
     def __init__(self):
         self.schemas = {}
@@ -16,20 +62,17 @@ class ConfigValidator:
 
     def _load_schemas(self) -> None:
         """Load all JSON schemas from the schemas directory"""
-        schema_dir = Path(__file__).parent / "schemas"
-        for schema_file in schema_dir.glob("*.json"):
-            with open(schema_file) as f:
-                self.schemas[schema_file.stem] = json.load(f)
+        self.schemas = _schemas()
 
     def validate(self, config: Dict[str, Any], schema_name: str) -> None:
         """Validate a configuration section against its schema"""
         if schema_name not in self.schemas:
             raise ValueError(f"Unknown schema: {schema_name}")
         
-        try:
-            jsonschema.validate(config, self.schemas[schema_name])
-        except jsonschema.exceptions.ValidationError as e:
-            raise ValueError(f"Configuration validation failed for {schema_name}: {str(e)}")
+        # Same error as jsonschema.validate(), without re-checking the schema
+        error = jsonschema.exceptions.best_match(_validator(schema_name).iter_errors(config))
+        if error is not None:
+            raise ValueError(f"Configuration validation failed for {schema_name}: {str(error)}")
 
     def validate_all(self, config: Dict[str, Any]) -> None:
         """Validate all sections of a configuration"""
@@ -97,24 +140,21 @@ class ConfigValidator:
             if section in result:
                 result[section] = self._apply_schema_defaults(
                     result[section],
-                    self.schemas[section]
+                    _defaults(section)
                 )
         
         return result
 
-    def _apply_schema_defaults(self, config: Dict, schema: Dict) -> Dict:
-        """Recursively apply defaults from schema to configuration"""
+    def _apply_schema_defaults(self, config: Dict, plan: tuple) -> Dict:
+        """Recursively apply a precomputed defaults plan to configuration"""
         result = config.copy()
         
-        if 'properties' in schema:
-            for prop, details in schema['properties'].items():
-                if prop not in result and 'default' in details:
-                    result[prop] = details['default']
-                elif (prop in result and details.get('type') == 'object' 
-                      and 'properties' in details):
-                    result[prop] = self._apply_schema_defaults(
-                        result[prop],
-                        details
-                    )
+        for prop, default, has_default, nested in plan:
+            if prop not in result:
+                if has_default:
+                    # Copy mutable defaults so configs never share them with the cached schema
+                    result[prop] = copy.deepcopy(default) if isinstance(default, (dict, list)) else default
+            elif nested and isinstance(result[prop], dict):
+                result[prop] = self._apply_schema_defaults(result[prop], nested)
                     
-        return result
\ No newline at end of file
+        return result
@@ -0,0 +1,291 @@
+# ktune/core/analyze.py
+import contextlib
+import glob
+import io
+import json
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+from ktune.core.config import TuneConfig
+from ktune.core.utils import binlog, catalog, frf, metrics, plotting
+from ktune.core.utils.datalog import DataLog
+from ktune.core.utils.plots import Plot, PendulumPlot
+from ktune.core.utils.waveforms import Waveform
+
+# Header field -> TuneConfig field, for the test parameters DataLog saves
+_HEADER_FIELDS = {
+    "test_type": "test",
+    "mode": "mode",
+    "actuator_id": "actuator_id",
+    "robot_name": "name",
+    "start_position": "start_pos",
+    "sample_rate": "sample_rate",
+    "acceleration": "acceleration",
+    "max_torque": "max_torque",
+    "log_duration_pad": "log_duration_pad",
+    "actuator_ids": "actuator_ids",
+    "joint_overrides": "joint_overrides",
+    "step_size": "step_size",
+    "step_hold_time": "step_hold_time",
+    "step_count": "step_count",
+}
+# Test-specific header fields whose config name depends on the test
+_TEST_FIELDS = {
+    "chirp": {"initial_frequency": "chirp_init_freq", "sweep_rate": "chirp_sweep_rate",
+              "amplitude": "chirp_amp", "duration": "chirp_duration",
+              "frf_segment": "frf_segment", "frf_overlap": "frf_overlap"},
+    "sine": {"frequency": "freq", "amplitude": "amp", "duration": "duration"},
+}
+
+
+def config_from_header(header: Dict) -> TuneConfig:
+    """Rebuild the test configuration of a saved run from its header."""
+    fields = {config_name: header[name] for name, config_name in _HEADER_FIELDS.items()
+              if name in header}
+    for name, config_name in _TEST_FIELDS.get(header.get("test_type"), {}).items():
+        if name in header:
+            fields[config_name] = header[name]
+    gains = header.get("gains", {})
+    real, sim = gains.get("real", {}), gains.get("sim", {})
+    fields.update({
+        "kp": real.get("kp", TuneConfig.kp),
+        "kd": real.get("kd", TuneConfig.kd),
+        "ki": real.get("ki", TuneConfig.ki),
+        "sim_kp": sim.get("kp", TuneConfig.sim_kp),
+        "sim_kd": sim.get("Kd", sim.get("kd", TuneConfig.sim_kd)),
+        "torque_off": not header.get("torque_enabled", True),
+    })
+    return TuneConfig(**fields)
+
+
+def _reference_waveforms(columns: Dict, actuator_ids: List[int]) -> Dict:
+    """Command Waveform per actuator from the saved reference columns."""
+    time = np.asarray(columns["time"])
+    waveforms = {}
+    for index, aid in enumerate(actuator_ids):
+        suffix = "" if index == 0 else f"_{aid}"
+        waveforms[aid] = Waveform(time=time,
+                                  position=np.asarray(columns[f"position{suffix}"]),
+                                  velocity=np.asarray(columns[f"velocity{suffix}"]))
+    return waveforms
+
+
+def load_log(path: str) -> Dict:
+    """Load a JSON or binary run log."""
+    if path.endswith(binlog.EXTENSION):
+        return binlog.load(path)
+    with open(path) as f:
+        return json.load(f)
+
+
+def _analyze_tune_run(path: str, log: Dict, data_dir: str, plot_dir: Optional[str]) -> str:
+    """Recompute the metrics, frequency response and plots of a tune run."""
+    config = config_from_header(log)
+    config.log_format = "binary" if path.endswith(binlog.EXTENSION) else "json"
+    sim_data = dict(log["sim_data"]) if config.mode in ['compare', 'sim'] else None
+    real_data = dict(log["real_data"]) if config.mode in ['compare', 'real'] else None
+
+    # Frequency response is recomputed from the samples, not copied
+    if config.test == "chirp":
+        for data in (sim_data, real_data):
+            if data:
+                data.pop("freq_response", None)
+                data["freq_response"] = metrics.system_frequency_response(
+                    data, config.frf_segment, config.frf_overlap)
+
+    actuator_ids = log.get("actuator_ids") or [config.actuator_id]
+    reference = None
+    if "reference" in log:
+        reference = _reference_waveforms(log["reference"], actuator_ids)
+
+    timestamp = log.get("timestamp") or datetime.now().strftime("%Y%m%d_%H%M%S")
+    logger = DataLog(config, sim_data, real_data, timing=log.get("timing"),
+                     latency=log.get("latency"), loop_latency=log.get("loop_latency"),
+                     reference=reference, actuator_ids=actuator_ids,
+                     joint_overrides=log.get("joint_overrides"), catalog_path=None,
+                     online_tracking=log.get("online_tracking"), aborted=log.get("aborted"))
+    logger.save_data(timestamp, data_dir)
+    output = logger.path
+
+    if plot_dir is not None:
+        # The plots reuse the metrics DataLog computed
+        plotter = Plot(config, sim_data or {}, real_data or {}, logger.analysis)
+        plotter.create_plots(timestamp, plot_dir)
+    return output
+
+
+def _analyze_sysid_run(path: str, log: Dict, data_dir: str, plot_dir: Optional[str]) -> str:
+    """Recompute the data quality analysis and plots of a sysid log."""
+    log["analysis"] = metrics.analyze_sysid_data(log)
+    output = os.path.join(data_dir, os.path.basename(path))
+    if path.endswith(binlog.EXTENSION):
+        binlog.save(output, log)
+    else:
+        with open(output, "w") as f:
+            json.dump(log, f)
+
+    if plot_dir is not None:
+        name = os.path.splitext(os.path.basename(path))[0]
+        PendulumPlot(log).create_plots(plot_dir, timestamp=name)
+    return output
+
+
+def analyze_run(path: str, data_dir: str, plot_dir: Optional[str] = None) -> Dict:
+    """Reanalyze one saved run. Runs in a worker process.
+
+    Args:
+        path (str): JSON or binary log of a tune run or sysid experiment
+        data_dir (str): Directory for the reanalyzed log
+        plot_dir (str, optional): Directory for the plots; None skips plotting
+
+    Returns:
+        dict: 'path', 'status' ('ok', 'skipped' or 'failed'), and the
+            'output' file or the 'error'
+    """
+    result = {"path": path}
+    # The analysis functions report progress on stdout; keep workers quiet
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            log = load_log(path)
+            if not isinstance(log, dict) or not ("gains" in log or "trajectory" in log):
+                result["status"] = "skipped"
+                return result
+            os.makedirs(data_dir, exist_ok=True)
+            if plot_dir is not None:
+                os.makedirs(plot_dir, exist_ok=True)
+            analyze = _analyze_tune_run if "gains" in log else _analyze_sysid_run
+            result["output"] = analyze(path, log, data_dir, plot_dir)
+            result["status"] = "ok"
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = f"{type(e).__name__}: {e}"
+            result["traceback"] = traceback.format_exc()
+    return result
+
+
+def expand_paths(patterns: List[str]) -> List[str]:
+    """Log files matching glob patterns (** recurses), in sorted order."""
+    paths = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) or ([pattern] if os.path.isfile(pattern) else [])
+        paths.update(os.path.abspath(p) for p in matches
+                     if os.path.isfile(p) and p.endswith((".json", binlog.EXTENSION)))
+    return sorted(paths)
+
+
+def analyze(paths: List[str], output_dir: str, workers: Optional[int] = None,
+            plots: bool = True) -> Dict:
+    """Reanalyze saved runs across a process pool.
+
+    Results mirror the input layout: logs go to output_dir/<dir>/ and plots
+    to output_dir/plots/<dir>/, where <dir> is each input's directory
+    relative to the common directory of all inputs. The output is indexed
+    in output_dir/catalog.sqlite and summarized in output_dir/analysis.json.
+
+    Args:
+        paths (list): Log files
+        output_dir (str): Fresh output directory
+        workers (int, optional): Worker processes, defaults to the CPU count
+        plots (bool): Regenerate plots
+
+    Returns:
+        dict: Counts per status and the per-run results
+    """
+    paths = [os.path.abspath(p) for p in paths]
+    if not paths:
+        raise ValueError("No logs to analyze")
+    root = os.path.commonpath([os.path.dirname(p) for p in paths])
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=plotting.init_worker) as executor:
+        futures = {}
+        for path in paths:
+            relative = os.path.relpath(os.path.dirname(path), root)
+            data_dir = os.path.normpath(os.path.join(output_dir, relative))
+            plot_dir = os.path.normpath(os.path.join(output_dir, "plots", relative)) if plots else None
+            futures[executor.submit(analyze_run, path, data_dir, plot_dir)] = path
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results.append(result)
+            message = result.get("error", result["status"])
+            print(f"[{done}/{len(paths)}] {os.path.relpath(result['path'])}: {message}")
+
+    results.sort(key=lambda r: r["path"])
+    summary = {status: sum(1 for r in results if r["status"] == status)
+               for status in ("ok", "skipped", "failed")}
+    report = {"inputs": len(paths), "workers": workers, **summary, "runs": results}
+    with open(os.path.join(output_dir, "analysis.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    with catalog.Catalog(os.path.join(output_dir, "catalog.sqlite")) as run_catalog:
+        run_catalog.rebuild([output_dir])
+    return report
+
+
+def _chirp_run(data: Dict):
+    """(cmd_time, cmd_pos, outputs) of a system's chirp data for frf.campaign_frf."""
+    data = metrics.valid_samples(data)
+    if not data or "cmd_time" not in data or "position" not in data:
+        return None
+    outputs = {name: metrics.resample(data["time"], data[name], data["cmd_time"])
+               for name in frf.CHANNELS if name in data}
+    return data["cmd_time"], data["cmd_pos"], outputs
+
+
+def frf_campaign(paths: List[str], segment: Optional[int] = None,
+                 overlap: float = frf.DEFAULT_OVERLAP) -> Dict:
+    """Frequency response of a campaign of chirp runs.
+
+    The runs of each system are estimated together in one batched Welch
+    pass (frf.campaign_frf), giving the response of every run and the
+    average over all repetitions.
+
+    Args:
+        paths (list): Log files; logs that are not chirp runs are skipped
+        segment (int, optional): Welch segment length in samples
+        overlap (float): Segment overlap as a fraction of the segment length
+
+    Returns:
+        dict: 'runs' (paths used), 'skipped', and per system under
+            'systems' the 'average' response, its 'bandwidth', the
+            response of each run ('responses', aligned with 'paths') and
+            the 'segments' averaged
+    """
+    runs = {"sim": [], "real": []}
+    used, skipped = [], []
+    for path in paths:
+        log = load_log(path)
+        if not isinstance(log, dict) or log.get("test_type") != "chirp" or "gains" not in log:
+            skipped.append(path)
+            continue
+        used.append(path)
+        mode = log.get("mode")
+        for system in ("sim", "real"):
+            if mode in ("compare", system):
+                run = _chirp_run(log.get(f"{system}_data"))
+                if run is not None:
+                    runs[system].append((path, run))
+
+    systems = {}
+    for system, system_runs in runs.items():
+        if not system_runs:
+            continue
+        try:
+            result = frf.campaign_frf([run for _, run in system_runs], segment, overlap)
+        except ValueError as e:
+            raise ValueError(f"{system} runs: {e}") from e
+        average = result["average"]
+        systems[system] = {
+            "runs": len(system_runs),
+            "segments": result["segments"],
+            "bandwidth": (metrics.compute_bandwidth(average["freq"], average["magnitude"])
+                          if average else None),
+            "average": average,
+            "paths": [path for path, _ in system_runs],
+            "responses": result["runs"],
+        }
+    return {"segment": segment, "overlap": overlap, "runs": used, "skipped": skipped,
+            "systems": systems}
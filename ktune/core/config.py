@@ -0,0 +1,119 @@
+# ktune/core/config.py
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from ktune.core.utils import sweep
+
+@dataclass
+class TuneConfig:
+    """Configuration for tuning tests"""
+    # Connection settings
+    name: str = "NoName"
+    mode: str = "compare"  # Add mode parameter with default
+    sim_ip: str = "127.0.0.1"
+    real_ip: str = "192.168.42.1"
+    actuator_id: int = 11
+    # Batched multi-actuator tests; the first ID is the primary joint
+    actuator_ids: Optional[List[int]] = None
+    # Per-joint overrides: {actuator_id: {"amp", "phase", "kp", "kd", "ki", "sim_kp", "sim_kd"}}
+    joint_overrides: Optional[Dict[int, Dict]] = None
+    start_pos: float = 0.0
+    
+    # Actuator gains
+    kp: float = 20.0
+    kd: float = 5.0
+    ki: float = 0.0
+    
+    # Actuator config
+    acceleration: float = 0.0
+    max_torque: float = 100.0
+    torque_off: bool = False
+
+    # Simulation gains
+    sim_kp: float = 20.0
+    sim_kd: float = 5.0
+    stream_delay: float = 0.0
+
+    # Logging config
+    no_log: bool = False
+    log_duration_pad: float = 2.0
+    sample_rate: float = 100.0
+
+    # Execution
+    pipeline: bool = False
+    state_rate: Optional[float] = None
+    realtime: bool = False
+    realtime_cpu: Optional[int] = None
+    realtime_priority: Optional[int] = None
+    rpc_deadline: bool = False
+    stale_policy: str = "reuse"
+    max_misses: int = 3
+    # Storage type of recorded values; timestamps are always float64
+    record_dtype: str = "float64"
+    # Data file format: "json" or "binary" (memory-mappable columns, see binlog)
+    log_format: str = "json"
+    # Stream samples to a crash-safe journal file while the test runs
+    journal: bool = False
+    journal_chunk: int = 256
+    journal_path: Optional[str] = None
+    # Plot rendering: "inline", "deferred" (worker processes, see plotting) or "none"
+    plots: str = "deferred"
+    # Streaming tracking metrics (see tracking): live console readout, cycle
+    # length (defaults to the test's period), and the cycle RMS position
+    # error (degrees) that stops the run as diverged
+    live: bool = False
+    tracking_cycle: Optional[float] = None
+    abort_error: Optional[float] = None
+    # Publish every state sample to a `ktune watch` viewer at this address;
+    # fleet runs number their robots so the viewer can tell them apart
+    telemetry: Optional[str] = None
+    telemetry_robot: int = 0
+    # Run catalog that saved runs are added to (the CLI uses
+    # data/catalog.sqlite); None leaves them out of any catalog
+    catalog: Optional[str] = None
+
+    # Servo control
+    enable_servos: Optional[List[int]] = None
+    disable_servos: Optional[List[int]] = None
+
+    # Test parameters (will be set by specific test commands)
+    test: Optional[str] = None
+    # Sine parameters
+    freq: Optional[float] = None
+    amp: Optional[float] = None
+    duration: Optional[float] = None
+    # Sin_sin parameters
+    freq1: Optional[float] = None
+    amp1: Optional[float] = None
+    freq2: Optional[float] = None
+    amp2: Optional[float] = None
+    # Sin_Sin random
+    random: bool = False
+    random_reset: Optional[float] = None
+    freq_min: float = 0.1
+    freq_max: float = 1.0
+    amp_min: float = 5.0
+    amp_max: float = 25.0
+    seed: Optional[int] = None
+    # Step parameters
+    step_size: Optional[float] = None
+    step_hold_time: Optional[float] = None
+    step_count: Optional[int] = None
+    step_min: Optional[float] = None
+    step_max: Optional[float] = None
+    max_total: Optional[float] = None
+    # Chirp parameters
+    chirp_amp: Optional[float] = None
+    chirp_init_freq: Optional[float] = None
+    chirp_sweep_rate: Optional[float] = None
+    chirp_duration: Optional[float] = None
+    # Welch frequency response: segment length in samples (None for the
+    # default, capped at the run length) and overlap as a fraction of it
+    frf_segment: Optional[int] = None
+    frf_overlap: float = 0.5
+    # Streaming estimate while a chirp runs (see sweep): chirp cycles per
+    # frequency bin, and the gain (dB) and phase lag (degrees) limits that
+    # stop the sweep
+    sweep_cycles: int = sweep.DEFAULT_CYCLES
+    sweep_max_gain: Optional[float] = None
+    sweep_min_gain: Optional[float] = None
+    sweep_max_lag: Optional[float] = None
@@ -0,0 +1,195 @@
+# ktune/core/fleet.py
+import asyncio
+import copy
+import json
+import os
+import random
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional
+from ktune.core.tune import Tune
+
+
+class Fleet:
+    """Runs the same test on several real robots concurrently.
+
+    Every endpoint gets its own Tune instance, and with it its own scheduler,
+    connections and data buffers. All of them run in a single event loop, so
+    a fleet run takes about as long as one robot instead of scaling with the
+    number of robots.
+
+    Random step and sin_sin tests share one seed, so every robot runs the
+    same schedule, and telemetry is tagged with each robot's index and
+    endpoint.
+    """
+
+    def __init__(self, config: Dict, endpoints: List[str]):
+        """Initialize the fleet.
+
+        Args:
+            config: Validated configuration with a 'tune' section
+            endpoints: KOS IP addresses of the robots to test
+        """
+        if not endpoints:
+            raise ValueError("Fleet requires at least one endpoint")
+        self.endpoints = list(endpoints)
+        self.test_type = config.get('tune', {}).get('test')
+        self.seed = config.get('tune', {}).get('seed')
+        if self.seed is None:
+            self.seed = random.randrange(2 ** 32)
+        self.tunes = {}
+        for robot, endpoint in enumerate(self.endpoints, start=1):
+            robot_config = copy.deepcopy(config)
+            tune_config = robot_config.setdefault('tune', {})
+            tune_config.pop('endpoints', None)
+            tune_config['mode'] = 'real'
+            tune_config['real_ip'] = endpoint
+            tune_config['name'] = f"{tune_config.get('name', 'NoName')}@{endpoint}"
+            tune_config['seed'] = self.seed
+            tune_config['telemetry_robot'] = robot
+            self.tunes[endpoint] = Tune(robot_config)
+        self.errors = {}
+
+    def run_test(self, test_type: Optional[str] = None):
+        """Run the test on every robot, then save per-robot results and the
+        aggregated fleet report."""
+        test_type = test_type or self.test_type
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        fleet_dir = f"fleet_{timestamp}"
+        for endpoint, tune in self.tunes.items():
+            if tune.config.journal:
+                # Journals go next to each robot's results
+                tune.config.journal_path = os.path.join(
+                    os.getcwd(), "data", fleet_dir, self._robot_dir(endpoint),
+                    f"{timestamp}_{test_type}.journal")
+        asyncio.run(self._run_test(test_type))
+
+        if test_type is None:
+            return
+
+        headers = {}
+        for endpoint, tune in self.tunes.items():
+            if endpoint in self.errors or tune.config.no_log:
+                continue
+            robot_dir = self._robot_dir(endpoint)
+            headers[endpoint] = tune.save_and_plot_results(
+                timestamp=timestamp,
+                data_dir=os.path.join(os.getcwd(), "data", fleet_dir, robot_dir),
+                plot_dir=os.path.join(os.getcwd(), "plots", fleet_dir, robot_dir)
+            )
+
+        report = self.build_report(test_type, timestamp, headers)
+        self.print_report(report)
+        if not all(tune.config.no_log for tune in self.tunes.values()):
+            report_dir = os.path.join(os.getcwd(), "data", fleet_dir)
+            os.makedirs(report_dir, exist_ok=True)
+            report_path = os.path.join(report_dir, f"{timestamp}_{test_type}_fleet.json")
+            with open(report_path, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"\nFleet report saved to {report_path}")
+
+    @staticmethod
+    def _robot_dir(endpoint: str) -> str:
+        """Directory name for one robot's results."""
+        return endpoint.replace(':', '_')
+
+    async def _run_test(self, test_type: Optional[str]):
+        """Run every robot's test concurrently in the current event loop."""
+        results = await asyncio.gather(
+            *(tune._run_test(test_type) for tune in self.tunes.values()),
+            return_exceptions=True
+        )
+        for endpoint, result in zip(self.tunes, results):
+            if isinstance(result, BaseException):
+                self.errors[endpoint] = f"{type(result).__name__}: {result}"
+                print(f"\nWarning: test failed on {endpoint}: {self.errors[endpoint]}")
+
+    def build_report(self, test_type: str, timestamp: str, headers: Dict) -> Dict:
+        """Aggregate per-robot results into a cross-robot report.
+
+        Args:
+            test_type (str): Test that was run
+            timestamp (str): Timestamp of the run
+            headers (dict): Saved DataLog header per endpoint
+
+        Returns:
+            dict: Per-robot summaries and the spread of each metric across robots
+        """
+        robots = {}
+        for endpoint, tune in self.tunes.items():
+            if endpoint in self.errors:
+                robots[endpoint] = {"status": "failed", "error": self.errors[endpoint]}
+                continue
+
+            summary = {"status": "ok", "timing": tune.timing}
+            if tune.aborted:
+                summary["aborted"] = tune.aborted
+            header = headers.get(endpoint)
+            if header is not None:
+                summary["tracking_metrics"] = header["tracking_metrics"].get("real", {})
+                if "step_metrics" in header:
+                    summary["step_metrics"] = {
+                        key: value for key, value in (header["step_metrics"].get("real") or {}).items()
+                        if key != "all_steps"
+                    }
+            robots[endpoint] = summary
+
+        return {
+            "test_type": test_type,
+            "timestamp": timestamp,
+            "endpoints": self.endpoints,
+            "seed": self.seed,
+            "robots": robots,
+            "summary": self._summarize(robots)
+        }
+
+    def _summarize(self, robots: Dict) -> Dict:
+        """Spread of the headline metrics across robots."""
+        extractors = {
+            "position_rms_error": lambda r: r.get("tracking_metrics", {}).get("position", {}).get("rms_error"),
+            "position_max_error": lambda r: r.get("tracking_metrics", {}).get("position", {}).get("max_error"),
+            "velocity_rms_error": lambda r: r.get("tracking_metrics", {}).get("velocity", {}).get("rms_error"),
+            "achieved_rate": lambda r: (r.get("timing") or {}).get("achieved_rate"),
+        }
+        summary = {
+            "robots_ok": sum(1 for r in robots.values() if r["status"] == "ok"),
+            "robots_failed": sum(1 for r in robots.values() if r["status"] != "ok"),
+        }
+        for name, extract in extractors.items():
+            values = {endpoint: extract(r) for endpoint, r in robots.items() if r["status"] == "ok"}
+            values = {endpoint: v for endpoint, v in values.items() if v is not None}
+            if not values:
+                continue
+            array = np.array(list(values.values()))
+            summary[name] = {
+                "mean": float(np.mean(array)),
+                "std": float(np.std(array)),
+                "min": float(np.min(array)),
+                "max": float(np.max(array)),
+                "worst": max(values, key=values.get) if name != "achieved_rate" else min(values, key=values.get)
+            }
+        return summary
+
+    def print_report(self, report: Dict):
+        """Print a per-robot table and the cross-robot spread."""
+        print(f"\n=== Fleet Report: {report['test_type']} ===")
+        print(f"{'Endpoint':<20} {'Rate (Hz)':>10} {'Pos RMS (°)':>12} {'Pos Max (°)':>12}  Status")
+        for endpoint, robot in report["robots"].items():
+            if robot["status"] != "ok":
+                print(f"{endpoint:<20} {'-':>10} {'-':>12} {'-':>12}  {robot['status']}")
+                continue
+            rate = (robot.get("timing") or {}).get("achieved_rate")
+            position = robot.get("tracking_metrics", {}).get("position", {})
+            rate_str = f"{rate:.1f}" if rate is not None else "-"
+            rms_str = f"{position['rms_error']:.3f}" if "rms_error" in position else "-"
+            max_str = f"{position['max_error']:.3f}" if "max_error" in position else "-"
+            status = "aborted" if robot.get("aborted") else "ok"
+            print(f"{endpoint:<20} {rate_str:>10} {rms_str:>12} {max_str:>12}  {status}")
+
+        summary = report["summary"]
+        print(f"\nRobots: {summary['robots_ok']} ok, {summary['robots_failed']} failed")
+        if "position_rms_error" in summary:
+            rms = summary["position_rms_error"]
+            print(f"Position RMS error across robots: mean {rms['mean']:.3f}°, "
+                  f"std {rms['std']:.3f}°, range [{rms['min']:.3f}, {rms['max']:.3f}]° "
+                  f"(worst: {rms['worst']})")
@@ -27,13 +27,3 @@ class TestBench(ABC):
     def get_safety_limits(self) -> dict:
         """Get safety limits for this test bench"""
         pass
-
-    @abstractmethod
-    async def read_state(self) -> Dict:
-        """Read current state of the system"""
-        pass
-
-    @abstractmethod
-    async def command_state(self, state: Dict):
-        """Command system to desired state"""
-        pass
\ No newline at end of file
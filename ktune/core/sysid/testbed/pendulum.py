@@ -2,13 +2,17 @@
 
 from .base import TestBench, TestConfig
 from dataclasses import dataclass
+import math
+import sys
 import numpy as np
 import asyncio
-from typing import Dict
+from typing import Dict, Optional
 from datetime import datetime
-from ktune.core.utils.plots import PendulumPlot
 from ktune.core.utils.filters import detect_and_filter_spikes
-from ktune.core.utils import metrics
+from ktune.core.utils import metrics, plotting, telemetry
+from ktune.core.utils.scheduler import Scheduler
+from ktune.core.utils.recorder import Recorder
+from ktune.core.utils.realtime import Realtime, SPIN_WINDOW
 from pathlib import Path
 
 @dataclass
@@ -20,6 +24,12 @@ class PendulumConfig(TestConfig):
     vin: float = 12.0
     offset: float = 0.0  # Radians, offset from motor zero to pendulum bottom
     sample_rate: float = 100.0
+    realtime: bool = False  # Low-jitter mode for the measured window
+    realtime_cpu: Optional[int] = None
+    realtime_priority: Optional[int] = None
+    record_dtype: str = "float64"  # Storage type of recorded values
+    plots: str = "deferred"  # "inline", "deferred" (worker processes) or "none"
+    telemetry: Optional[str] = None  # Address of a `ktune watch` viewer to publish samples to
 
 
 class PendulumTrajectory:
@@ -113,6 +123,16 @@ class Nothing(PendulumTrajectory):
 
 class PendulumBench(TestBench):
     """Pendulum testbed implementation"""
+
+    # Fields of each logged entry, in order
+    ENTRY_KEYS = ("position", "speed", "torque", "input_volts", "temp", "current", "load",
+                  "timestamp", "goal_position", "torque_enable")
+
+    def _sample_fields(self) -> list:
+        """Recorder fields for the experiment samples."""
+        value = self.config.record_dtype
+        dtypes = {"load": "i4", "timestamp": "f8", "torque_enable": "?"}
+        return [(key, dtypes.get(key, value)) for key in self.ENTRY_KEYS]
     
     def __init__(self, config: PendulumConfig):
         super().__init__(config)
@@ -126,6 +146,8 @@ class PendulumBench(TestBench):
             "nothing": Nothing(),
             "chirp": Chirp()
         }
+        # Future of the plots of the last experiment (see plotting.PlotService)
+        self.plot_future = None
         
     def get_parameters(self) -> dict:
         return {
@@ -171,33 +193,24 @@ class PendulumBench(TestBench):
             
         return True
 
-
-    async def read_state(self) -> Dict:
-        """Read current state of the system
-        Returns state in radians/rad per sec for positions/velocities"""
-        # Create a fresh KOS connection for this read
-        response = await self.kos.actuator.get_actuators_state([self.config.actuator_id])
-        state = response.states[0]
-        
-        return {
-            "position": np.deg2rad(float(state.position)),
-            "speed": np.deg2rad(float(state.velocity)),
-            "torque": float(state.torque),
-            "input_volts": float(state.voltage),
-            "temp": float(state.temperature),
-            "current": float(state.current),
-            "load": 0
-        }
-        
-        return converted
-    
-    async def command_state(self, state: Dict):
-        """Command system state
-        Expects position in radians"""
-        await self.kos.actuator.command_actuators([{
-            'actuator_id': self.config.actuator_id,
-            'position': np.rad2deg(state['position'])  # Convert to degrees for KOS
-        }])
+    def _log_state(self, state, samples: Recorder, t: float, goal_position: float,
+                   torque_enable: bool):
+        """Write one state sample as a row of the experiment recorder.
+        Positions and velocities are stored in radians/rad per sec"""
+        samples.append((
+            math.radians(state.position), math.radians(state.velocity),
+            state.torque, state.voltage, state.temperature, state.current, 0,
+            t, goal_position, torque_enable
+        ))
+
+    @staticmethod
+    def to_log(data: Dict) -> Dict:
+        """Experiment data in its saved form, with the recorded samples
+        exported as one entry dict per sample"""
+        log = {key: value for key, value in data.items() if key != "samples"}
+        if "samples" in data:
+            log["entries"] = data["samples"].to_records()
+        return log
 
     def run_experiment(self, trajectory_name: str) -> Dict:
         """Run experiment with named trajectory"""
@@ -215,13 +228,17 @@ class PendulumBench(TestBench):
         if not self.validate_trajectory(trajectory):
             raise ValueError("Trajectory is not safe. Please adjust the trajectory.")
       
+        # One request payload for the setup moves and the hot loop, in KOS degrees
+        command = [{'actuator_id': self.config.actuator_id, 'position': 0.0}]
+        actuator_ids = [self.config.actuator_id]
+
         await asyncio.sleep(1)
-        current_state = await self.read_state()
-        current_position = current_state['position']
-        await self.command_state({"position": current_position})
+        response = await self.kos.actuator.get_actuators_state(actuator_ids)
+        current_position = math.radians(response.states[0].position)
+        command[0]['position'] = math.degrees(current_position)
+        await self.kos.actuator.command_actuators(command)
         await asyncio.sleep(1)
 
-        current_position = current_state['position']
         start_position = 0.0 +self.config.offset
         print(np.rad2deg(current_position))
 
@@ -242,8 +259,8 @@ class PendulumBench(TestBench):
         # Move to starting position smoothly
         #start_position = trajectory(0)[0] + np.deg2rad(self.config.offset)  # Get initial position from trajectory
 
-        current_state = await self.read_state()
-        current_position = current_state['position']
+        response = await self.kos.actuator.get_actuators_state(actuator_ids)
+        current_position = math.radians(response.states[0].position)
         start_position = 0.0 +self.config.offset
         print(np.rad2deg(current_position))
         
@@ -261,7 +278,8 @@ class PendulumBench(TestBench):
         while asyncio.get_running_loop().time() - start_time < move_duration:
             t = asyncio.get_running_loop().time() - start_time
             position = PendulumTrajectory.cubic_interpolate(None, keyframes, t)
-            await self.command_state({"position": position})
+            command[0]['position'] = math.degrees(position)
+            await self.kos.actuator.command_actuators(command)
             await asyncio.sleep(dt)
 
         # Run experiment and collect data
@@ -284,78 +302,90 @@ class PendulumBench(TestBench):
             "sample_rate": self.config.sample_rate,
             # Experiment info
             "trajectory": trajectory_name,
-
-            "entries": []
         }
 
         
-        start_time = asyncio.get_running_loop().time()
-        next_sample_time = start_time
+        scheduler = Scheduler(self.config.sample_rate,
+                              spin=SPIN_WINDOW if self.config.realtime else 0.0)
         current_torque_state = True  # Track current torque state
 
-       
+        # The hot loop reuses the request payload, writes samples into
+        # preallocated columns and defers console output until it is done
+        capacity = int(np.ceil(trajectory.duration * self.config.sample_rate)) + 1
+        samples = Recorder(self._sample_fields(), capacity=capacity)
+        torque_events = []
+        publisher = None
+        if self.config.telemetry:
+            publisher = telemetry.TelemetryPublisher(self.config.telemetry)
+            print(f"Publishing telemetry to {self.config.telemetry} (view with `ktune watch`)")
 
         print(f"Running experiment for {trajectory.duration} seconds")
-        while asyncio.get_running_loop().time() - start_time < trajectory.duration:
-            t = asyncio.get_running_loop().time() - start_time
-            goal_position, torque_enable = trajectory(t)
-            
-            # Hack for Lift and Drop and (bug in KOS)
-            if trajectory_name == "lift_and_drop" and not torque_enable:
-                await self.kos.actuator.configure_actuator(
-                    actuator_id=self.config.actuator_id,
-                    torque_enabled=False
-                )
-            elif torque_enable != current_torque_state:
-                await self.kos.actuator.configure_actuator(
-                    actuator_id=self.config.actuator_id,
-                    torque_enabled=torque_enable
-                )
-                print("Torque enabled:", torque_enable)
-                await asyncio.sleep(0.1)
-                current_torque_state = torque_enable
-                
-            await self.command_state({"position": goal_position + self.config.offset})
-            entry = await self.read_state()
-            entry.update({
-                "timestamp": t,
-                "goal_position": goal_position,
-                "torque_enable": torque_enable,
-            })
-            data["entries"].append(entry)
-            
-            # Timing compensation
-            next_sample_time += dt
-            sleep_time = next_sample_time - asyncio.get_running_loop().time()
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
-            else:
-                if -sleep_time*1000.0 > 2.0:
-                    print(f"Warning: Falling behind schedule by {-sleep_time*1000:.1f}ms")
-            
+        with Realtime(self.config.realtime, cpu=self.config.realtime_cpu,
+                      priority=self.config.realtime_priority):
+            blocks_start = sys.getallocatedblocks()
+            scheduler.start()
+            while scheduler.elapsed() < trajectory.duration:
+                t = scheduler.elapsed()
+                goal_position, torque_enable = trajectory(t)
+
+                # Hack for Lift and Drop and (bug in KOS)
+                if trajectory_name == "lift_and_drop" and not torque_enable:
+                    await self.kos.actuator.configure_actuator(
+                        actuator_id=self.config.actuator_id,
+                        torque_enabled=False
+                    )
+                elif torque_enable != current_torque_state:
+                    await self.kos.actuator.configure_actuator(
+                        actuator_id=self.config.actuator_id,
+                        torque_enabled=torque_enable
+                    )
+                    torque_events.append((t, torque_enable))
+                    await asyncio.sleep(0.1)
+                    current_torque_state = torque_enable
+
+                # Convert to degrees for KOS
+                command[0]['position'] = math.degrees(goal_position + self.config.offset)
+                await self.kos.actuator.command_actuators(command)
+                response = await self.kos.actuator.get_actuators_state(actuator_ids)
+                state = response.states[0]
+                self._log_state(state, samples, t, goal_position, torque_enable)
+                if publisher is not None:
+                    # Degrees as sent to and read from KOS
+                    publisher.pack(0, telemetry.PENDULUM, self.config.actuator_id, t,
+                                   state.position, state.velocity, command[0]['position'])
+                    publisher.send(1)
+
+                await scheduler.wait()
+            alloc_blocks = sys.getallocatedblocks() - blocks_start
+        if publisher is not None:
+            publisher.close()
+
+        data["timing"] = scheduler.stats()
+        data["timing"]["alloc_blocks_per_tick"] = alloc_blocks / max(data["timing"]["ticks"], 1)
+        data["samples"] = samples
+        for t, torque_enable in torque_events:
+            print(f"Torque enabled: {torque_enable} (t={t:.2f}s)")
+        if data["timing"]["overruns"]:
+            print(f"Warning: Fell behind schedule on {data['timing']['overruns']} ticks "
+                  f"({data['timing']['skipped_ticks']} skipped)")
+
 
         # Filter out Position and Velocity spikes
-        if len(data["entries"]) > 0:
-            # Extract time series data
-            times = np.array([entry["timestamp"] for entry in data["entries"]])
-            positions = np.array([entry["position"] for entry in data["entries"]])
-            velocities = np.array([entry["speed"] for entry in data["entries"]])
-            
+        if len(samples) > 0:
             # Convert to degrees for filtering
-            positions_deg = np.rad2deg(positions)
-            velocities_deg = np.rad2deg(velocities)
+            positions_deg = np.rad2deg(samples["position"])
+            velocities_deg = np.rad2deg(samples["speed"])
             
             # Filter spikes
             filtered_pos_deg, filtered_vel_deg = detect_and_filter_spikes(
                 positions_deg, 
                 velocities_deg, 
-                times
+                samples["timestamp"]
             )
             
-            # Convert back to radians and update data
-            for i, entry in enumerate(data["entries"]):
-                entry["position"] = np.deg2rad(filtered_pos_deg[i])
-                entry["speed"] = np.deg2rad(filtered_vel_deg[i])
+            # Convert back to radians and update the recorded columns in place
+            samples["position"][:] = np.deg2rad(filtered_pos_deg)
+            samples["speed"][:] = np.deg2rad(filtered_vel_deg)
 
         # Analyze data quality
         data_metrics = metrics.analyze_sysid_data(data)
@@ -369,10 +399,13 @@ class PendulumBench(TestBench):
         print(f"dt range: [{data_metrics['dt_min']*1000:.2f}, {data_metrics['dt_max']*1000:.2f}]ms")
         print(f"Missing samples: {data_metrics['missing_samples']}")
 
-        plots_dir = Path("./plots")
-        plots_dir.mkdir(exist_ok=True, parents=True)
-        plotter = PendulumPlot(data)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        plotter.create_plots(save_dir="./plots", timestamp=timestamp)
+        if self.config.plots != "none":
+            plots_dir = Path("./plots")
+            plots_dir.mkdir(exist_ok=True, parents=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # The caller adds keys to data after this returns, so render from a copy
+            self.plot_future = plotting.get_service(self.config.plots).submit(
+                plotting.render_pendulum_plots, dict(data), "./plots", timestamp
+            )
 
         return data
\ No newline at end of file
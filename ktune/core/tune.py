@@ -1,112 +1,231 @@
 # ktune/core/tune.py
 import asyncio
-import math
+import sys
 import time
-import json
 import os
 import numpy as np
 from datetime import datetime
-import matplotlib.pyplot as plt
 import logging
-from dataclasses import dataclass
+from dataclasses import asdict
 from typing import Dict, List, Optional
 from pykos import KOS
+from ktune.core.config import TuneConfig
 from ktune.core.utils.datalog import DataLog
-from ktune.core.utils.plots import Plot
-from ktune.core.utils import metrics
+from ktune.core.utils.scheduler import Scheduler
+from ktune.core.utils.realtime import Realtime, SPIN_WINDOW
+from ktune.core.utils import (buffers, journal, latency, metrics, plotting, sweep, telemetry,
+                              tracking, waveforms)
+from ktune.core.utils.recorder import Recorder, ColumnMap
+from ktune.core.utils.analysis import AnalysisContext, analysis_contexts
 import random
 # Configure logging
 logging.getLogger('matplotlib').setLevel(logging.WARNING)
 os.environ["PYTHONWARNINGS"] = "ignore"
 logging.getLogger().setLevel(logging.ERROR)
 
-@dataclass
-class TuneConfig:
-    """Configuration for tuning tests"""
-    # Connection settings
-    name: str = "NoName"
-    mode: str = "compare"  # Add mode parameter with default
-    sim_ip: str = "127.0.0.1"
-    real_ip: str = "192.168.42.1"
-    actuator_id: int = 11
-    start_pos: float = 0.0
-    
-    # Actuator gains
-    kp: float = 20.0
-    kd: float = 5.0
-    ki: float = 0.0
-    
-    # Actuator config
-    acceleration: float = 0.0
-    max_torque: float = 100.0
-    torque_off: bool = False
-
-    # Simulation gains
-    sim_kp: float = 20.0
-    sim_kd: float = 5.0
-    stream_delay: float = 0.0
-
-    # Logging config
-    no_log: bool = False
-    log_duration_pad: float = 2.0
-    sample_rate: float = 100.0
-
-    # Servo control
-    enable_servos: Optional[List[int]] = None
-    disable_servos: Optional[List[int]] = None
-
-    # Test parameters (will be set by specific test commands)
-    test: Optional[str] = None
-    # Sine parameters
-    freq: Optional[float] = None
-    amp: Optional[float] = None
-    duration: Optional[float] = None
-    # Sin_sin parameters
-    freq1: Optional[float] = None
-    amp1: Optional[float] = None
-    freq2: Optional[float] = None
-    amp2: Optional[float] = None
-    # Sin_Sin random
-    random: bool = False
-    random_reset: Optional[float] = None
-    freq_min: float = 0.1
-    freq_max: float = 1.0
-    amp_min: float = 5.0
-    amp_max: float = 25.0
-    seed: Optional[int] = None
-    # Step parameters
-    step_size: Optional[float] = None
-    step_hold_time: Optional[float] = None
-    step_count: Optional[int] = None
-    step_min: Optional[float] = None
-    step_max: Optional[float] = None
-    max_total: Optional[float] = None
-    # Chirp parameters
-    chirp_amp: Optional[float] = None
-    chirp_init_freq: Optional[float] = None
-    chirp_sweep_rate: Optional[float] = None
-    chirp_duration: Optional[float] = None
+# Seconds between refreshes of the live tracking readout
+LIVE_INTERVAL = 0.5
 
 class Tune:
+    STALE_POLICIES = ("reuse", "gap", "abort")
+
     def __init__(self, config: Dict):
         tune_config = config.get('tune', {})
         self.config = TuneConfig(**tune_config)
         self.mode = self.config.mode
+        if self.config.stale_policy not in self.STALE_POLICIES:
+            raise ValueError(f"Unknown stale policy '{self.config.stale_policy}', "
+                             f"expected one of {self.STALE_POLICIES}")
+
+        # Actuators under test, primary joint first
+        if self.config.actuator_ids:
+            self.actuator_ids = [int(aid) for aid in self.config.actuator_ids]
+            self.config.actuator_id = self.actuator_ids[0]
+        else:
+            self.actuator_ids = [self.config.actuator_id]
+        self.joint_overrides = {
+            int(aid): overrides
+            for aid, overrides in (self.config.joint_overrides or {}).items()
+        }
+        self._joint_keys = [self._joint_column_keys(aid) for aid in self.actuator_ids]
         
         # Initialize data storage based on mode
         self.sim_data = None
         self.real_data = None
+        self.timing = None
+        self.latency = None
+        self.loop_latency = None
+        self.reference = None
+        # Future of the plots of the last saved test (see plotting.PlotService)
+        self.plot_future = None
+        # Shared analysis of the last test's data per system (see analysis_context)
+        self.analysis = {}
+        # Streaming tracking errors per system, readable while the test runs
+        self.tracking = {}
+        # Streaming chirp frequency response per system (chirp tests only)
+        self.sweep = {}
+        # Reason the last test was stopped early, if it was
+        self.aborted = None
+        # Random step and sin_sin schedules; not the global generator, so
+        # identically seeded Tunes in one event loop draw the same schedule
+        self.random = random.Random(self.config.seed)
+        self._command_index = {}
+        self._next_readout = 0.0
+        # Telemetry publisher while a test runs with telemetry enabled
+        self._telemetry = None
+        self.send_skew = buffers.ColumnBuffer()
+        # Compare mode: per-system dispatch tasks, released every tick (see
+        # _start_dispatchers)
+        self._dispatchers = None
+        self._dispatch_tasks = None
+        # Position of each actuator ID in the joint lists
+        self._joint_index = {aid: j for j, aid in enumerate(self.actuator_ids)}
+        # Missed RPC deadlines per system, and the current run of missed reads
+        self.rpc_misses = {"sim": {"command": 0, "state": 0},
+                           "real": {"command": 0, "state": 0}}
+        self._consecutive_misses = {"sim": 0, "real": 0}
+        self.journal_path = None
+        self._journal = None
         
         if self.mode in ['compare', 'sim']:
-            self.sim_data = {
-                "time": [], "position": [], "velocity": [],
-                "cmd_time": [], "cmd_pos": [], "cmd_vel": []
-            }
+            self.sim_data = self._new_data_dict()
         if self.mode in ['compare', 'real']:
-            self.real_data = {
-                "time": [], "position": [], "velocity": [],
-                "cmd_time": [], "cmd_pos": [], "cmd_vel": []
-            }
+            self.real_data = self._new_data_dict()
+
+    def _joint_column_keys(self, actuator_id):
+        """Data column names (position, velocity, cmd_pos, cmd_vel) for a joint.
+
+        Single-actuator tests use the plain column names. Batched tests add a
+        per-joint column suffixed with the actuator ID for every joint.
+        """
+        if len(self.actuator_ids) == 1:
+            return ("position", "velocity", "cmd_pos", "cmd_vel")
+        return tuple(f"{column}_{actuator_id}"
+                     for column in ("position", "velocity", "cmd_pos", "cmd_vel"))
+
+    def _new_data_dict(self):
+        """Create empty data storage for one system.
+
+        Commands and state samples are recorded as separate row streams,
+        since the pipelined mode writes them at different rates. The
+        returned map gives dict-style access to the columns of both.
+        """
+        value = self.config.record_dtype
+        commands = Recorder(
+            [("cmd_time", "f8"), ("cmd_send_time", "f8"),
+             # Per-tick latency breakdown (seconds)
+             ("compute_dur", "f8"), ("cmd_rpc_dur", "f8")]
+            + [(key, value) for _, _, pos_key, vel_key in self._joint_keys
+               for key in (pos_key, vel_key)]
+        )
+        states = Recorder(
+            [("time", "f8"), ("state_rpc_dur", "f8"),
+             # 1 for a fresh state sample, 0 for a stale or missing one
+             ("valid", "u1")]
+            + [(key, value) for pos_key, vel_key, _, _ in self._joint_keys
+               for key in (pos_key, vel_key)]
+        )
+        aliases = {}
+        if len(self.actuator_ids) > 1:
+            # The plain columns alias the primary joint's columns
+            aliases = dict(zip(("position", "velocity", "cmd_pos", "cmd_vel"), self._joint_keys[0]))
+        return ColumnMap({"commands": commands, "states": states}, aliases)
+
+    def _active_data(self):
+        """Data dict per active system name."""
+        systems = {}
+        if self.sim_data is not None:
+            systems["sim"] = self.sim_data
+        if self.real_data is not None:
+            systems["real"] = self.real_data
+        return systems
+
+    @classmethod
+    def from_journal(cls, path: str) -> "Tune":
+        """Rebuild a Tune holding the data recovered from a journal file,
+        e.g. of a run that crashed or was interrupted.
+
+        Args:
+            path (str): Journal written by a run with journal enabled
+
+        Returns:
+            Tune: Tune with the recovered sim/real data, ready for
+                save_and_plot_results()
+        """
+        recording = journal.recover(path)
+        tune = cls({"tune": recording["meta"]["config"]})
+        tune._load_recording(recording)
+        tune.journal_path = path
+
+        # A system needs two state samples for metrics; drop any that the
+        # run did not get that far on
+        systems = [system for system, data_dict in tune._active_data().items()
+                   if len(data_dict["time"]) >= 2]
+        if not systems:
+            raise ValueError(f"{path} holds no complete chunk of state samples")
+        if len(systems) == 1 and tune.mode == 'compare':
+            print(f"Warning: no {'real' if systems[0] == 'sim' else 'sim'} samples recovered, "
+                  f"keeping {systems[0]} data only")
+            tune.mode = tune.config.mode = systems[0]
+            if systems[0] == 'sim':
+                tune.real_data = None
+            else:
+                tune.sim_data = None
+        status = "complete" if recording["complete"] else "incomplete, run was interrupted"
+        print(f"Recovered {recording['chunks']} chunks from {path} ({status})")
+        return tune
+
+    def analysis_context(self, system: str) -> AnalysisContext:
+        """Analysis of a system's data from the last test, shared by the
+        console summary, DataLog and the plots.
+
+        Args:
+            system (str): 'sim' or 'real'
+        """
+        self.analysis = analysis_contexts(self.sim_data, self.real_data, self.analysis,
+                                          self.config.frf_segment, self.config.frf_overlap)
+        return self.analysis[system]
+
+    def _load_recording(self, recording):
+        """Replace the in-memory recorders with the streams of a journal."""
+        self.analysis = {}
+        for system, data_dict in self._active_data().items():
+            for stream, recorder in data_dict.recorders.items():
+                rows = recording["streams"].get(f"{system}/{stream}")
+                if rows is None:
+                    rows = np.zeros(0, dtype=recorder.dtype)
+                data_dict.recorders[stream] = Recorder.from_array(rows)
+
+    def _open_journal(self):
+        """Start streaming every recorder to a new journal file."""
+        self.journal_path = self.config.journal_path or os.path.join(
+            os.getcwd(), "data",
+            f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.config.test}.journal")
+        streams = {
+            f"{system}/{stream}": recorder.dtype
+            for system, data_dict in self._active_data().items()
+            for stream, recorder in data_dict.recorders.items()
+        }
+        self._journal = journal.JournalWriter(self.journal_path, streams,
+                                              meta={"config": asdict(self.config)})
+        for system, data_dict in self._active_data().items():
+            for stream, recorder in data_dict.recorders.items():
+                recorder.stream_to(self._journal.sink(f"{system}/{stream}"),
+                                   self.config.journal_chunk)
+        print(f"Journaling samples to {self.journal_path}")
+
+    def _close_journal(self):
+        """Write out the remaining rows and close the journal file."""
+        for data_dict in self._active_data().values():
+            for recorder in data_dict.recorders.values():
+                recorder.detach()
+        writer, self._journal = self._journal, None
+        writer.close()
+        print(f"Journal closed: {writer.chunks} chunks in {self.journal_path}")
+
+    def _joint_param(self, actuator_id, name, default):
+        """Per-joint override of a test or gain parameter."""
+        return self.joint_overrides.get(actuator_id, {}).get(name, default)
 
 
     async def setup_connections(self):
@@ -118,7 +237,7 @@ class Tune:
             self.sim_kos = KOS(sim_ip)
             sim_start = time.time()
             for _ in range(100):
-                await self.sim_kos.actuator.get_actuators_state([self.config.actuator_id])
+                await self.sim_kos.actuator.get_actuators_state(self.actuator_ids)
             sim_rate = 100 / (time.time() - sim_start)
             print(f"Max KOS-SIM sampling rate: {sim_rate:.1f} Hz")
                 
@@ -129,7 +248,7 @@ class Tune:
             self.real_kos = KOS(real_ip)
             real_start = time.time()
             for _ in range(100):
-                await self.real_kos.actuator.get_actuators_state([self.config.actuator_id])
+                await self.real_kos.actuator.get_actuators_state(self.actuator_ids)
             real_rate = 100 / (time.time() - real_start)
             print(f"Max KOS-REAL sampling rate: {real_rate:.1f} Hz")
 
@@ -147,6 +266,10 @@ class Tune:
         print("\nTest Configuration:")
         print(f"Test Type: {self.config.test}")
         print(f"Actuator ID: {self.config.actuator_id}")
+        if len(self.actuator_ids) > 1:
+            print(f"Actuator IDs: {', '.join(str(aid) for aid in self.actuator_ids)}")
+            for aid, overrides in self.joint_overrides.items():
+                print(f"  {aid} overrides: {overrides}")
         print(f"Start Position: {self.config.start_pos}°")
         print(f"Sample Rate: {self.config.sample_rate} Hz")
         
@@ -284,6 +407,52 @@ class Tune:
                     torque_enabled=True
                 )
 
+    def _compile_joint_waveforms(self, compile_fn, base_amp):
+        """Compile the test waveform for every actuator under test.
+
+        Args:
+            compile_fn: Callable taking a phase offset (degrees) and returning
+                the nominal Waveform
+            base_amp (float): Nominal test amplitude that a per-joint 'amp'
+                override replaces
+
+        Returns:
+            dict: Waveform per actuator ID, primary joint first
+        """
+        joint_waveforms = {}
+        for aid in self.actuator_ids:
+            waveform = compile_fn(self._joint_param(aid, 'phase', 0.0))
+            amp = self._joint_param(aid, 'amp', None)
+            if amp is not None and base_amp:
+                waveform = waveform.scaled(amp / base_amp, self.config.start_pos)
+            joint_waveforms[aid] = waveform
+        return joint_waveforms
+
+    async def _configure_actuators(self, kos_configs):
+        """Apply gains and limits to every actuator under test.
+
+        Args:
+            kos_configs: List of (KOS, is_real) tuples for active systems
+        """
+        for kos, is_real in kos_configs:
+            for aid in self.actuator_ids:
+                # Select gains based on system type
+                if is_real:
+                    kp = self._joint_param(aid, 'kp', self.config.kp)
+                    kd = self._joint_param(aid, 'kd', self.config.kd)
+                    ki = self._joint_param(aid, 'ki', self.config.ki)
+                else:
+                    kp = self._joint_param(aid, 'sim_kp', self.config.sim_kp)
+                    kd = self._joint_param(aid, 'sim_kd', self.config.sim_kd)
+                    ki = 0.0
+                await kos.actuator.configure_actuator(
+                    actuator_id=aid,
+                    kp=kp, kd=kd, ki=ki,
+                    acceleration=self.config.acceleration,
+                    max_torque=self.config.max_torque,
+                    torque_enabled=not self.config.torque_off
+                )
+
     async def _move_to_start_position(self, kos_configs):
         """Move to start position and wait until position is reached.
         
@@ -295,10 +464,10 @@ class Tune:
         # Command move to start position
         for kos, _ in kos_configs:
             print(f"Moving to start position: {self.config.start_pos}°")
-            await kos.actuator.command_actuators([{
-                'actuator_id': self.config.actuator_id,
-                'position': self.config.start_pos,
-            }])
+            await kos.actuator.command_actuators([
+                {'actuator_id': aid, 'position': self.config.start_pos}
+                for aid in self.actuator_ids
+            ])
             await asyncio.sleep(1.0)
 
         # Wait for position to be reached
@@ -310,14 +479,14 @@ class Tune:
             all_settled = True
             
             for kos, is_real in kos_configs:
-                response = await kos.actuator.get_actuators_state([self.config.actuator_id])
-                if response.states:
-                    current_pos = response.states[0].position
+                response = await kos.actuator.get_actuators_state(self.actuator_ids)
+                for state in response.states:
+                    current_pos = state.position
                     error = abs(current_pos - self.config.start_pos)
                     system_type = "Real" if is_real else "Sim"
                     if error > position_threshold:
                         all_settled = False
-                        print(f"{system_type} Position Error: {error:.3f}°", end='\r')
+                        print(f"{system_type} {state.actuator_id} Position Error: {error:.3f}°", end='\r')
             
             if all_settled:
                 print("\nStart position reached!")
@@ -331,24 +500,566 @@ class Tune:
 
         await asyncio.sleep(1.0)
                 
-    def _log_actuator_state(self, response, data_dict, current_time):
+    async def _command_systems(self, kos_configs, scheduler, index, current_time):
+        """Command every active system and sample its state for one tick.
+
+        In compare mode both systems run concurrently in their dispatch tasks
+        (see _start_dispatchers), released together for the tick.
+
+        Args:
+            kos_configs: List of (KOS, is_real) tuples for active systems
+            scheduler: Scheduler pacing the loop, used to timestamp sends
+            index (int): Command table index for this tick
+            current_time (float): Current normalized time (seconds from start)
+        """
+        if len(kos_configs) == 1:
+            kos, is_real = kos_configs[0]
+            await self._command_system(kos, is_real, scheduler, index, current_time)
+            return
+
+        self._dispatch_tick = index
+        self._dispatch_time = current_time
+        for release, _ in self._dispatchers:
+            release.set()
+        for (_, done), task in zip(self._dispatchers, self._dispatch_tasks):
+            # A task that stopped never sets its event again
+            if not task.done():
+                await done.wait()
+            done.clear()
+        errors = self._dispatch_errors
+        if errors.count(None) < len(errors):
+            # Raised once, on the tick that failed
+            self._dispatch_errors = [None] * len(errors)
+            raise next(error for error in errors if error is not None)
+        for task in self._dispatch_tasks:
+            if task.done():
+                raise RuntimeError(f"{task.get_name()} task stopped")
+        self.send_skew.append(max(self._send_times) - min(self._send_times))
+
+    def _start_dispatchers(self, kos_configs, scheduler):
+        """Start one long-lived task per system for compare mode.
+
+        Each tick the loop sets every task's release event in one step, so
+        sim and real receive the command at the same instant instead of real
+        always trailing sim by two round trips. The tasks are reused for the
+        whole run instead of gathering new ones on every tick.
+
+        Returns:
+            list: The dispatch tasks, to cancel when the loop ends
+        """
+        self._dispatchers = [(asyncio.Event(), asyncio.Event()) for _ in kos_configs]
+        self._send_times = [0.0] * len(kos_configs)
+        self._dispatch_errors = [None] * len(kos_configs)
+        self._dispatch_tasks = [
+            asyncio.create_task(self._dispatch(slot, kos, is_real, scheduler),
+                                name=f"{'real' if is_real else 'sim'} dispatch")
+            for slot, (kos, is_real) in enumerate(kos_configs)
+        ]
+        return self._dispatch_tasks
+
+    async def _dispatch(self, slot, kos, is_real, scheduler):
+        """Dispatch task: command one system whenever the loop releases a tick."""
+        release, done = self._dispatchers[slot]
+        try:
+            while True:
+                await release.wait()
+                release.clear()
+                try:
+                    self._send_times[slot] = await self._command_system(
+                        kos, is_real, scheduler, self._dispatch_tick, self._dispatch_time)
+                except Exception as error:
+                    self._dispatch_errors[slot] = error
+                done.set()
+        finally:
+            # Do not leave the loop waiting for a tick this task will not finish
+            done.set()
+
+    async def _command_system(self, kos, is_real, scheduler, index, current_time):
+        """Send one command and read one state sample on a single system.
+
+        Returns:
+            float: Time the command was sent (seconds from scheduler start)
+        """
+        data_dict = self.real_data if is_real else self.sim_data
+        send_time = await self._send_command(kos, data_dict, scheduler, index)
+        await self._sample_state(kos, data_dict, scheduler, current_time)
+        return send_time
+
+    async def _bounded(self, rpc, scheduler):
+        """Await an RPC, cancelling it at the next tick's deadline when
+        rpc_deadline is set.
+
+        Returns:
+            tuple: (completed, response); response is None if cancelled
+        """
+        if not self.config.rpc_deadline:
+            return True, await rpc
+        try:
+            async with asyncio.timeout(scheduler.remaining()):
+                return True, await rpc
+        except TimeoutError:
+            return False, None
+
+    def _system_name(self, data_dict):
+        return "sim" if data_dict is self.sim_data else "real"
+
+    async def _send_command(self, kos, data_dict, scheduler, index):
+        """Send one batched position command for all joints and log it.
+
+        Returns:
+            float: Time the command was sent (seconds from scheduler start)
+        """
+        compute_start = time.perf_counter()
+        payload = self._payloads[kos]
+        for command, cmd_pos in zip(payload, self._cmd_pos):
+            command['position'] = cmd_pos[index]
+        rpc_start = time.perf_counter()
+        send_time = scheduler.elapsed()
+        completed, _ = await self._bounded(kos.actuator.command_actuators(payload), scheduler)
+        rpc_end = time.perf_counter()
+        system = self._system_name(data_dict)
+        if not completed:
+            self.rpc_misses[system]["command"] += 1
+        self._command_index[system] = index
+
+        # Log command, written in place into the recorder
+        commands = data_dict.recorders["commands"]
+        row = commands.claim()
+        columns = commands.columns
+        columns[0][row] = self._cmd_time[index]
+        columns[1][row] = send_time
+        columns[2][row] = rpc_start - compute_start
+        columns[3][row] = rpc_end - rpc_start
+        for field, series in self._command_series:
+            columns[field][row] = series[index]
+        return send_time
+
+    async def _sample_state(self, kos, data_dict, scheduler, current_time):
+        """Read the state of all joints in one batched request and log it."""
+        rpc_start = time.perf_counter()
+        completed, response = await self._bounded(
+            kos.actuator.get_actuators_state(self.actuator_ids), scheduler)
+        rpc_dur = time.perf_counter() - rpc_start
+        system = self._system_name(data_dict)
+        if completed and response.states:
+            self._consecutive_misses[system] = 0
+            self._log_actuator_state(response, data_dict, current_time, rpc_dur)
+            self._check_tracking(system, current_time)
+            return
+
+        if not completed:
+            self.rpc_misses[system]["state"] += 1
+            self._consecutive_misses[system] += 1
+            if (self.config.stale_policy == "abort"
+                    and self._consecutive_misses[system] >= self.config.max_misses):
+                raise TimeoutError(f"{system} state reads missed "
+                                   f"{self._consecutive_misses[system]} consecutive deadlines")
+        self._log_missed_state(data_dict, current_time, rpc_dur)
+
+    def _log_missed_state(self, data_dict, current_time, rpc_dur):
+        """Log a state read that missed its deadline or returned nothing,
+        according to the stale policy: repeat the last sample, or record a
+        gap (NaN, also used by the abort policy). Either way the sample is
+        flagged invalid.
+        """
+        states = data_dict.recorders["states"]
+        reuse = self.config.stale_policy == "reuse" and len(states) > 0
+        row = states.claim()
+        columns = states.columns
+        columns[0][row] = self._log_time(data_dict, current_time)
+        columns[1][row] = rpc_dur
+        columns[2][row] = 0
+        for column in columns[3:]:
+            column[row] = column[row - 1] if reuse else np.nan
+
+    def _start_tracking(self):
+        """New streaming tracking monitors for every active system."""
+        self.tracking = {
+            system: tracking.TrackingMonitor(self.actuator_ids, self._tracking_cycle(),
+                                             self.config.abort_error)
+            for system in self._active_data()
+        }
+        self.sweep = {}
+        if self.config.test == "chirp":
+            self.sweep = {
+                system: sweep.SweepMonitor(self.actuator_ids, self.config.chirp_init_freq,
+                                           self.config.chirp_sweep_rate, self.config.start_pos,
+                                           self.config.sweep_cycles, self.config.sweep_max_gain,
+                                           self.config.sweep_min_gain, self.config.sweep_max_lag)
+                for system in self._active_data()
+            }
+        self.aborted = None
+        self._command_index = {}
+        self._next_readout = 0.0
+        # State samples after the last command tick are not compared
+        self._cmd_end = self._cmd_time[-1] + 1.0 / self.config.sample_rate if self._cmd_time else 0.0
+
+    def _tracking_cycle(self):
+        """Cycle length of the tracking monitors: the test's period where it has one."""
+        if self.config.tracking_cycle:
+            return self.config.tracking_cycle
+        if self.config.test == "sine" and self.config.freq:
+            return 1.0 / self.config.freq
+        if self.config.test == "sin_sin" and not self.config.random and self.config.freq1:
+            return 1.0 / min(self.config.freq1, self.config.freq2 or self.config.freq1)
+        if self.config.test == "step" and self.config.step_hold_time:
+            # One step out and back
+            return 2.0 * self.config.step_hold_time
+        return tracking.DEFAULT_CYCLE
+
+    def _check_tracking(self, system, current_time):
+        """Stop the run if a system's tracking diverged or its sweep crossed a
+        limit, and refresh the live readout."""
+        monitor = self.tracking.get(system)
+        if monitor is not None and monitor.diverged and self.aborted is None:
+            self.aborted = f"{system} tracking diverged, {monitor.diverged}"
+        estimator = self.sweep.get(system)
+        if estimator is not None and estimator.stopped and self.aborted is None:
+            self.aborted = f"{system} sweep limit, {estimator.stopped}"
+        if self.config.live and current_time >= self._next_readout:
+            self._next_readout = current_time + LIVE_INTERVAL
+            readout = " | ".join(
+                f"{name}: {monitor.readout()}"
+                + (f" {self.sweep[name].readout()}" if name in self.sweep else "")
+                for name, monitor in self.tracking.items())
+            print(f"\rt={current_time:6.1f}s  {readout}", end="", flush=True)
+
+    def online_tracking(self) -> Dict:
+        """Streaming tracking metrics of the last test per system.
+
+        Returns:
+            dict: Cycle length and, per system, the metrics of the primary
+                joint (see tracking.TrackingMonitor.summary) with the other
+                joints of a batched test under 'joints'; empty if no test ran
+        """
+        result = {}
+        for system, monitor in self.tracking.items():
+            result["cycle"] = monitor.cycle
+            result[system] = monitor.summary()
+            if len(self.actuator_ids) > 1:
+                result[system]["joints"] = {
+                    str(aid): monitor.summary(j) for j, aid in enumerate(self.actuator_ids)
+                }
+        return result
+
+    def sweep_response(self, system: str) -> Dict:
+        """Streaming frequency response of a system's last chirp.
+
+        Returns:
+            dict: Response of the primary joint (see sweep.SweepMonitor.response)
+                with the other joints of a batched test under 'joints'; empty
+                if no chirp ran
+        """
+        estimator = self.sweep.get(system)
+        if estimator is None:
+            return {}
+        result = estimator.response()
+        if len(self.actuator_ids) > 1:
+            result["joints"] = {str(aid): estimator.response(j)
+                                for j, aid in enumerate(self.actuator_ids)}
+        return result
+
+    def _log_time(self, data_dict, current_time):
+        """Sample timestamp, shifted by the stream delay for sim data."""
+        if data_dict is self.sim_data:
+            return current_time + self.config.stream_delay
+        return current_time
+
+    async def _run_loop(self, kos_configs, joint_waveforms, total_duration):
+        """Run the timed test loop.
+
+        Args:
+            kos_configs: List of (KOS, is_real) tuples for active systems
+            joint_waveforms (dict): Compiled command trajectory per actuator
+                ID, indexed by scheduler tick
+            total_duration (float): Test duration including logging pad (s)
+        """
+        self.reference = joint_waveforms
+        # Plain lists index faster than arrays inside the loop
+        self._cmd_time = joint_waveforms[self.actuator_ids[0]].time.tolist()
+        self._cmd_pos = [joint_waveforms[aid].position.tolist() for aid in self.actuator_ids]
+        self._cmd_vel = [joint_waveforms[aid].velocity.tolist() for aid in self.actuator_ids]
+        # Request payloads are built once per system and updated in place
+        self._payloads = {
+            kos: [{'actuator_id': aid, 'position': 0.0} for aid in self.actuator_ids]
+            for kos, _ in kos_configs
+        }
+        # Commands recorder field of each command series
+        self._command_series = [
+            (4 + 2 * j + k, series)
+            for j, pair in enumerate(zip(self._cmd_pos, self._cmd_vel))
+            for k, series in enumerate(pair)
+        ]
+        # Reused per system on every state sample: position, velocity,
+        # command in effect and position and velocity error per joint
+        joints = len(self.actuator_ids)
+        self._samples = {
+            system: tuple([np.nan] * joints for _ in range(5))
+            for system in self._active_data()
+        }
+        # Reserve recorder rows for the whole run, or for one journal chunk
+        max_rate = max(self.config.sample_rate, self.config.state_rate or 0.0)
+        capacity = int(np.ceil(total_duration * max_rate)) + 1
+        if self.config.journal:
+            capacity = min(capacity, self.config.journal_chunk + 1)
+            self._open_journal()
+        for data_dict in self._active_data().values():
+            data_dict.reserve(capacity)
+        # Analysis of a previous run does not apply to the new recording
+        self.analysis = {}
+        self._start_tracking()
+        if self.config.telemetry:
+            self._telemetry = telemetry.TelemetryPublisher(
+                self.config.telemetry, records=len(self.actuator_ids),
+                robot=self.config.telemetry_robot,
+                name=self.config.name if self.config.telemetry_robot else None)
+            print(f"Publishing telemetry to {self.config.telemetry} (view with `ktune watch`)")
+
+        finished = False
+        try:
+            with self._realtime():
+                blocks_start = sys.getallocatedblocks()
+                if self.config.pipeline:
+                    scheduler, tasks = await self._run_pipelined(kos_configs, total_duration)
+                else:
+                    scheduler, tasks = await self._run_sequential(kos_configs, total_duration), None
+                alloc_blocks = sys.getallocatedblocks() - blocks_start
+            finished = True
+        finally:
+            # Also runs on errors and Ctrl-C, so the journal keeps every sample
+            if self._journal is not None:
+                try:
+                    self._close_journal()
+                except OSError as e:
+                    if finished:
+                        raise
+                    # Keep the error that stopped the loop
+                    print(f"Warning: could not close journal {self.journal_path}: {e}")
+            if self.config.live:
+                # End the live readout line
+                print()
+            if self._telemetry is not None:
+                self._telemetry.close()
+                self._telemetry = None
+        if self.aborted:
+            print(f"\nTest stopped early: {self.aborted}")
+
+        if self.config.journal:
+            # Only the last chunk stayed in memory; reload the whole run
+            self._load_recording(journal.recover(self.journal_path))
+        self._report_timing(scheduler, tasks=tasks, alloc_blocks=alloc_blocks)
+
+    async def _run_sequential(self, kos_configs, total_duration):
+        """Run the test with command and state read in turn on every tick.
+
+        Returns:
+            Scheduler: Scheduler that paced the loop
+        """
+        n_commands = len(self._cmd_time)
+        scheduler = self._new_scheduler(self.config.sample_rate)
+        dispatchers = self._start_dispatchers(kos_configs, scheduler) if len(kos_configs) > 1 else []
+        scheduler.start()
+        current_time = 0.0
+
+        try:
+            while current_time < total_duration and self.aborted is None:
+                current_time = scheduler.elapsed()
+                index = scheduler.tick
+                if index < n_commands:
+                    # Command active systems
+                    await self._command_systems(kos_configs, scheduler, index, current_time)
+
+                await scheduler.wait()
+        finally:
+            for task in dispatchers:
+                task.cancel()
+            self._dispatchers = None
+            self._dispatch_tasks = None
+
+        return scheduler
+
+    def _new_scheduler(self, rate):
+        """Scheduler for the test loop, spinning before deadlines in realtime mode."""
+        return Scheduler(rate, spin=SPIN_WINDOW if self.config.realtime else 0.0)
+
+    def _realtime(self):
+        """Low-jitter section for the measured window (a no-op unless realtime)."""
+        return Realtime(self.config.realtime, cpu=self.config.realtime_cpu,
+                        priority=self.config.realtime_priority)
+
+    async def _run_pipelined(self, kos_configs, total_duration):
+        """Run the test with a separate command writer and state sampler task
+        per system, each paced by its own scheduler on a shared time base.
+
+        Commands are no longer held back by the preceding state read, and the
+        state rate can be set independently with state_rate.
+
+        Returns:
+            tuple: Primary scheduler and the schedulers of all tasks by name
+        """
+        state_rate = self.config.state_rate or self.config.sample_rate
+        tasks = {}
+        coroutines = []
+        for kos, is_real in kos_configs:
+            system = "real" if is_real else "sim"
+            command_scheduler = self._new_scheduler(self.config.sample_rate)
+            state_scheduler = self._new_scheduler(state_rate)
+            tasks[f"{system}_command"] = command_scheduler
+            tasks[f"{system}_state"] = state_scheduler
+            coroutines.append(self._command_writer(kos, is_real, command_scheduler,
+                                                   total_duration))
+            coroutines.append(self._state_sampler(kos, is_real, state_scheduler,
+                                                  total_duration))
+
+        origin = time.monotonic()
+        for scheduler in tasks.values():
+            scheduler.start(origin)
+        await asyncio.gather(*coroutines)
+
+        primary = next(iter(tasks.values()))
+        return primary, tasks
+
+    async def _command_writer(self, kos, is_real, scheduler, total_duration):
+        """Pipelined task sending commands on its own deadlines."""
+        data_dict = self.real_data if is_real else self.sim_data
+        n_commands = len(self._cmd_time)
+        current_time = 0.0
+        while current_time < total_duration and self.aborted is None:
+            current_time = scheduler.elapsed()
+            index = scheduler.tick
+            if index < n_commands:
+                await self._send_command(kos, data_dict, scheduler, index)
+            await scheduler.wait()
+
+    async def _state_sampler(self, kos, is_real, scheduler, total_duration):
+        """Pipelined task reading state on its own deadlines."""
+        data_dict = self.real_data if is_real else self.sim_data
+        current_time = 0.0
+        while current_time < total_duration and self.aborted is None:
+            current_time = scheduler.elapsed()
+            await self._sample_state(kos, data_dict, scheduler, current_time)
+            await scheduler.wait()
+
+    def _report_timing(self, scheduler, tasks=None, alloc_blocks=None):
+        """Store and print achieved loop timing.
+
+        Args:
+            scheduler: Scheduler that paced the test loop
+            tasks (dict, optional): Schedulers of the pipelined tasks by name
+            alloc_blocks (int, optional): Net memory blocks allocated while
+                the loop ran
+        """
+        self.timing = scheduler.stats()
+        if alloc_blocks is not None:
+            self.timing["alloc_blocks_per_tick"] = alloc_blocks / max(self.timing["ticks"], 1)
+        if self.config.rpc_deadline:
+            self.timing["rpc_misses"] = {
+                system: misses for system, misses in self.rpc_misses.items()
+                if (system == "sim" and self.sim_data is not None)
+                or (system == "real" and self.real_data is not None)
+            }
+        if tasks:
+            self.timing["tasks"] = {name: task.stats() for name, task in tasks.items()}
+            self.loop_latency = {name: task.latency_columns() for name, task in tasks.items()}
+        else:
+            self.loop_latency = {"loop": scheduler.latency_columns()}
+        self.latency = latency.summarize(self._active_data(), self.loop_latency)
+        if self.send_skew:
+            skew = np.array(self.send_skew) * 1000.0
+            self.timing["send_skew_ms"] = {
+                "mean": float(np.mean(skew)),
+                "p95": float(np.percentile(skew, 95)),
+                "max": float(np.max(skew))
+            }
+        print("\nLoop Timing:")
+        if self.timing["achieved_rate"] is not None:
+            print(f"Achieved Rate: {self.timing['achieved_rate']:.1f} Hz "
+                  f"(target: {self.timing['target_rate']} Hz)")
+            print(f"Jitter: {self.timing['jitter_ms']:.2f}ms, "
+                  f"max interval: {self.timing['max_interval_ms']:.2f}ms")
+        print(f"Overruns: {self.timing['overruns']}, "
+              f"skipped ticks: {self.timing['skipped_ticks']}")
+        if "alloc_blocks_per_tick" in self.timing:
+            print(f"Allocations: {self.timing['alloc_blocks_per_tick']:.2f} blocks/tick")
+        for system, misses in self.timing.get("rpc_misses", {}).items():
+            print(f"Missed RPC deadlines ({system}): {misses['command']} commands, "
+                  f"{misses['state']} state reads ({self.config.stale_policy} policy)")
+        for name, stats in self.timing.get("tasks", {}).items():
+            if stats["achieved_rate"] is not None:
+                print(f"  {name}: {stats['achieved_rate']:.1f} Hz "
+                      f"(target: {stats['target_rate']} Hz), "
+                      f"jitter {stats['jitter_ms']:.2f}ms")
+        if "send_skew_ms" in self.timing:
+            print(f"Sim/Real send skew: mean {self.timing['send_skew_ms']['mean']:.3f}ms, "
+                  f"max {self.timing['send_skew_ms']['max']:.3f}ms")
+        latency.print_summary(self.latency)
+
+    def _log_actuator_state(self, response, data_dict, current_time, rpc_dur):
         """Log actuator state data with normalized time.
         
         Args:
             response: Actuator state response
             data_dict: Dictionary to store data
             current_time: Current normalized time (seconds from start)
+            rpc_dur: Duration of the state request (seconds)
         """
-        if response.states:
-            state = response.states[0]
-            log_time = current_time
-            if data_dict is self.sim_data:
-                log_time = current_time + self.config.stream_delay
+        system = self._system_name(data_dict)
+        positions, velocities, commanded, position_errors, velocity_errors = self._samples[system]
+        # A joint missing from the response is recorded as NaN
+        for j in range(len(positions)):
+            positions[j] = velocities[j] = np.nan
+        joint_index = self._joint_index
+        for state in response.states:
+            j = joint_index.get(state.actuator_id)
+            if j is None:
+                continue
             if state.position is not None:
-                data_dict["position"].append(state.position)
+                positions[j] = state.position
             if state.velocity is not None:
-                data_dict["velocity"].append(state.velocity)
-            data_dict["time"].append(log_time)
+                velocities[j] = state.velocity
+
+        # Written in place into the recorder
+        states = data_dict.recorders["states"]
+        row = states.claim()
+        columns = states.columns
+        columns[0][row] = self._log_time(data_dict, current_time)
+        columns[1][row] = rpc_dur
+        columns[2][row] = 1
+        field = 3
+        for position, velocity in zip(positions, velocities):
+            columns[field][row] = position
+            columns[field + 1][row] = velocity
+            field += 2
+
+        # Compare with the command in effect while commands are being sent
+        index = self._command_index.get(system)
+        if index is not None and current_time > self._cmd_end:
+            index = None
+        if index is not None:
+            for j in range(len(positions)):
+                commanded[j] = self._cmd_pos[j][index]
+                position_errors[j] = commanded[j] - positions[j]
+                velocity_errors[j] = self._cmd_vel[j][index] - velocities[j]
+            self.tracking[system].update(current_time, position_errors, velocity_errors)
+            if self.sweep:
+                self.sweep[system].update(current_time, self._cmd_time[index], commanded,
+                                          positions)
+        if self._telemetry is not None:
+            self._publish(system, current_time, positions, velocities,
+                          commanded if index is not None else None)
+
+    def _publish(self, system, current_time, positions, velocities, commanded):
+        """Send a state sample to the telemetry viewer, one record per joint.
+
+        Args:
+            commanded (list): Command in effect per joint, None if there is none
+        """
+        source = telemetry.REAL if system == "real" else telemetry.SIM
+        for j, aid in enumerate(self.actuator_ids):
+            command = commanded[j] if commanded is not None else np.nan
+            self._telemetry.pack(j, source, aid, current_time, positions[j], velocities[j],
+                                 command)
+        self._telemetry.send(len(self.actuator_ids))
 
     
 
@@ -372,8 +1083,8 @@ class Tune:
             
             for step_num in range(self.config.step_count):
                 # Generate random step size
-                step_size = random.uniform(self.config.step_min, self.config.step_max)
-                direction = random.choice([-1, 1])
+                step_size = self.random.uniform(self.config.step_min, self.config.step_max)
+                direction = self.random.choice([-1, 1])
                 
                 # Check if we need to force direction to stay within limits
                 proposed_total = current_total + (step_size * direction)
@@ -405,61 +1116,20 @@ class Tune:
             kos_configs.append((self.real_kos, True))
 
         # Configure each active KOS instance
-        for kos, is_real in kos_configs:
-            # Select gains based on system type
-            if is_real:
-                kp, kd, ki = (self.config.kp, self.config.kd, self.config.ki)
-            else:
-                kp, kd, ki = (self.config.sim_kp, self.config.sim_kd, 0.0)
-            print(f"kp: {kp}, kd: {kd}, ki: {ki} is_real: {is_real}")
-            await kos.actuator.configure_actuator(
-                actuator_id=self.config.actuator_id,
-                kp=kp, kd=kd, ki=ki,
-                acceleration=self.config.acceleration,
-                max_torque=self.config.max_torque,
-                torque_enabled=not self.config.torque_off
-            )
+        await self._configure_actuators(kos_configs)
 
         # Move to start position and wait for settling
         await self._move_to_start_position(kos_configs)
 
+        step_size = self.config.step_max if self.config.random else self.config.step_size
+        joint_waveforms = self._compile_joint_waveforms(
+            lambda phase: waveforms.compile_steps(steps, self.config.sample_rate,
+                                                  self.config.start_pos),
+            base_amp=step_size
+        )
+
         # Start test
-        start_time = time.time()
-        current_time = 0.0
-        step_idx = 0
-
-        while current_time < total_duration:
-            current_time = time.time() - start_time
-
-            # Determine current step target
-            while (step_idx < len(steps) and 
-                current_time > sum(step[2] for step in steps[:step_idx + 1])):
-                step_idx += 1
-
-            if step_idx < len(steps):
-                target_pos = steps[step_idx][0] + self.config.start_pos
-
-                # Command active systems
-                for kos, is_real in kos_configs:
-                    data_dict = self.real_data if is_real else self.sim_data
-                    # Send command
-                    await kos.actuator.command_actuators([{
-                        'actuator_id': self.config.actuator_id,
-                        'position': target_pos,
-                    }])
-                    
-                    # Log command
-                    data_dict["cmd_time"].append(current_time)
-                    data_dict["cmd_pos"].append(target_pos)
-                    data_dict["cmd_vel"].append(0.0)  # No velocity command for steps
-
-                    # Get and log state
-                    response = await kos.actuator.get_actuators_state(
-                        [self.config.actuator_id]
-                    )
-                    self._log_actuator_state(response, data_dict, current_time)
-
-            await asyncio.sleep(1.0 / self.config.sample_rate)
+        await self._run_loop(kos_configs, joint_waveforms, total_duration)
 
 
     async def _run_sine_test(self):
@@ -477,80 +1147,27 @@ class Tune:
             kos_configs.append((self.real_kos, True))
 
         # Configure each active KOS instance
-        for kos, is_real in kos_configs:
-            # Select gains based on system type
-            if is_real:
-                kp, kd, ki = (self.config.kp, self.config.kd, self.config.ki)
-            else:
-                kp, kd, ki = (self.config.sim_kp, self.config.sim_kd, 0.0)
-
-            await kos.actuator.configure_actuator(
-                actuator_id=self.config.actuator_id,
-                kp=kp, kd=kd, ki=ki,
-                acceleration=self.config.acceleration,
-                max_torque=self.config.max_torque,
-                torque_enabled=not self.config.torque_off
-            )
+        await self._configure_actuators(kos_configs)
 
         # Move to start position and wait for settling
         await self._move_to_start_position(kos_configs)
 
-        # Start test
-        start_time = time.time()
-        current_time = 0.0
-
-        while current_time < total_duration:
-            current_time = time.time() - start_time
+        joint_waveforms = self._compile_joint_waveforms(
+            lambda phase: waveforms.compile_sine(self.config.amp, self.config.freq,
+                                                 self.config.duration, self.config.sample_rate,
+                                                 self.config.start_pos, phase=phase),
+            base_amp=self.config.amp
+        )
 
-            if current_time <= self.config.duration:
-                # Calculate sine wave position and velocity
-                omega = 2.0 * math.pi * self.config.freq
-                phase = omega * current_time
-                
-                target_pos = (self.config.amp * math.sin(phase) + 
-                            self.config.start_pos)
-                target_vel = self.config.amp * omega * math.cos(phase)
-
-                # Command active systems
-                for kos, is_real in kos_configs:
-                    data_dict = self.real_data if is_real else self.sim_data
-                    # Send command with both position and velocity
-                    await kos.actuator.command_actuators([{
-                        'actuator_id': self.config.actuator_id,
-                        'position': target_pos,
-                    }])
-                    
-                    # Log command
-                    data_dict["cmd_time"].append(current_time)
-                    data_dict["cmd_pos"].append(target_pos)
-                    data_dict["cmd_vel"].append(target_vel)
-
-                    # Get and log state
-                    response = await kos.actuator.get_actuators_state(
-                        [self.config.actuator_id]
-                    )
-                    self._log_actuator_state(response, data_dict, current_time)
-
-            await asyncio.sleep(1.0 / self.config.sample_rate)
+        # Start test
+        await self._run_loop(kos_configs, joint_waveforms, total_duration)
 
         # Calculate tracking metrics only for active systems
         if self.mode in ['compare', 'sim']:
-            sim_error = metrics.compute_tracking_error(
-                self.sim_data["cmd_time"],
-                self.sim_data["cmd_pos"],
-                self.sim_data["time"],
-                self.sim_data["position"]
-            )
-            print(f"Sim RMS Error: {sim_error:.3f}°")
+            print(f"Sim RMS Error: {self.analysis_context('sim').rms_error():.3f}°")
 
         if self.mode in ['compare', 'real']:
-            real_error = metrics.compute_tracking_error(
-                self.real_data["cmd_time"],
-                self.real_data["cmd_pos"],
-                self.real_data["time"],
-                self.real_data["position"]
-            )
-            print(f"Real RMS Error: {real_error:.3f}°")
+            print(f"Real RMS Error: {self.analysis_context('real').rms_error():.3f}°")
 
 
     async def _run_sin_sin_test(self):
@@ -559,15 +1176,12 @@ class Tune:
 
         if self.config.random:
             print("Running sin_sin test with random parameters")
-            if self.config.seed is not None:
-                random.seed(self.config.seed)
-
             def generate_random_params():
                 return {
-                    'freq1': random.uniform(self.config.freq_min, self.config.freq_max),
-                    'freq2': random.uniform(self.config.freq_min, self.config.freq_max),
-                    'amp1': random.uniform(self.config.amp_min, self.config.amp_max),
-                    'amp2': random.uniform(self.config.amp_min, self.config.amp_max)
+                    'freq1': self.random.uniform(self.config.freq_min, self.config.freq_max),
+                    'freq2': self.random.uniform(self.config.freq_min, self.config.freq_max),
+                    'amp1': self.random.uniform(self.config.amp_min, self.config.amp_max),
+                    'amp2': self.random.uniform(self.config.amp_min, self.config.amp_max)
                 }
             
             # Generate initial random parameters
@@ -596,127 +1210,45 @@ class Tune:
             kos_configs.append((self.real_kos, True))
 
         # Configure each active KOS instance
-        for kos, is_real in kos_configs:
-            # Select gains based on system type
-            if is_real:
-                kp, kd, ki = (self.config.kp, self.config.kd, self.config.ki)
-            else:
-                kp, kd, ki = (self.config.sim_kp, self.config.sim_kd, 0.0)
-
-            await kos.actuator.configure_actuator(
-                actuator_id=self.config.actuator_id,
-                kp=kp, kd=kd, ki=ki,
-                acceleration=self.config.acceleration,
-                max_torque=self.config.max_torque,
-                torque_enabled=not self.config.torque_off
-            )
+        await self._configure_actuators(kos_configs)
 
         # Move to start position and wait for settling
         await self._move_to_start_position(kos_configs)
 
-        # seconds to transition between parameter sets
-        transition_time = 3
+        # Parameter set k is active from k * random_reset onwards
+        param_sets = [random_params]
+        reset_interval = None
+        if self.config.random and self.config.random_reset is not None:
+            reset_interval = self.config.random_reset
+            while len(param_sets) * reset_interval <= self.config.duration:
+                param_sets.append(generate_random_params())
+                new_params = param_sets[-1]
+                print(f"\nRandom parameters from t={(len(param_sets) - 1) * reset_interval:.1f}s:")
+                print(f"freq1: {new_params['freq1']:.2f} Hz")
+                print(f"freq2: {new_params['freq2']:.2f} Hz")
+                print(f"amp1: {new_params['amp1']:.2f}°")
+                print(f"amp2: {new_params['amp2']:.2f}°")
+
+        # 3 seconds to transition between parameter sets
+        joint_waveforms = self._compile_joint_waveforms(
+            lambda phase: waveforms.compile_sin_sin(param_sets, self.config.duration,
+                                                    self.config.sample_rate,
+                                                    self.config.start_pos,
+                                                    reset_interval=reset_interval,
+                                                    transition_time=3.0, phase=phase),
+            base_amp=param_sets[0]['amp1']
+        )
 
         # Start test
-        start_time = time.time()
-        current_time = 0.0
-        last_reset_time = 0.0
-        old_params = None
-        transition_start = 0.0
-        is_transitioning = False
-        current_params = random_params
-        
-        while current_time < total_duration:
-            current_time = time.time() - start_time
-            if (self.config.random and self.config.random_reset is not None and 
-                current_time - last_reset_time >= self.config.random_reset):
-                old_params = random_params.copy()
-                random_params = generate_random_params()
-                last_reset_time = current_time
-                transition_start = current_time
-                is_transitioning = True
-                print(f"\nNew random parameters at t={current_time:.1f}s:")
-                print(f"freq1: {random_params['freq1']:.2f} Hz")
-                print(f"freq2: {random_params['freq2']:.2f} Hz")
-                print(f"amp1: {random_params['amp1']:.2f}°")
-                print(f"amp2: {random_params['amp2']:.2f}°")
-
-
-            if is_transitioning and old_params is not None:
-            # Calculate transition progress (0 to 1)
-                progress = min((current_time - transition_start) / transition_time, 1.0)
-                
-                # Use smooth step function for transition
-                blend = progress * progress * (3 - 2 * progress)  # Smooth step function
-                
-                # Blend parameters
-                current_params = {
-                    'freq1': old_params['freq1'] + (random_params['freq1'] - old_params['freq1']) * blend,
-                    'freq2': old_params['freq2'] + (random_params['freq2'] - old_params['freq2']) * blend,
-                    'amp1': old_params['amp1'] + (random_params['amp1'] - old_params['amp1']) * blend,
-                    'amp2': old_params['amp2'] + (random_params['amp2'] - old_params['amp2']) * blend
-                }
-                
-                # End transition when complete
-                if progress >= 1.0:
-                    is_transitioning = False
-            else:
-                current_params = random_params
-
-            if current_time <= self.config.duration:
-                # Calculate superposition of two sine waves using current_params
-                omega1 = 2.0 * math.pi * current_params['freq1']
-                omega2 = 2.0 * math.pi * current_params['freq2']
-                phase1 = omega1 * current_time
-                phase2 = omega2 * current_time
-                
-                target_pos = (current_params['amp1'] * math.sin(phase1) +
-                            current_params['amp2'] * math.sin(phase2) +
-                            self.config.start_pos)
-                
-                target_vel = (current_params['amp1'] * omega1 * math.cos(phase1) +
-                            current_params['amp2'] * omega2 * math.cos(phase2))
-
-                # Command active systems
-                for kos, is_real in kos_configs:
-                    data_dict = self.real_data if is_real else self.sim_data
-                    # Send command with both position and velocity
-                    await kos.actuator.command_actuators([{
-                        'actuator_id': self.config.actuator_id,
-                        'position': target_pos,
-                    }])
-                    
-                    # Log command
-                    data_dict["cmd_time"].append(current_time)
-                    data_dict["cmd_pos"].append(target_pos)
-                    data_dict["cmd_vel"].append(target_vel)
-
-                    # Get and log state
-                    response = await kos.actuator.get_actuators_state(
-                        [self.config.actuator_id]
-                    )
-                    self._log_actuator_state(response, data_dict, current_time)
-
-            await asyncio.sleep(1.0 / self.config.sample_rate)
+        await self._run_loop(kos_configs, joint_waveforms, total_duration)
 
         # Calculate tracking metrics only for active systems
         if self.mode in ['compare', 'sim']:
-            sim_error = metrics.compute_tracking_error(
-                self.sim_data["cmd_time"],
-                self.sim_data["cmd_pos"],
-                self.sim_data["time"],
-                self.sim_data["position"]
-            )
-            print(f"Sim RMS Error: {sim_error:.3f}°")
+            print(f"Sim RMS Error: {self.analysis_context('sim').rms_error():.3f}°")
 
         if self.mode in ['compare', 'real']:
-            real_error = metrics.compute_tracking_error(
-                self.real_data["cmd_time"],
-                self.real_data["cmd_pos"],
-                self.real_data["time"],
-                self.real_data["position"]
-            )
-            print(f"Real RMS Error: {real_error:.3f}°")
+            print(f"Real RMS Error: {self.analysis_context('real').rms_error():.3f}°")
+
     async def _run_chirp_test(self):
         """Run chirp test on both sim and real systems"""
         self._print_test_config()
@@ -731,123 +1263,69 @@ class Tune:
             kos_configs.append((self.real_kos, True))
 
         # Configure each active KOS instance
-        for kos, is_real in kos_configs:
-            # Select gains based on system type
-            if is_real:
-                kp, kd, ki = (self.config.kp, self.config.kd, self.config.ki)
-            else:
-                kp, kd, ki = (self.config.sim_kp, self.config.sim_kd, 0.0)
-            print(f"acceleration: {self.config}******************")
-            config = {
-                'torque_enabled': not self.config.torque_off,
-                'kp': kp,
-                'kd': kd,
-                'ki': ki,
-                'max_torque': self.config.max_torque,
-                'acceleration': self.config.acceleration  # Make sure this is included
-            }
-            await kos.actuator.configure_actuator(
-                actuator_id=self.config.actuator_id,
-                **config
-            )
+        await self._configure_actuators(kos_configs)
 
         # Move to start position and wait for settling
         await self._move_to_start_position(kos_configs)
 
-        # Start test
-        start_time = time.time()
-        current_time = 0.0
+        joint_waveforms = self._compile_joint_waveforms(
+            lambda phase: waveforms.compile_chirp(self.config.chirp_amp,
+                                                  self.config.chirp_init_freq,
+                                                  self.config.chirp_sweep_rate,
+                                                  self.config.chirp_duration,
+                                                  self.config.sample_rate,
+                                                  self.config.start_pos, phase=phase),
+            base_amp=self.config.chirp_amp
+        )
 
-        while current_time < total_duration:
-            current_time = time.time() - start_time
+        # Start test
+        await self._run_loop(kos_configs, joint_waveforms, total_duration)
+
+        # The streaming estimate is complete as soon as the sweep ends
+        for system, estimator in self.sweep.items():
+            estimator.finish()
+            response = self.sweep_response(system)
+            self._active_data()[system]["sweep_response"] = response
+            if response["freq"]:
+                bandwidth = metrics.compute_bandwidth(response["freq"], response["magnitude"])
+                bandwidth = f"{bandwidth:.1f} Hz" if bandwidth else "not reached"
+                print(f"\n{system.capitalize()} sweep estimate: {len(response['freq'])} points, "
+                      f"{response['freq'][0]:.2f}-{response['freq'][-1]:.2f} Hz, "
+                      f"bandwidth (-3dB) {bandwidth}")
 
-            if current_time <= self.config.chirp_duration:
-                # Calculate chirp signal
-                f0 = self.config.chirp_init_freq
-                k = self.config.chirp_sweep_rate
-                phase = 2.0 * math.pi * (f0 * current_time + 
-                                    0.5 * k * current_time * current_time)
-                
-                # Instantaneous frequency and angular velocity
-                freq = f0 + k * current_time
-                omega = 2.0 * math.pi * freq
-                
-                # Calculate position and velocity
-                target_pos = (self.config.chirp_amp * math.sin(phase) + 
-                            self.config.start_pos)
-                target_vel = self.config.chirp_amp * omega * math.cos(phase)
-
-                # Command active systems
-                for kos, is_real in kos_configs:
-                    data_dict = self.real_data if is_real else self.sim_data
-                    # Send command with both position and velocity
-                    await kos.actuator.command_actuators([{
-                        'actuator_id': self.config.actuator_id,
-                        'position': target_pos,
-                    }])
-                    
-                    # Log command
-                    data_dict["cmd_time"].append(current_time)
-                    data_dict["cmd_pos"].append(target_pos)
-                    data_dict["cmd_vel"].append(target_vel)
-
-                    # Get and log state
-                    response = await kos.actuator.get_actuators_state(
-                        [self.config.actuator_id]
-                    )
-                    self._log_actuator_state(response, data_dict, current_time)
-
-            await asyncio.sleep(1.0 / self.config.sample_rate)
-        
         # Compute frequency response only for active systems
-        if self.mode in ['compare', 'sim']:
-            try:
-                freq_response = metrics.analyze_frequency_response(self.sim_data)
-                sim_freq_response = freq_response.get('sim', {})
-                self.sim_data["freq_response"] = sim_freq_response
-                print("\nSim Frequency Response Data:")
-                if sim_freq_response:
-                    print(f"Frequencies: {len(sim_freq_response.get('freq', []))}")
-                    sim_mag = sim_freq_response.get('magnitude', [])
-                    if sim_mag:
-                        print(f"Magnitude range: {min(sim_mag)} to {max(sim_mag)}")
-                        sim_bandwidth = metrics.compute_bandwidth(
-                            sim_freq_response["freq"], 
-                            sim_freq_response["magnitude"]
-                        )
-                        if sim_bandwidth:
-                            print(f"Bandwidth (-3dB): {sim_bandwidth:.1f} Hz")
-            except Exception as e:
-                print(f"Warning: Could not compute simulation frequency response: {e}")
+        for system, data_dict in self._active_data().items():
+            context = self.analysis_context(system)
+            response = context.frequency_response()
+            data_dict["freq_response"] = response
+            print(f"\n{system.capitalize()} Frequency Response Data:")
+            if response:
+                print(f"Frequencies: {len(response.get('freq', []))}")
+                magnitude = response.get('magnitude', [])
+                if len(magnitude):
+                    print(f"Magnitude range: {np.min(magnitude)} to {np.max(magnitude)}")
+                    bandwidth = context.bandwidth()
+                    if bandwidth:
+                        print(f"Bandwidth (-3dB): {bandwidth:.1f} Hz")
+
+    def save_and_plot_results(self, timestamp: Optional[str] = None,
+                              data_dir: Optional[str] = None, plot_dir: Optional[str] = None):
+        """Save data to files and generate plots
 
-        if self.mode in ['compare', 'real']:
-            try:
-                freq_response = metrics.analyze_frequency_response(self.real_data)
-                real_freq_response = freq_response.get('real', {})
-                self.real_data["freq_response"] = real_freq_response
-                print("\nReal Frequency Response Data:")
-                if real_freq_response:
-                    print(f"Frequencies: {len(real_freq_response.get('freq', []))}")
-                    real_mag = real_freq_response.get('magnitude', [])
-                    if real_mag:
-                        print(f"Magnitude range: {min(real_mag)} to {max(real_mag)}")
-                        real_bandwidth = metrics.compute_bandwidth(
-                            real_freq_response["freq"], 
-                            real_freq_response["magnitude"]
-                        )
-                        if real_bandwidth:
-                            print(f"Bandwidth (-3dB): {real_bandwidth:.1f} Hz")
-            except Exception as e:
-                print(f"Warning: Could not compute real system frequency response: {e}")
-
-    def save_and_plot_results(self):
-        """Save data to files and generate plots"""
+        Args:
+            timestamp (str, optional): Timestamp for file naming, defaults to now
+            data_dir (str, optional): Data directory, defaults to ./data
+            plot_dir (str, optional): Plot directory, defaults to ./plots
+
+        Returns:
+            dict: Saved data header, or None when logging is disabled
+        """
         if self.config.no_log:
-            return
+            return None
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        data_dir = os.path.join(os.getcwd(), "data")
-        plot_dir = os.path.join(os.getcwd(), "plots")
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        data_dir = data_dir or os.path.join(os.getcwd(), "data")
+        plot_dir = plot_dir or os.path.join(os.getcwd(), "plots")
         os.makedirs(data_dir, exist_ok=True)
         os.makedirs(plot_dir, exist_ok=True)
 
@@ -855,11 +1333,23 @@ class Tune:
         sim_data = self.sim_data if self.mode in ['compare', 'sim'] else {}  # Empty dict instead of None
         real_data = self.real_data if self.mode in ['compare', 'real'] else {}  # Empty dict instead of None
 
-        # Save data
-        logger = DataLog(self.config, sim_data, real_data)
-        logger.save_data(timestamp, data_dir)
+        # Metrics computed during the test are reused by the log and the plots
+        analysis = analysis_contexts(sim_data, real_data, self.analysis,
+                                     self.config.frf_segment, self.config.frf_overlap)
 
-        # Create plots
-        plotter = Plot(self.config, sim_data, real_data)
-        plotter.create_plots(timestamp, plot_dir)
+        # Save data
+        logger = DataLog(self.config, sim_data, real_data, timing=self.timing,
+                         latency=self.latency, loop_latency=self.loop_latency,
+                         reference=self.reference, actuator_ids=self.actuator_ids,
+                         joint_overrides=self.joint_overrides, analysis=analysis,
+                         online_tracking=self.online_tracking(), aborted=self.aborted,
+                         catalog_path=self.config.catalog)
+        header = logger.save_data(timestamp, data_dir)
+
+        # Create plots of the valid samples; deferred plots render in the background
+        self.plot_future = plotting.get_service(self.config.plots).submit(
+            plotting.render_tune_plots, self.config, sim_data, real_data,
+            timestamp, plot_dir, analysis
+        )
+        return header
 
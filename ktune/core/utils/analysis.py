@@ -0,0 +1,144 @@
+import numpy as np
+from ktune.core.utils import frf, metrics
+
+
+class AnalysisContext:
+    """Post-test analysis of one system's data, computed once and shared.
+
+    The state columns are resampled onto the command grid once and kept,
+    and every derived result (tracking metrics, statistics, step metrics,
+    frequency response, bandwidth) is memoized. Tune, DataLog and Plot all
+    read from the same context, so nothing is interpolated or printed
+    twice. The context pickles with its cache, so deferred plot workers
+    reuse the results too.
+
+    Example:
+        context = AnalysisContext(tune.sim_data, "sim")
+        context.tracking_metrics()["position"]["rms_error"]
+    """
+
+    def __init__(self, data, system: str = None, segment: int = None,
+                 overlap: float = frf.DEFAULT_OVERLAP):
+        """Initialize the context.
+
+        Args:
+            data (dict): Data dict of the system, or None for an inactive system
+            system (str, optional): 'sim' or 'real'
+            segment (int, optional): Welch segment length of the frequency response
+            overlap (float): Welch segment overlap as a fraction of the segment
+        """
+        self.source = data
+        self.system = system
+        self.segment = segment
+        self.overlap = overlap
+        # Metrics only see valid samples
+        self.data = metrics.valid_samples(data)
+        self._cache = {}
+
+    def _memoized(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def column(self, name: str) -> np.ndarray:
+        """A data column as an array (zero-copy for recorded columns)."""
+        return self._memoized(("column", name), lambda: np.asarray(self.data[name]))
+
+    def resampled(self, name: str) -> np.ndarray:
+        """A state column interpolated onto the command timestamps, NaN
+        where the command lies outside the sampled time range."""
+        return self._memoized(("resampled", name), lambda: metrics.resample(
+            self.column("time"), self.column(name), self.column("cmd_time")))
+
+    def tracking_metrics(self, actuator_id: int = None) -> dict:
+        """Position and velocity tracking errors on the command grid.
+
+        Args:
+            actuator_id (int, optional): Joint of a batched test, whose
+                columns carry its ID as suffix; None for the primary columns
+
+        Returns:
+            dict: Same layout as metrics.compute_tracking_metrics()
+        """
+        suffix = "" if actuator_id is None else f"_{actuator_id}"
+        return self._memoized(("tracking", suffix), lambda: self._tracking_metrics(suffix))
+
+    def _tracking_metrics(self, suffix):
+        position = self.resampled(f"position{suffix}")
+        valid = ~np.isnan(position)
+        if not np.any(valid):
+            return {}
+        result = {
+            "position": metrics.error_statistics(
+                self.column(f"cmd_pos{suffix}")[valid] - position[valid])
+        }
+        if f"cmd_vel{suffix}" in self.data and f"velocity{suffix}" in self.data:
+            velocity = self.resampled(f"velocity{suffix}")
+            valid = ~np.isnan(velocity)
+            if np.any(valid):
+                result["velocity"] = metrics.error_statistics(
+                    self.column(f"cmd_vel{suffix}")[valid] - velocity[valid])
+        return result
+
+    def rms_error(self) -> float:
+        """RMS position tracking error, NaN without overlapping samples."""
+        return self.tracking_metrics().get("position", {}).get("rms_error", float("nan"))
+
+    def data_statistics(self) -> dict:
+        """Position and velocity statistics (metrics.compute_data_statistics)."""
+        return self._memoized("statistics", lambda: metrics.compute_data_statistics(
+            self.column("time"), self.column("position"), self.column("velocity")))
+
+    def step_metrics(self) -> list:
+        """Response metrics of every step in the logged command
+        (metrics.compute_step_metrics); empty without data."""
+        def compute():
+            if not self.data or "cmd_pos" not in self.data:
+                return []
+            return metrics.compute_step_metrics(self.column("cmd_time"), self.column("cmd_pos"),
+                                                self.column("time"), self.column("position"))
+        return self._memoized("step", compute)
+
+    def frequency_response(self) -> dict:
+        """Frequency response from the position command to the recorded
+        channels: the one stored in the data (e.g. by a chirp test or in a
+        log), else estimated from the resampled columns (frf.tracking_frf)."""
+        def compute():
+            if self.data and "freq_response" in self.data:
+                return self.data["freq_response"]
+            if not self.data or "cmd_time" not in self.data or "position" not in self.data:
+                return {}
+            outputs = {name: self.resampled(name) for name in frf.CHANNELS if name in self.data}
+            return frf.tracking_frf(self.column("cmd_time"), self.column("cmd_pos"), outputs,
+                                    self.segment, self.overlap)
+        return self._memoized("freq_response", compute)
+
+    def bandwidth(self):
+        """-3 dB bandwidth of the frequency response in Hz, or None."""
+        def compute():
+            response = self.frequency_response()
+            if not response or not len(response.get("freq", [])):
+                return None
+            return metrics.compute_bandwidth(response["freq"], response["magnitude"])
+        return self._memoized("bandwidth", compute)
+
+
+def analysis_contexts(sim_data=None, real_data=None, analysis=None, segment: int = None,
+                      overlap: float = frf.DEFAULT_OVERLAP) -> dict:
+    """AnalysisContext per system, reusing the ones given.
+
+    Args:
+        sim_data (dict, optional): Simulation data
+        real_data (dict, optional): Real robot data
+        analysis (dict, optional): Existing contexts by system, e.g. Tune's
+        segment (int, optional): Welch segment length for new contexts
+        overlap (float): Welch segment overlap for new contexts
+
+    Returns:
+        dict: 'sim' and 'real' contexts
+    """
+    analysis = dict(analysis or {})
+    for system, data in (("sim", sim_data), ("real", real_data)):
+        if system not in analysis or analysis[system].source is not data:
+            analysis[system] = AnalysisContext(data, system, segment, overlap)
+    return analysis
@@ -0,0 +1,215 @@
+import json
+import os
+import struct
+from collections.abc import Mapping
+import numpy as np
+from ktune.core.utils.recorder import Recorder, ColumnMap
+
+# File signature, followed by the header length and the JSON header
+MAGIC = b"KTLOG01\n"
+HEADER_LENGTH = struct.Struct("<Q")
+# Column blocks start on this boundary, so every column is aligned for any dtype
+ALIGNMENT = 64
+# Shorter numeric lists (gains, actuator IDs, ...) stay in the JSON header
+MIN_COLUMN_LENGTH = 16
+EXTENSION = ".ktlog"
+
+
+def _column(value):
+    """Column array for a value stored as a raw block, or None for a value
+    that belongs in the header."""
+    if isinstance(value, np.ndarray):
+        if value.ndim == 1 and value.dtype.kind in "biuf":
+            return value
+        return None
+    if not isinstance(value, list) or len(value) < MIN_COLUMN_LENGTH:
+        return None
+    if all(isinstance(v, bool) for v in value):
+        return np.array(value, dtype=np.bool_)
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in value):
+        return np.array(value, dtype=np.int64)
+    # Lists with None (missing values) stay in the header, so they load unchanged
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value):
+        return np.array(value, dtype=np.float64)
+    return None
+
+
+def _table(value):
+    """Columns of a list of flat records with the same keys (e.g. the
+    'entries' of a sysid log), or None."""
+    if not isinstance(value, list) or len(value) < MIN_COLUMN_LENGTH:
+        return None
+    if not all(isinstance(v, Mapping) for v in value):
+        return None
+    keys = list(value[0])
+    if any(list(record) != keys for record in value):
+        return None
+    columns = {key: _column([record[key] for record in value]) for key in keys}
+    if any(column is None for column in columns.values()):
+        return None
+    return columns
+
+
+def _escape(key) -> str:
+    """Key as a column path segment; '~' and '/' are escaped as in a JSON
+    pointer, so any key survives the '/'-joined path."""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(segment: str) -> str:
+    return segment.replace("~1", "/").replace("~0", "~")
+
+
+def _split(data, path, columns, tables, aliases):
+    """Move column data out of a nested dict, returning what stays in the
+    header. Columns are collected by their '/'-joined key path, and the
+    aliases of each ColumnMap by its path."""
+    header = {}
+    for key, value in data.items():
+        key_path = f"{path}/{_escape(key)}" if path else _escape(key)
+        # Recorder-backed data: store each field as a column
+        if isinstance(value, Recorder):
+            value = {name: value[name] for name in value.names}
+        elif isinstance(value, ColumnMap):
+            # Aliases are stored once as names, not as copies of their columns
+            if value.aliases:
+                aliases[key_path] = dict(value.aliases)
+            value = {name: value[name] for name in value if name not in value.aliases}
+        column = _column(value)
+        if column is not None:
+            columns[key_path] = column
+            continue
+        table = _table(value)
+        if table is not None:
+            tables.append(key_path)
+            for name, table_column in table.items():
+                columns[f"{key_path}/{_escape(name)}"] = table_column
+            continue
+        if isinstance(value, Mapping):
+            header[key] = _split(value, key_path, columns, tables, aliases)
+        else:
+            header[key] = value
+    return header
+
+
+def save(path: str, data: dict) -> str:
+    """Save a log as a binary columnar file.
+
+    Numeric columns (arrays, Recorder fields and numeric lists of at least
+    MIN_COLUMN_LENGTH values) are written as raw little-endian blocks;
+    everything else goes into a JSON header that also records the dtype,
+    offset and length of every column. ColumnMap aliases are kept in the
+    header and point at the column of their field on load.
+
+    Args:
+        path (str): File to write
+        data (dict): Log contents, e.g. a DataLog or sysid log dict
+
+    Returns:
+        str: Path of the written file
+    """
+    columns = {}
+    tables = []
+    aliases = {}
+    meta = _split(data, "", columns, tables, aliases)
+
+    blocks = {}
+    layout = {}
+    offset = 0
+    for name, column in columns.items():
+        block = np.ascontiguousarray(column, dtype=column.dtype.newbyteorder("<"))
+        blocks[name] = block
+        layout[name] = {"dtype": block.dtype.str, "offset": offset, "length": len(block)}
+        offset += -(-block.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header = json.dumps({"meta": meta, "columns": layout, "tables": tables,
+                         "aliases": aliases}).encode()
+    data_start = -(-(len(MAGIC) + HEADER_LENGTH.size + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        for name, block in blocks.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(block.tobytes())
+        # Make sure the file covers the padding of the last block
+        f.truncate(data_start + offset)
+    return path
+
+
+def read_header(path: str) -> dict:
+    """Read the JSON header of a binary log without touching its columns.
+
+    Returns:
+        dict: 'meta', 'columns' (layout per column path), 'tables' and
+            'aliases' (alias -> field per ColumnMap path)
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a ktune binary log")
+        (length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+        header = json.loads(f.read(length))
+    header["data_start"] = -(-(len(MAGIC) + HEADER_LENGTH.size + length) // ALIGNMENT) * ALIGNMENT
+    return header
+
+
+def load(path: str, mmap: bool = True) -> dict:
+    """Load a binary log.
+
+    Args:
+        path (str): File written by save()
+        mmap (bool): Map the columns from the file instead of reading them.
+            Mapped columns are read-only views, and only the pages that are
+            actually used get read from disk.
+
+    Returns:
+        dict: The log with the same nesting as when it was saved; columns
+            are NumPy arrays, and tables (lists of records) come back as a
+            dict of columns
+    """
+    header = read_header(path)
+    if mmap:
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+    else:
+        with open(path, "rb") as f:
+            raw = np.frombuffer(bytearray(f.read()), dtype=np.uint8)
+
+    data = header["meta"]
+    start = header["data_start"]
+    for column_path, layout in header["columns"].items():
+        dtype = np.dtype(layout["dtype"])
+        offset = start + layout["offset"]
+        column = raw[offset:offset + layout["length"] * dtype.itemsize].view(dtype)
+        *parents, name = column_path.split("/")
+        _node(data, parents)[_unescape(name)] = column
+    for map_path, names in header.get("aliases", {}).items():
+        target = _node(data, map_path.split("/"))
+        for alias, field in names.items():
+            if field in target:
+                target[alias] = target[field]
+    return data
+
+
+def _node(data: dict, segments: list) -> dict:
+    """Nested dict at an escaped key path, created as needed."""
+    for segment in segments:
+        data = data.setdefault(_unescape(segment), {})
+    return data
+
+
+def convert(json_path: str, output_path: str = None) -> str:
+    """Convert a JSON log (DataLog or sysid) to a binary log.
+
+    Args:
+        json_path (str): JSON log to convert
+        output_path (str, optional): Binary log to write. Defaults to the
+            JSON path with the .ktlog extension.
+
+    Returns:
+        str: Path of the written file
+    """
+    with open(json_path) as f:
+        data = json.load(f)
+    output_path = output_path or os.path.splitext(json_path)[0] + EXTENSION
+    return save(output_path, data)
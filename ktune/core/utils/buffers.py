@@ -0,0 +1,47 @@
+import numpy as np
+
+
+class ColumnBuffer:
+    """Preallocated numeric column with a list-like append.
+
+    Values are written straight into a float64 array, so logging a sample
+    does not keep a Python float alive per value the way a list does. The
+    array doubles in size if the capacity turns out to be too small.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """Initialize the buffer.
+
+        Args:
+            capacity (int): Number of values to preallocate
+        """
+        self._data = np.empty(max(int(capacity), 1), dtype=np.float64)
+        self._size = 0
+
+    def append(self, value: float):
+        """Write one value at the end of the column."""
+        if self._size == len(self._data):
+            self._data = np.concatenate([self._data, np.empty_like(self._data)])
+        self._data[self._size] = value
+        self._size += 1
+
+    def view(self) -> np.ndarray:
+        """The filled part of the column, without copying."""
+        return self._data[:self._size]
+
+    def tolist(self) -> list:
+        """The filled part of the column as a list of floats."""
+        return self.view().tolist()
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __array__(self, dtype=None, copy=None):
+        return self.view() if dtype is None else self.view().astype(dtype)
+
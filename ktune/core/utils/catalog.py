@@ -0,0 +1,306 @@
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+from ktune.core.utils import binlog
+
+# Catalog location, relative to the working directory the runs are saved from
+DEFAULT_PATH = os.path.join("data", "catalog.sqlite")
+# Directories rescanned by rebuild()
+DEFAULT_DIRS = ("data", "logs")
+
+# Indexed fields and their SQL types, in table order
+FIELDS = {
+    "path": "TEXT PRIMARY KEY",
+    "kind": "TEXT",            # 'tune' or 'sysid'
+    "format": "TEXT",          # 'json' or 'binary'
+    "mtime": "REAL",
+    "timestamp": "TEXT",       # ISO 'YYYY-MM-DD HH:MM:SS'
+    "test_type": "TEXT",
+    "mode": "TEXT",
+    "actuator_id": "INTEGER",
+    "robot_name": "TEXT",
+    "kp": "REAL",
+    "kd": "REAL",
+    "ki": "REAL",
+    "sim_kp": "REAL",
+    "sim_kd": "REAL",
+    "sample_rate": "REAL",
+    "trajectory": "TEXT",
+    "motor": "TEXT",
+    "achieved_rate": "REAL",
+    "sim_pos_rms": "REAL",
+    "sim_pos_max": "REAL",
+    "sim_vel_rms": "REAL",
+    "real_pos_rms": "REAL",
+    "real_pos_max": "REAL",
+    "real_vel_rms": "REAL",
+}
+INDEXED = ("timestamp", "test_type", "actuator_id", "robot_name", "kp", "trajectory")
+# Every actuator of a run, so batched runs are found by any of their joints;
+# runs.actuator_id keeps the primary joint
+JOINT_FIELDS = {"path": "TEXT", "actuator_id": "INTEGER"}
+OPERATORS = ("=", "!=", "<", "<=", ">", ">=", "like")
+
+# Timestamps in file names: tune runs (20250101_120000) and sysid logs (2025-01-01_120000)
+_FILE_TIMESTAMP = re.compile(r"(\d{4})-?(\d{2})-?(\d{2})_(\d{2})(\d{2})(\d{2})")
+
+
+def _timestamp(value, path):
+    """ISO timestamp of a run from its header value, file name or mtime."""
+    for text in (value or "", os.path.basename(path)):
+        match = _FILE_TIMESTAMP.search(str(text))
+        if match:
+            y, m, d, hh, mm, ss = match.groups()
+            return f"{y}-{m}-{d} {hh}:{mm}:{ss}"
+    return datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _metric(header, system, signal, key):
+    value = header.get("tracking_metrics", {}).get(system, {}).get(signal, {}).get(key)
+    return float(value) if value is not None else None
+
+
+def header_row(path: str, header: dict) -> dict:
+    """Catalog row for a run, or None if the header is not a run log. Its
+    'actuator_ids' entry lists every joint of the run, for the joints table.
+
+    Args:
+        path (str): Log file
+        header (dict): Log contents without the sample columns; a DataLog
+            header or a sysid log
+    """
+    if "test_type" in header and "gains" in header:
+        gains = header.get("gains", {})
+        row = {
+            "kind": "tune",
+            "test_type": header.get("test_type"),
+            "mode": header.get("mode"),
+            "robot_name": header.get("robot_name"),
+            "kp": gains.get("real", {}).get("kp"),
+            "kd": gains.get("real", {}).get("kd"),
+            "ki": gains.get("real", {}).get("ki"),
+            "sim_kp": gains.get("sim", {}).get("kp"),
+            # DataLog has always written the sim derivative gain as 'Kd'
+            "sim_kd": gains.get("sim", {}).get("Kd", gains.get("sim", {}).get("kd")),
+        }
+        for system in ("sim", "real"):
+            row[f"{system}_pos_rms"] = _metric(header, system, "position", "rms_error")
+            row[f"{system}_pos_max"] = _metric(header, system, "position", "max_error")
+            row[f"{system}_vel_rms"] = _metric(header, system, "velocity", "rms_error")
+    elif "trajectory" in header:
+        row = {
+            "kind": "sysid",
+            "test_type": "sysid",
+            "mode": "real",
+            "kp": header.get("kp"),
+            "kd": header.get("kd"),
+            "ki": header.get("ki"),
+            "trajectory": header.get("trajectory"),
+            "motor": header.get("motor"),
+        }
+    else:
+        return None
+
+    actuator_ids = header.get("actuator_ids") or [header.get("actuator_id")]
+    row.update({
+        "actuator_ids": [int(aid) for aid in actuator_ids if aid is not None],
+        "path": os.path.abspath(path),
+        "format": "binary" if path.endswith(binlog.EXTENSION) else "json",
+        "mtime": os.path.getmtime(path),
+        "timestamp": _timestamp(header.get("timestamp"), path),
+        "actuator_id": header.get("actuator_id"),
+        "sample_rate": header.get("sample_rate"),
+        "achieved_rate": (header.get("timing") or {}).get("achieved_rate"),
+    })
+    return row
+
+
+def read_log_header(path: str) -> dict:
+    """Header fields of a JSON or binary log, without its sample columns."""
+    if path.endswith(binlog.EXTENSION):
+        return binlog.read_header(path)["meta"]
+    with open(path) as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} is not a run log")
+    return data
+
+
+class Catalog:
+    """SQLite index of saved runs, for finding runs without loading them.
+
+    DataLog and the sysid CLI add each run as it is saved; rebuild()
+    rescans the data and log directories for runs saved before the catalog
+    existed or after it was deleted.
+
+    Example:
+        catalog = Catalog()
+        catalog.query([("test_type", "=", "chirp"), ("kp", ">=", 20)],
+                      order_by="real_pos_rms")
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        """Open the catalog, creating it if needed.
+
+        Args:
+            path (str): SQLite database file
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.row_factory = sqlite3.Row
+        columns = ", ".join(f"{name} {sql_type}" for name, sql_type in FIELDS.items())
+        with self._db:
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS runs ({columns})")
+            for field in INDEXED:
+                self._db.execute(f"CREATE INDEX IF NOT EXISTS runs_{field} ON runs ({field})")
+            joint_columns = ", ".join(f"{name} {sql_type}" for name, sql_type in JOINT_FIELDS.items())
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS joints ({joint_columns}, "
+                             f"PRIMARY KEY (path, actuator_id))")
+            self._db.execute("CREATE INDEX IF NOT EXISTS joints_actuator_id ON joints (actuator_id)")
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def add(self, path: str, header: dict = None) -> bool:
+        """Index one log file, replacing any previous entry for it.
+
+        Args:
+            path (str): Log file
+            header (dict, optional): Its header, to avoid reading the file
+
+        Returns:
+            bool: False if the file is not a run log
+        """
+        row = header_row(path, header if header is not None else read_log_header(path))
+        if row is None:
+            return False
+        with self._db:
+            self._insert([row])
+        return True
+
+    def _insert(self, rows):
+        names = list(FIELDS)
+        self._db.executemany(
+            f"INSERT OR REPLACE INTO runs ({', '.join(names)}) "
+            f"VALUES ({', '.join('?' for _ in names)})",
+            [[row.get(name) for name in names] for row in rows]
+        )
+        self._remove_joints([row["path"] for row in rows])
+        self._db.executemany(
+            "INSERT OR REPLACE INTO joints (path, actuator_id) VALUES (?, ?)",
+            [(row["path"], aid) for row in rows for aid in row.get("actuator_ids", [])]
+        )
+
+    def _remove_joints(self, paths):
+        self._db.executemany("DELETE FROM joints WHERE path = ?", [(p,) for p in paths])
+
+    def rebuild(self, directories=DEFAULT_DIRS) -> dict:
+        """Rescan directories for logs.
+
+        Files whose modification time matches their entry are skipped, and
+        entries of files that no longer exist are removed.
+
+        Returns:
+            dict: Number of files 'added', 'unchanged', 'skipped' (not run
+                logs or unreadable) and 'removed'
+        """
+        counts = {"added": 0, "unchanged": 0, "skipped": 0, "removed": 0}
+        known = {row["path"]: row["mtime"]
+                 for row in self._db.execute("SELECT path, mtime FROM runs")}
+        rows = []
+        for directory in directories:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if not name.endswith((".json", binlog.EXTENSION)):
+                        continue
+                    path = os.path.abspath(os.path.join(root, name))
+                    if known.get(path) == os.path.getmtime(path):
+                        counts["unchanged"] += 1
+                        continue
+                    try:
+                        row = header_row(path, read_log_header(path))
+                    except (ValueError, OSError):
+                        row = None
+                    if row is None:
+                        counts["skipped"] += 1
+                        continue
+                    rows.append(row)
+                    counts["added"] += 1
+
+        missing = [path for path in known if not os.path.exists(path)]
+        with self._db:
+            self._insert(rows)
+            self._db.executemany("DELETE FROM runs WHERE path = ?", [(p,) for p in missing])
+            self._remove_joints(missing)
+        counts["removed"] = len(missing)
+        return counts
+
+    def query(self, filters=(), order_by: str = "timestamp", descending: bool = True,
+              limit: int = None) -> list:
+        """Find runs.
+
+        Args:
+            filters (list): (field, operator, value) conditions, all of which
+                must hold. Operators are =, !=, <, <=, >, >= and like. An
+                actuator_id condition matches a run if any of its joints
+                matches.
+            order_by (str): Field to sort by
+            descending (bool): Sort in descending order
+            limit (int, optional): Maximum number of runs
+
+        Returns:
+            list: One dict of catalog fields per run
+        """
+        clauses = []
+        values = []
+        for field, operator, value in filters:
+            self._check_field(field)
+            if operator not in OPERATORS:
+                raise ValueError(f"Unknown operator '{operator}', expected one of {OPERATORS}")
+            if field == "actuator_id":
+                clauses.append(f"(actuator_id {operator.upper()} ? OR path IN "
+                               f"(SELECT path FROM joints WHERE actuator_id {operator.upper()} ?))")
+                values.extend([value, value])
+                continue
+            clauses.append(f"{field} {operator.upper()} ?")
+            values.append(value)
+        self._check_field(order_by)
+
+        sql = "SELECT * FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(int(limit))
+        return [dict(row) for row in self._db.execute(sql, values)]
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    @staticmethod
+    def _check_field(field):
+        if field not in FIELDS:
+            raise ValueError(f"Unknown catalog field '{field}', expected one of {list(FIELDS)}")
+
+
+def record(path: str, header: dict, catalog_path: str):
+    """Add a freshly saved run to the catalog. A catalog that cannot be
+    updated only produces a warning, never a failed save."""
+    try:
+        with Catalog(catalog_path) as catalog:
+            catalog.add(path, header)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: could not update run catalog {catalog_path}: {e}")
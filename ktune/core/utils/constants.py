@@ -0,0 +1,8 @@
+"""Defaults shared by the CLI and the modules it loads lazily.
+
+Kept free of third-party imports, so the CLI can use them without loading
+numpy or the modules they belong to.
+"""
+
+# Address `ktune watch` listens on by default
+TELEMETRY_ADDRESS = "127.0.0.1:9870"
@@ -1,7 +1,9 @@
 import os
 import json
 import numpy as np
-from ktune.core.utils import metrics
+from ktune.core.utils import binlog, catalog
+from ktune.core.utils.analysis import analysis_contexts
+from ktune.core.utils.recorder import ColumnMap
 
 class DataLog:
     """Handles saving test data and metadata to files."""
@@ -18,18 +20,51 @@ class DataLog:
         44: "Right Knee Pitch", 45: "Right Ankle Pitch"
     }
 
-    def __init__(self, config, sim_data=None, real_data=None):
+    def __init__(self, config, sim_data=None, real_data=None, timing=None, reference=None,
+                 actuator_ids=None, joint_overrides=None, latency=None, loop_latency=None,
+                 catalog_path=None, analysis=None, online_tracking=None,
+                 aborted=None):
         """Initialize the DataLogger.
         
         Args:
             config: Test configuration object
             sim_data (dict, optional): Simulation data
             real_data (dict, optional): Real robot data
+            timing (dict, optional): Achieved loop timing from the scheduler
+            reference (dict, optional): Compiled command Waveform per actuator ID
+            actuator_ids (list, optional): Actuators of a batched test, primary first
+            joint_overrides (dict, optional): Per-joint parameter overrides
+            latency (dict, optional): Per-tick latency percentile summary
+            loop_latency (dict, optional): Scheduler sleep and lateness
+                columns per loop or pipelined task
+            catalog_path (str, optional): Run catalog to add saved runs to,
+                or None to leave them out of any catalog
+            analysis (dict, optional): AnalysisContext per system to reuse
+                (see Tune.analysis_context), built from the data otherwise
+            online_tracking (dict, optional): Tracking metrics streamed during
+                the test (see Tune.online_tracking)
+            aborted (str, optional): Why the test was stopped early
         """
         self.config = config
         self.mode = config.mode
-        self.sim_data = sim_data
-        self.real_data = real_data
+        # Metrics only see valid samples; the saved data keeps every sample
+        # together with its validity mask
+        self.raw_sim_data = sim_data
+        self.raw_real_data = real_data
+        self.analysis = analysis_contexts(sim_data, real_data, analysis,
+                                          config.frf_segment, config.frf_overlap)
+        self.sim_data = self.analysis["sim"].data
+        self.real_data = self.analysis["real"].data
+        self.timing = timing
+        self.reference = reference
+        self.actuator_ids = actuator_ids or [config.actuator_id]
+        self.joint_overrides = joint_overrides or {}
+        self.latency = latency
+        self.loop_latency = loop_latency
+        self.catalog_path = catalog_path
+        self.online_tracking = online_tracking
+        self.aborted = aborted
+        self.path = None
 
     def save_data(self, timestamp: str, data_dir: str):
         """Save test data to file.
@@ -37,23 +72,85 @@ class DataLog:
         Args:
             timestamp (str): Timestamp for file naming
             data_dir (str): Directory to save data file
+
+        Returns:
+            dict: Header and metrics written alongside the data
         """
         # Build data structure
-        data = self._build_header(timestamp)
+        header = self._build_header(timestamp)
+        data = dict(header)
         
+        # Binary logs take the recorded columns as they are
+        binary = getattr(self.config, "log_format", "json") == "binary"
+        columns = (lambda column: column) if binary else self._to_lists
+
         # Only include data for active modes
-        if self.config.mode in ['compare', 'sim'] and self.sim_data:
-            data["sim_data"] = self.sim_data
+        if self.config.mode in ['compare', 'sim'] and self.raw_sim_data:
+            data["sim_data"] = columns(self.raw_sim_data)
         
-        if self.config.mode in ['compare', 'real'] and self.real_data:
-            data["real_data"] = self.real_data
+        if self.config.mode in ['compare', 'real'] and self.raw_real_data:
+            data["real_data"] = columns(self.raw_real_data)
+
+        if self.reference is not None:
+            data["reference"] = self._reference_columns()
+
+        if self.loop_latency is not None:
+            data["loop_latency"] = self.loop_latency
 
         # Save to file
+        if binary:
+            filepath = os.path.join(data_dir, f"{timestamp}_{self.config.test}{binlog.EXTENSION}")
+            self.path = binlog.save(filepath, data)
+            self._record(header)
+            return header
+
         filename = f"{timestamp}_{self.config.test}.json"
         filepath = os.path.join(data_dir, filename)
         
         with open(filepath, 'w') as f:
             json.dump(data, f, indent=2)
+        self.path = filepath
+        self._record(header)
+        return header
+
+    def _record(self, header):
+        """Add the saved run to the run catalog."""
+        if self.catalog_path is not None:
+            catalog.record(self.path, header, self.catalog_path)
+
+    @staticmethod
+    def _to_lists(data):
+        """Recorder-backed data as JSON-serializable lists.
+
+        NaN gaps (missed state reads) are written as null, which json.dump
+        would otherwise write as the non-standard NaN literal.
+        """
+        if not isinstance(data, ColumnMap):
+            return data
+        columns = {}
+        for key, value in data.items():
+            if isinstance(value, np.ndarray):
+                if value.dtype.kind == "f" and np.isnan(value).any():
+                    gaps = np.isnan(value)
+                    value = value.astype(object)
+                    value[gaps] = None
+                value = value.tolist()
+            columns[key] = value
+        return columns
+
+    def _reference_columns(self):
+        """Flatten the compiled command trajectories into data columns.
+
+        The primary joint uses the plain column names; other joints of a
+        batched test get columns suffixed with their actuator ID.
+        """
+        primary = self.actuator_ids[0]
+        columns = self.reference[primary].to_dict()
+        for aid in self.actuator_ids[1:]:
+            waveform = self.reference[aid].to_dict()
+            columns[f"position_{aid}"] = waveform["position"]
+            columns[f"velocity_{aid}"] = waveform["velocity"]
+        return columns
 
     def _build_header(self, timestamp: str):
         """Build metadata header with all metrics."""
@@ -79,45 +176,68 @@ class DataLog:
             "torque_enabled": not self.config.torque_off
         }
 
+        if self.timing is not None:
+            header["timing"] = self.timing
+
+        if self.latency is not None:
+            header["latency"] = self.latency
+
+        if len(self.actuator_ids) > 1:
+            header["actuator_ids"] = self.actuator_ids
+            header["joint_names"] = {
+                str(aid): self.JOINT_NAMES.get(aid, f"id_{aid}") for aid in self.actuator_ids
+            }
+            header["joint_overrides"] = {
+                str(aid): overrides for aid, overrides in self.joint_overrides.items()
+            }
+
         # Add tracking metrics and statistics
         tracking_metrics = {}
         data_statistics = {}
 
         # Only compute metrics for active modes with data
         if self.mode in ['compare', 'sim'] and self.sim_data:
-            tracking_metrics["sim"] = metrics.compute_tracking_metrics(
-                self.sim_data["cmd_time"], self.sim_data["cmd_pos"],
-                self.sim_data["time"], self.sim_data["position"],
-                self.sim_data["cmd_vel"], self.sim_data["velocity"]
-            )
-            data_statistics["sim"] = metrics.compute_data_statistics(
-                self.sim_data["time"],
-                self.sim_data["position"],
-                self.sim_data["velocity"]
-            )
+            tracking_metrics["sim"] = self.analysis["sim"].tracking_metrics()
+            data_statistics["sim"] = self.analysis["sim"].data_statistics()
 
         if self.mode in ['compare', 'real'] and self.real_data:
-            tracking_metrics["real"] = metrics.compute_tracking_metrics(
-                self.real_data["cmd_time"], self.real_data["cmd_pos"],
-                self.real_data["time"], self.real_data["position"],
-                self.real_data["cmd_vel"], self.real_data["velocity"]
-            )
-            data_statistics["real"] = metrics.compute_data_statistics(
-                self.real_data["time"],
-                self.real_data["position"],
-                self.real_data["velocity"]
-            )
+            tracking_metrics["real"] = self.analysis["real"].tracking_metrics()
+            data_statistics["real"] = self.analysis["real"].data_statistics()
 
         header.update({
             "tracking_metrics": tracking_metrics,
             "data_statistics": data_statistics
         })
 
+        if len(self.actuator_ids) > 1:
+            header["joint_tracking_metrics"] = self._build_joint_tracking_metrics()
+
+        if self.online_tracking:
+            header["online_tracking"] = self.online_tracking
+        if self.aborted:
+            header["aborted"] = self.aborted
+
         # Add test-specific metadata
         self._add_test_specific_metadata(header)
         
         return header
 
+    def _build_joint_tracking_metrics(self):
+        """Tracking metrics for every joint of a batched test."""
+        systems = []
+        if self.mode in ['compare', 'sim'] and self.sim_data:
+            systems.append("sim")
+        if self.mode in ['compare', 'real'] and self.real_data:
+            systems.append("real")
+
+        return {
+            system: {
+                str(aid): self.analysis[system].tracking_metrics(aid)
+                for aid in self.actuator_ids
+            }
+            for system in systems
+        }
+
     def _add_test_specific_metadata(self, header):
         """Add metadata specific to test type."""
         if self.config.test == "chirp":
@@ -127,7 +247,9 @@ class DataLog:
                 "amplitude": self.config.chirp_amp,
                 "duration": self.config.chirp_duration,
                 "log_duration_pad": self.config.log_duration_pad,
-                "total_duration": self.config.chirp_duration + self.config.log_duration_pad
+                "total_duration": self.config.chirp_duration + self.config.log_duration_pad,
+                "frf_segment": self.config.frf_segment,
+                "frf_overlap": self.config.frf_overlap
             })
         elif self.config.test == "sine":
             header.update({
@@ -145,24 +267,13 @@ class DataLog:
         vel = 0.0  # Default velocity limit
         step_metrics = {}
 
-        if self.sim_data is not None:
-            sim_metrics = metrics.compute_step_metrics(
-                np.array(self.sim_data["time"]), 
-                np.array(self.sim_data["position"]),
-                self.config.step_size,
-                self.config.step_hold_time,
-                self.config.step_count
-            )
+        # Inactive systems have no data
+        if self.mode in ['compare', 'sim'] and self.sim_data:
+            sim_metrics = self.analysis["sim"].step_metrics()
             step_metrics["sim"] = self._compute_step_statistics(sim_metrics)
 
-        if self.real_data is not None:
-            real_metrics = metrics.compute_step_metrics(
-                np.array(self.real_data["time"]), 
-                np.array(self.real_data["position"]),
-                self.config.step_size,
-                self.config.step_hold_time,
-                self.config.step_count
-            )
+        if self.mode in ['compare', 'real'] and self.real_data:
+            real_metrics = self.analysis["real"].step_metrics()
             step_metrics["real"] = self._compute_step_statistics(real_metrics)
 
         header.update({
@@ -178,67 +289,22 @@ class DataLog:
         })
 
     def _compute_step_statistics(self, metrics_list):
-        """Compute statistics from step metrics."""
+        """Compute statistics from step metrics.
+
+        Averages over steps that never rose or settled are None.
+        """
         if not metrics_list:
             return None
-        
+
+        def average(name):
+            values = [m[name] for m in metrics_list if m[name] is not None]
+            return float(np.mean(values)) if values else None
+
         return {
+            'steps': len(metrics_list),
             'max_overshoot': max(m['overshoot'] for m in metrics_list),
-            'avg_overshoot': np.mean([m['overshoot'] for m in metrics_list]),
-            'avg_rise_time': np.mean([m['rise_time'] for m in metrics_list if m['rise_time'] is not None]),
-            'avg_settling_time': np.mean([m['settling_time'] for m in metrics_list if m['settling_time'] is not None]),
+            'avg_overshoot': average('overshoot'),
+            'avg_rise_time': average('rise_time'),
+            'avg_settling_time': average('settling_time'),
             'all_steps': metrics_list
         }
-
-    def _prepare_output_data(self, header):
-        """Prepare output data structures based on mode."""
-        outputs = {}
-
-        if self.sim_data is not None:
-            outputs["sim"] = {
-                "header": header,
-                "data": {
-                    "time": self.sim_data["time"],
-                    "position": self.sim_data["position"],
-                    "velocity": self.sim_data["velocity"],
-                    "cmd_time": self.sim_data["cmd_time"],
-                    "cmd_pos": self.sim_data["cmd_pos"],
-                    "cmd_vel": self.sim_data["cmd_vel"]
-                }
-            }
-            # Add frequency response data for chirp tests
-            if self.config.test == "chirp" and "freq_response" in self.sim_data:
-                outputs["sim"]["data"]["freq_response"] = self.sim_data["freq_response"]
-
-        if self.real_data is not None:
-            outputs["real"] = {
-                "header": header,
-                "data": {
-                    "time": self.real_data["time"],
-                    "position": self.real_data["position"],
-                    "velocity": self.real_data["velocity"],
-                    "cmd_time": self.real_data["cmd_time"],
-                    "cmd_pos": self.real_data["cmd_pos"],
-                    "cmd_vel": self.real_data["cmd_vel"]
-                }
-            }
-            # Add frequency response data for chirp tests
-            if self.config.test == "chirp" and "freq_response" in self.real_data:
-                outputs["real"]["data"]["freq_response"] = self.real_data["freq_response"]
-
-        return outputs
-
-    def _save_to_files(self, timestamp: str, data_dir: str, outputs):
-        """Save data to JSON files."""
-        base_path = os.path.join(data_dir, f"{timestamp}_{self.config.test}")
-        saved_files = []
-
-        for system, data in outputs.items():
-            filename = f"{base_path}_{system}.json"
-            with open(filename, "w") as f:
-                json.dump(data, f, indent=2)
-            saved_files.append(filename)
-
-        print(f"\nSaved data files:")
-        for filename in saved_files:
-            print(f"  {filename}")
\ No newline at end of file
@@ -0,0 +1,147 @@
+import math
+import numpy as np
+
+# LTTB keeps this many points per pixel of axes width
+POINTS_PER_PIXEL = 2
+METHODS = ("minmax", "lttb")
+
+
+def minmax(x, y, buckets: int):
+    """Min/max envelope of a trace.
+
+    The time range is split into equal buckets (one per pixel column) and
+    the first, last, smallest and largest sample of each bucket are kept,
+    in time order. The decimated line then covers the same pixels as the
+    full trace, peaks and the lines between columns included.
+
+    Args:
+        x (array): Sample times, in increasing order
+        y (array): Sample values
+        buckets (int): Number of buckets
+
+    Returns:
+        tuple: Decimated (x, y) arrays
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if buckets < 1 or n <= 4 * buckets:
+        return x, y
+    xf = x.astype(np.float64)
+    duration = xf[-1] - xf[0]
+    if not duration > 0:
+        return x, y
+    bucket = np.clip(((xf - xf[0]) * (buckets / duration)).astype(np.int64), 0, buckets - 1)
+    starts = np.flatnonzero(np.diff(bucket, prepend=-1))
+    sizes = np.diff(np.append(starts, n))
+    owner = np.repeat(np.arange(len(starts)), sizes)
+
+    keep = [starts, starts + sizes - 1]
+    for extreme in (np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)):
+        # First sample of each bucket that reaches the bucket's extreme
+        hits = np.flatnonzero(y == extreme[owner])
+        _, first = np.unique(owner[hits], return_index=True)
+        keep.append(hits[first])
+    index = np.unique(np.concatenate(keep))
+    return x[index], y[index]
+
+
+def lttb(x, y, points: int):
+    """Largest-triangle-three-buckets decimation of a trace.
+
+    Keeps the first and last sample and, from each of points - 2 buckets,
+    the sample that forms the largest triangle with the point kept from the
+    previous bucket and the mean of the next bucket. The area of every
+    candidate in a bucket is computed at once.
+
+    Args:
+        x (array): Sample times
+        y (array): Sample values
+        points (int): Number of points to keep
+
+    Returns:
+        tuple: Decimated (x, y) arrays
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if points < 3 or n <= points:
+        return x, y
+    xf = x.astype(np.float64)
+    yf = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    # Mean of every bucket, with the last sample as the bucket after the last one
+    counts = np.diff(edges)
+    x_means = np.append(np.add.reduceat(xf[:n - 1], edges[:-1]) / counts, xf[-1])
+    y_means = np.append(np.add.reduceat(yf[:n - 1], edges[:-1]) / counts, yf[-1])
+
+    index = np.empty(points, dtype=np.int64)
+    index[0] = 0
+    index[-1] = n - 1
+    previous = 0
+    for bucket in range(points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        ax, ay = xf[previous], yf[previous]
+        cx, cy = x_means[bucket + 1], y_means[bucket + 1]
+        area = np.abs((ax - cx) * (yf[start:end] - ay) - (ax - xf[start:end]) * (cy - ay))
+        previous = start + int(np.argmax(area))
+        index[bucket + 1] = previous
+    return x[index], y[index]
+
+
+def decimate(x, y, pixels: int, method: str = "minmax"):
+    """Reduce a trace to what can be drawn across a given pixel width.
+
+    Args:
+        x (array): Sample times
+        y (array): Sample values
+        pixels (int): Width of the drawing area in pixels
+        method (str): 'minmax' (envelope, keeps every extreme) or 'lttb'
+
+    Returns:
+        tuple: Decimated (x, y) arrays; short traces are returned as they are
+    """
+    if method == "minmax":
+        return minmax(x, y, pixels)
+    if method == "lttb":
+        return lttb(x, y, pixels * POINTS_PER_PIXEL)
+    raise ValueError(f"Unknown decimation method '{method}', expected one of {METHODS}")
+
+
+def pixel_width(ax) -> int:
+    """Width of a matplotlib axes in pixels at the figure resolution."""
+    return max(1, int(math.ceil(ax.bbox.width)))
+
+
+def plot(ax, x, y, *args, method: str = "minmax", **kwargs):
+    """ax.plot() of a trace decimated to the width of the axes.
+
+    Rendering time and file size then depend on the figure size instead of
+    the length of the run.
+    """
+    x, y = decimate(x, y, pixel_width(ax), method)
+    return ax.plot(x, y, *args, **kwargs)
+
+
+def spans(x, mask):
+    """Merge consecutive masked samples into spans.
+
+    Sample i covers [x[i], x[i+1]); each run of masked samples becomes one
+    span from the start of its first sample to the start of the sample after
+    its last one. The last sample, which has no end, is ignored.
+
+    Args:
+        x (array): Sample times
+        mask (array): Boolean per sample
+
+    Returns:
+        list: (start, end) times of the spans
+    """
+    x = np.asarray(x)
+    mask = np.asarray(mask, dtype=bool)[:len(x) - 1]
+    if not mask.any():
+        return []
+    changes = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    starts = np.flatnonzero(changes == 1)
+    ends = np.flatnonzero(changes == -1)
+    return list(zip(x[starts].tolist(), x[ends].tolist()))
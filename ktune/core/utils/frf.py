@@ -0,0 +1,256 @@
+import numpy as np
+
+# Welch defaults: segment length in samples and overlap as a fraction of it
+DEFAULT_SEGMENT = 256
+DEFAULT_OVERLAP = 0.5
+# Output channels whose response to the position command is estimated
+CHANNELS = ("position", "velocity", "torque")
+# Bins whose input power is below this fraction of the peak (-20 dB) carry
+# no excitation (e.g. outside a chirp's sweep, where only window leakage
+# reaches them) and are left out of responses
+EXCITATION_FLOOR = 1e-2
+# Relative sample rate difference up to which runs are averaged together
+RATE_TOLERANCE = 0.05
+
+
+def _segments(x, length: int, step: int) -> np.ndarray:
+    """Overlapping segments along the last axis, as a strided view."""
+    windows = np.lib.stride_tricks.sliding_window_view(x, length, axis=-1)
+    return windows[..., ::step, :]
+
+
+def segment_settings(samples: int, segment: int = None, overlap: float = DEFAULT_OVERLAP):
+    """Welch segment length and step for runs of a given length.
+
+    Args:
+        samples (int): Length of the shortest run
+        segment (int, optional): Segment length, defaults to DEFAULT_SEGMENT;
+            capped at the run length
+        overlap (float): Overlap between segments as a fraction of their length
+
+    Returns:
+        tuple: (segment length, step between segment starts)
+    """
+    if not 0.0 <= overlap < 1.0:
+        raise ValueError(f"Segment overlap must be in [0, 1), got {overlap}")
+    length = min(int(segment or DEFAULT_SEGMENT), samples)
+    step = max(1, int(round(length * (1.0 - overlap))))
+    return length, step
+
+
+def _run_spectra(inputs, outputs, segment, overlap):
+    """Auto and cross spectra summed over the segments of each run.
+
+    Returns:
+        tuple: Gxx (runs, 1, F), Gyy and Gxy (runs, channels, F), segment
+            count per run, segment length and step
+    """
+    inputs = [np.asarray(x, dtype=np.float64) for x in inputs]
+    outputs = [np.atleast_2d(np.asarray(y, dtype=np.float64)) for y in outputs]
+    if not inputs or len(inputs) != len(outputs):
+        raise ValueError("Need one output array per input run")
+    for x, y in zip(inputs, outputs):
+        if y.shape[-1] != len(x):
+            raise ValueError("Inputs and outputs of a run must have the same length")
+    length, step = segment_settings(min(len(x) for x in inputs), segment, overlap)
+    if length < 4:
+        raise ValueError("Runs are too short for a frequency response")
+
+    # Input and output segments of every run stacked as rows: (segments, 1 + channels, length)
+    stacks = [_segments(np.concatenate([x[None, :], y]), length, step).swapaxes(0, 1)
+              for x, y in zip(inputs, outputs)]
+    counts = np.array([len(stack) for stack in stacks])
+    segments = np.concatenate(stacks)
+    segments = segments - segments.mean(axis=-1, keepdims=True)
+    # Periodic Hann window, as used by scipy.signal's Welch estimators
+    window = 0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(length) / length)
+    spectra = np.fft.rfft(segments * window, axis=-1)[..., 1:]
+    X = spectra[:, :1]
+    Y = spectra[:, 1:]
+
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    sums = [np.add.reduceat(G, starts, axis=0)
+            for G in (np.abs(X) ** 2, np.abs(Y) ** 2, np.conj(X) * Y)]
+    return (*sums, counts, length, step)
+
+
+def _estimators(Gxx, Gyy, Gxy):
+    """H1, H2, coherence and the excited bins from averaged spectra."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h1, h2, coherence = Gxy / Gxx, Gyy / np.conj(Gxy), np.abs(Gxy) ** 2 / (Gxx * Gyy)
+    power = Gxx[..., 0, :]
+    excited = power >= EXCITATION_FLOOR * power.max(axis=-1, keepdims=True)
+    return h1, h2, coherence, excited
+
+
+def welch_frf(inputs, outputs, fs: float, segment: int = None,
+              overlap: float = DEFAULT_OVERLAP, average: bool = True) -> dict:
+    """H1, H2 and coherence of several output channels over several runs.
+
+    The runs are cut into Hann-windowed, mean-removed segments, and all
+    segments of all runs and channels are transformed in one FFT call. The
+    auto and cross spectra are averaged over the segments of each run, or
+    over every segment of every run when averaging repetitions, before the
+    estimators are formed:
+
+        H1 = Gxy / Gxx (unbiased by output noise)
+        H2 = Gyy / Gyx (unbiased by input noise)
+        coherence = |Gxy|^2 / (Gxx Gyy)
+
+    The DC bin, which carries no information after mean removal, is left out.
+    Bins where the input has less than EXCITATION_FLOOR of its peak power
+    are flagged in 'excited'; response_dict() leaves them out.
+
+    Args:
+        inputs (list): Input signal per run (1-D arrays, same sample rate)
+        outputs (list): Output channels per run, arrays of shape
+            (channels, samples) matching the run's input
+        fs (float): Sample rate in Hz
+        segment (int, optional): Segment length in samples
+        overlap (float): Segment overlap as a fraction of the segment length
+        average (bool): Average the spectra over all runs; otherwise the
+            estimates are returned per run
+
+    Returns:
+        dict: 'freq' (F,), 'h1', 'h2' (complex) and 'coherence' of shape
+            (channels, F), or (runs, channels, F) when not averaging,
+            'excited' of shape (F,) or (runs, F), and 'segment', 'step' and
+            'segments' (segments per run)
+    """
+    Gxx, Gyy, Gxy, counts, length, step = _run_spectra(inputs, outputs, segment, overlap)
+    if average:
+        Gxx, Gyy, Gxy = (G.sum(axis=0) / counts.sum() for G in (Gxx, Gyy, Gxy))
+    else:
+        Gxx, Gyy, Gxy = (G / counts[:, None, None] for G in (Gxx, Gyy, Gxy))
+    h1, h2, coherence, excited = _estimators(Gxx, Gyy, Gxy)
+    return {
+        "freq": np.fft.rfftfreq(length, 1.0 / fs)[1:],
+        "h1": h1,
+        "h2": h2,
+        "coherence": coherence,
+        "excited": excited,
+        "segment": length,
+        "step": step,
+        "segments": counts,
+    }
+
+
+def response_dict(result: dict, channels, index=()) -> dict:
+    """Frequency response in the saved layout.
+
+    The first channel (the position) fills 'magnitude', 'phase' (degrees,
+    of H1), 'h2_magnitude', 'h2_phase' and 'coherence', as read by the Bode
+    plot and the bandwidth; every channel is also listed under 'channels'.
+    Only the excited bins are kept.
+
+    Args:
+        result (dict): welch_frf() result
+        channels (list): Channel names, in the order of the outputs
+        index (tuple): Leading index into the estimates, e.g. (run,) for
+            per-run results
+    """
+    excited = result["excited"][index]
+    per_channel = {}
+    for c, name in enumerate(channels):
+        h1 = result["h1"][index + (c,)][excited]
+        h2 = result["h2"][index + (c,)][excited]
+        per_channel[name] = {
+            "magnitude": np.abs(h1).tolist(),
+            "phase": np.angle(h1, deg=True).tolist(),
+            "h2_magnitude": np.abs(h2).tolist(),
+            "h2_phase": np.angle(h2, deg=True).tolist(),
+            "coherence": result["coherence"][index + (c,)][excited].tolist(),
+        }
+    response = {"freq": result["freq"][excited].tolist(), **per_channel[channels[0]],
+                "estimator": "H1", "segment": int(result["segment"]),
+                "overlap": 1.0 - result["step"] / result["segment"],
+                "channels": per_channel}
+    return response
+
+
+def _run_signals(cmd_time, cmd_pos, outputs: dict):
+    """Command and output channels of a run on the command grid, trimmed to
+    the span where every channel was sampled."""
+    cmd_time = np.asarray(cmd_time, dtype=np.float64)
+    names = [name for name in CHANNELS if name in outputs]
+    values = np.stack([np.asarray(cmd_pos, dtype=np.float64)]
+                      + [np.asarray(outputs[name], dtype=np.float64) for name in names])
+    finite = np.isfinite(values)
+    valid = np.flatnonzero(np.all(finite, axis=0))
+    if len(valid) < 4:
+        return None
+    span = slice(valid[0], valid[-1] + 1)
+    values, finite = values[:, span], finite[:, span]
+    if not finite.all():
+        # Bridge gaps inside the span linearly, the FFT needs every sample
+        index = np.arange(values.shape[1])
+        values = np.stack([np.interp(index, index[ok], row[ok]) for row, ok in zip(values, finite)])
+    return cmd_time[span], values[0], values[1:], names
+
+
+def tracking_frf(cmd_time, cmd_pos, outputs: dict, segment: int = None,
+                 overlap: float = DEFAULT_OVERLAP) -> dict:
+    """Frequency response of one run from the position command to its outputs.
+
+    Args:
+        cmd_time (array): Command timestamps (uniform grid)
+        cmd_pos (array): Commanded positions
+        outputs (dict): Output channels resampled onto cmd_time (NaN where
+            not sampled), by name; see CHANNELS
+        segment (int, optional): Welch segment length in samples
+        overlap (float): Segment overlap as a fraction of the segment length
+
+    Returns:
+        dict: Response in the response_dict() layout, or an empty dict if
+            the run is too short
+    """
+    signals = _run_signals(cmd_time, cmd_pos, outputs)
+    if signals is None:
+        return {}
+    time, command, values, names = signals
+    fs = 1.0 / np.median(np.diff(time))
+    return response_dict(welch_frf([command], [values], fs, segment, overlap), names)
+
+
+def campaign_frf(runs, segment: int = None, overlap: float = DEFAULT_OVERLAP) -> dict:
+    """Frequency response of a campaign of repeated runs in one batched pass.
+
+    Args:
+        runs (list): (cmd_time, cmd_pos, outputs) per run, as for
+            tracking_frf(); runs must share the sample rate and channels
+        segment (int, optional): Welch segment length in samples
+        overlap (float): Segment overlap as a fraction of the segment length
+
+    Returns:
+        dict: 'average' response over all runs, 'runs' with the response of
+            each run (None for runs too short to use), and 'segments'
+    """
+    signals = [_run_signals(*run) for run in runs]
+    used = [index for index, s in enumerate(signals) if s is not None]
+    if not used:
+        return {"average": {}, "runs": [None] * len(runs), "segments": 0}
+    names = signals[used[0]][3]
+    rates = [1.0 / np.median(np.diff(signals[i][0])) for i in used]
+    # Command timing jitter moves the estimated rate by a few percent
+    if max(rates) - min(rates) > RATE_TOLERANCE * max(rates):
+        raise ValueError("Runs of a campaign must share the sample rate")
+    if any(signals[i][3] != names for i in used):
+        raise ValueError("Runs of a campaign must record the same channels")
+
+    Gxx, Gyy, Gxy, counts, length, step = _run_spectra(
+        [signals[i][1] for i in used], [signals[i][2] for i in used], segment, overlap)
+    freq = np.fft.rfftfreq(length, 1.0 / float(np.mean(rates)))[1:]
+
+    def result(spectra):
+        h1, h2, coherence, excited = _estimators(*spectra)
+        return {"freq": freq, "h1": h1, "h2": h2, "coherence": coherence,
+                "excited": excited, "segment": length, "step": step}
+
+    # Per run, and over all repetitions with every segment weighted equally
+    per_run = result([G / counts[:, None, None] for G in (Gxx, Gyy, Gxy)])
+    responses = [None] * len(runs)
+    for position, index in enumerate(used):
+        responses[index] = response_dict(per_run, names, (position,))
+    average = result([G.sum(axis=0) / counts.sum() for G in (Gxx, Gyy, Gxy)])
+    return {"average": response_dict(average, names), "runs": responses,
+            "segments": int(counts.sum())}
@@ -0,0 +1,177 @@
+import json
+import os
+import queue
+import struct
+import threading
+import zlib
+import numpy as np
+
+# File signature, followed by frames
+MAGIC = b"KTJOURNAL1\n"
+# Frame header: tag, stream name length, payload length, CRC32 of name + payload
+FRAME = struct.Struct("<4sHII")
+FRAME_TAG = b"CHNK"
+# Reserved stream names of the first and last frame
+META_STREAM = "__meta__"
+END_STREAM = "__end__"
+
+
+class JournalWriter:
+    """Append-only, crash-safe recording file written from a background thread.
+
+    The file starts with a metadata frame describing every stream (name and
+    row dtype), followed by one frame per chunk of raw rows. Each frame
+    carries a CRC32, so a file cut short by a crash or Ctrl-C can still be
+    read back up to its last complete chunk with recover(). Chunks are
+    queued by the caller and written, flushed and fsynced by the writer
+    thread, which keeps disk I/O off the event loop.
+
+    Example:
+        writer = JournalWriter("run.journal", {"real/states": recorder.dtype})
+        recorder.stream_to(writer.sink("real/states"), chunk_rows=256)
+        ...
+        recorder.flush()
+        writer.close()
+    """
+
+    def __init__(self, path: str, streams: dict, meta: dict = None, fsync: bool = True):
+        """Create the file and start the writer thread.
+
+        Args:
+            path (str): File to create
+            streams (dict): Row dtype per stream name
+            meta (dict, optional): JSON-serializable run metadata
+            fsync (bool): Sync every chunk to disk, not just to the OS
+        """
+        self.path = path
+        self.fsync = fsync
+        self.chunks = 0
+        self.error = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        header = {
+            "meta": meta or {},
+            "streams": {name: np.dtype(dtype).descr for name, dtype in streams.items()}
+        }
+        self._write_frame(META_STREAM, json.dumps(header).encode())
+
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._thread.start()
+
+    def sink(self, name: str):
+        """Callable that queues row chunks of one stream, for Recorder.stream_to()."""
+        return lambda rows: self.write(name, rows)
+
+    def write(self, name: str, rows: np.ndarray):
+        """Queue a chunk of rows. The rows are copied, so the caller may
+        reuse their storage right away."""
+        self._queue.put((name, rows.tobytes()))
+
+    def close(self):
+        """Write all queued chunks and an end marker, then close the file.
+
+        Raises:
+            OSError: If the writer thread failed to write a chunk
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self.error is None:
+            try:
+                self._write_frame(END_STREAM, b"")
+            except OSError as e:
+                self.error = e
+        self._file.close()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self.error is not None:
+                # Keep draining so close() does not wait on a failed file
+                continue
+            try:
+                self._write_frame(*item)
+                self.chunks += 1
+            except OSError as e:
+                self.error = e
+
+    def _write_frame(self, name: str, payload: bytes):
+        name_bytes = name.encode()
+        crc = zlib.crc32(payload, zlib.crc32(name_bytes))
+        self._file.write(FRAME.pack(FRAME_TAG, len(name_bytes), len(payload), crc))
+        self._file.write(name_bytes)
+        self._file.write(payload)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+
+def recover(path: str) -> dict:
+    """Read a journal, keeping every complete chunk.
+
+    Reading stops at the first truncated or corrupt frame; since the file is
+    append-only, everything before it is intact.
+
+    Args:
+        path (str): Journal file
+
+    Returns:
+        dict: 'meta' (run metadata), 'streams' (structured array of rows per
+            stream name), 'chunks' (number of chunks read) and 'complete'
+            (False if the writer did not close the file)
+
+    Raises:
+        ValueError: If the file is not a journal or its metadata is unreadable
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    if not content.startswith(MAGIC):
+        raise ValueError(f"{path} is not a ktune journal")
+
+    frames = []
+    complete = False
+    offset = len(MAGIC)
+    while offset + FRAME.size <= len(content):
+        tag, name_len, payload_len, crc = FRAME.unpack_from(content, offset)
+        start = offset + FRAME.size
+        end = start + name_len + payload_len
+        if tag != FRAME_TAG or end > len(content):
+            break
+        name_bytes = content[start:start + name_len]
+        payload = content[start + name_len:end]
+        if zlib.crc32(payload, zlib.crc32(name_bytes)) != crc:
+            break
+        name = name_bytes.decode()
+        if name == END_STREAM:
+            complete = True
+            break
+        frames.append((name, payload))
+        offset = end
+
+    if not frames or frames[0][0] != META_STREAM:
+        raise ValueError(f"{path} has no readable metadata")
+    header = json.loads(frames[0][1])
+    dtypes = {name: np.dtype([tuple(field) for field in descr])
+              for name, descr in header["streams"].items()}
+
+    payloads = {name: [] for name in dtypes}
+    for name, payload in frames[1:]:
+        if name in payloads:
+            payloads[name].append(payload)
+    streams = {
+        name: np.frombuffer(b"".join(payloads[name]), dtype=dtype).copy()
+        for name, dtype in dtypes.items()
+    }
+    return {
+        "meta": header["meta"],
+        "streams": streams,
+        "chunks": len(frames) - 1,
+        "complete": complete
+    }
@@ -0,0 +1,60 @@
+import numpy as np
+
+# Per-system columns recorded in the data dict, durations in seconds
+SYSTEM_COLUMNS = ("compute_dur", "cmd_rpc_dur", "state_rpc_dur")
+
+
+def percentiles(values) -> dict:
+    """Summarize a duration column.
+
+    Args:
+        values (list): Durations in seconds
+
+    Returns:
+        dict: p50, p95, p99, max and sample count, in milliseconds, or
+            None when the column is empty
+    """
+    if len(values) == 0:
+        return None
+    ms = np.asarray(values, dtype=float) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(np.max(ms)),
+        "count": int(len(ms))
+    }
+
+
+def summarize(system_data: dict, loop_columns: dict) -> dict:
+    """Build the latency summary stored in the DataLog header.
+
+    Args:
+        system_data (dict): Data dict per system name ('sim', 'real')
+        loop_columns (dict): Scheduler latency columns per loop or task name
+
+    Returns:
+        dict: Percentile summary per system and per loop column
+    """
+    summary = {}
+    for system, data in system_data.items():
+        columns = {key: percentiles(data.get(key, [])) for key in SYSTEM_COLUMNS}
+        summary[system] = {key: value for key, value in columns.items() if value is not None}
+
+    for loop, columns in loop_columns.items():
+        loop_summary = {key: percentiles(values) for key, values in columns.items()}
+        # Time slept beyond what was asked for, attributable to the host
+        overshoot = np.asarray(columns["sleep_actual"]) - np.asarray(columns["sleep_requested"])
+        loop_summary["sleep_overshoot"] = percentiles(overshoot)
+        summary[loop] = {key: value for key, value in loop_summary.items() if value is not None}
+    return summary
+
+
+def print_summary(summary: dict):
+    """Print the latency summary as one line per column."""
+    print(f"\n{'Latency (ms)':<32} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for group, columns in summary.items():
+        for key, stats in columns.items():
+            print(f"  {group + ' ' + key:<30} {stats['p50']:8.3f} {stats['p95']:8.3f} "
+                  f"{stats['p99']:8.3f} {stats['max']:8.3f}")
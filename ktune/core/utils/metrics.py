@@ -1,9 +1,32 @@
 import numpy as np
-from scipy.signal import coherence, csd
-from scipy.interpolate import interp1d
-from pathlib import Path
-import json
 from typing import Dict
+from ktune.core.utils import frf
+from ktune.core.utils.recorder import Recorder
+
+def valid_samples(data):
+    """Drop state samples flagged stale or missing in the validity mask.
+
+    State columns (time, position, velocity and their per-joint variants)
+    are filtered by the data's "valid" column; command columns are kept
+    as they are. Gaps loaded from JSON logs as null become NaN.
+
+    Args:
+        data (dict): Data dict of one system
+
+    Returns:
+        dict: Data dict with only valid state samples; filtered columns
+            become arrays
+    """
+    if not data or "valid" not in data:
+        return data
+    mask = np.asarray(data["valid"], dtype=bool)
+    if mask.all():
+        return data
+    filtered = dict(data)
+    for key, column in data.items():
+        if key in ("time", "valid") or key.startswith(("position", "velocity")):
+            filtered[key] = np.asarray(column, dtype=float)[mask]
+    return filtered
 
 # Calculate tracking metrics
 def compute_tracking_error(cmd_time, cmd_pos, actual_time, actual_pos):
@@ -22,6 +45,37 @@ def compute_tracking_error(cmd_time, cmd_pos, actual_time, actual_pos):
     rms_error = np.sqrt(np.mean(np.square(errors)))
     return rms_error
 
+def resample(time, values, new_time):
+    """Linearly interpolate samples onto new timestamps.
+
+    Args:
+        time (array-like): Sample timestamps
+        values (array-like): Sample values
+        new_time (array-like): Timestamps to interpolate at
+
+    Returns:
+        np.ndarray: Interpolated values, NaN outside the sampled time range
+    """
+    time = np.asarray(time, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    if len(time) == 0:
+        return np.full(len(new_time), np.nan)
+    if np.any(np.diff(time) < 0):
+        order = np.argsort(time, kind="stable")
+        time, values = time[order], values[order]
+    return np.interp(new_time, time, values, left=np.nan, right=np.nan)
+
+def error_statistics(errors):
+    """RMS, max, mean, mean absolute and standard deviation of errors."""
+    abs_errors = np.abs(errors)
+    return {
+        "rms_error": float(np.sqrt(np.mean(np.square(errors)))),
+        "max_error": float(np.max(abs_errors)),
+        "mean_error": float(np.mean(errors)),
+        "mean_abs_error": float(np.mean(abs_errors)),
+        "std_error": float(np.std(errors))
+    }
+
 def compute_tracking_metrics(cmd_time, cmd_pos, actual_time, actual_pos, cmd_vel=None, actual_vel=None):
     """Compute tracking metrics between commanded and actual values.
     
@@ -37,49 +91,25 @@ def compute_tracking_metrics(cmd_time, cmd_pos, actual_time, actual_pos, cmd_vel
         dict: Dictionary containing position and velocity metrics
     """
     # Interpolate actual positions to command timestamps
-    actual_interp = interp1d(actual_time, actual_pos, bounds_error=False, fill_value=np.nan)
-    actual_resampled = actual_interp(cmd_time)
+    actual_resampled = resample(actual_time, actual_pos, cmd_time)
     
     # Remove NaN values
     valid = ~np.isnan(actual_resampled)
     if not np.any(valid):
         return {}
         
-    t = np.array(cmd_time)[valid]
-    cmd = np.array(cmd_pos)[valid]
-    act = actual_resampled[valid]
-
     # Calculate position errors
-    errors = cmd - act
-    abs_errors = np.abs(errors)
-    
     metrics = {
-        "position": {
-            "rms_error": float(np.sqrt(np.mean(np.square(errors)))),
-            "max_error": float(np.max(abs_errors)),
-            "mean_error": float(np.mean(errors)),
-            "mean_abs_error": float(np.mean(abs_errors)),
-            "std_error": float(np.std(errors))
-        }
+        "position": error_statistics(np.asarray(cmd_pos)[valid] - actual_resampled[valid])
     }
 
     # Add velocity metrics if available
     if cmd_vel is not None and actual_vel is not None:
-        vel_interp = interp1d(actual_time, actual_vel, bounds_error=False, fill_value=np.nan)
-        vel_resampled = vel_interp(cmd_time)
+        vel_resampled = resample(actual_time, actual_vel, cmd_time)
         valid_vel = ~np.isnan(vel_resampled)
         
         if np.any(valid_vel):
-            vel_errors = np.array(cmd_vel)[valid_vel] - vel_resampled[valid_vel]
-            abs_vel_errors = np.abs(vel_errors)
-            
-            metrics["velocity"] = {
-                "rms_error": float(np.sqrt(np.mean(np.square(vel_errors)))),
-                "max_error": float(np.max(abs_vel_errors)),
-                "mean_error": float(np.mean(vel_errors)),
-                "mean_abs_error": float(np.mean(abs_vel_errors)),
-                "std_error": float(np.std(vel_errors))
-            }
+            metrics["velocity"] = error_statistics(np.asarray(cmd_vel)[valid_vel] - vel_resampled[valid_vel])
 
     return metrics
 
@@ -111,234 +141,211 @@ def compute_data_statistics(time, position, velocity):
         "actual_sample_rate": float(1.0 / np.mean(np.diff(time)))
     }
 
-def compute_frequency_response(cmd_time, cmd_pos, actual_time, actual_pos):
-    """Compute frequency response metrics including magnitude and phase."""
-    # Debug input data
-    print(f"\nFrequency Response Input:")
-    print(f"Command data points: {len(cmd_time)}")
-    print(f"Actual data points: {len(actual_time)}")
-    
-    # Convert inputs to numpy arrays
-    cmd_time = np.array(cmd_time)
-    cmd_pos = np.array(cmd_pos)
-    actual_time = np.array(actual_time)
-    actual_pos = np.array(actual_pos)
-    
-    # Debug time ranges
-    print(f"Command time range: {cmd_time[0]:.3f} to {cmd_time[-1]:.3f}")
-    print(f"Actual time range: {actual_time[0]:.3f} to {actual_time[-1]:.3f}")
-    print(f"Command position range: {np.min(cmd_pos):.3f} to {np.max(cmd_pos):.3f}")
-    print(f"Actual position range: {np.min(actual_pos):.3f} to {np.max(actual_pos):.3f}")
-    
-    # Ensure time arrays are strictly increasing
-    if not np.all(np.diff(actual_time) > 0):
-        print("Warning: Actual time array is not strictly increasing")
-        # Sort the arrays by time
-        sort_idx = np.argsort(actual_time)
-        actual_time = actual_time[sort_idx]
-        actual_pos = actual_pos[sort_idx]
-    
-    # Interpolate actual positions to command timestamps for analysis
-    try:
-        actual_interp = interp1d(actual_time, actual_pos, bounds_error=False, fill_value=np.nan)
-        actual_resampled = actual_interp(cmd_time)
-        
-        # Remove NaN values
-        valid = ~np.isnan(actual_resampled)
-        print(f"Valid interpolation points: {np.sum(valid)} out of {len(cmd_time)}")
-        
-        if not np.any(valid):
-            print("No valid data points after interpolation")
-            return {
-                "freq": [],
-                "magnitude": [],
-                "phase": [],
-                "coherence": []
-            }
-                
-        t = cmd_time[valid]
-        cmd = cmd_pos[valid]
-        act = actual_resampled[valid]
-
-        # Compute frequency response
-        fs = 1.0 / np.mean(np.diff(t))  # Average sample rate
-        print(f"Computed sample rate: {fs:.1f} Hz")
-        
-        f, coh = coherence(cmd, act, fs=fs)
-        f, Pxx = csd(cmd, act, fs=fs)
-        
-        # Calculate magnitude and phase
-        mag = np.abs(Pxx)
-        phase = np.angle(Pxx, deg=True)
-        
-        print(f"Computed {len(f)} frequency points")
-        return {
-            "freq": f.tolist(),
-            "magnitude": mag.tolist(),
-            "phase": phase.tolist(),
-            "coherence": coh.tolist()
-        }
-    except Exception as e:
-        print(f"Error in frequency response computation: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {
-            "freq": [],
-            "magnitude": [],
-            "phase": [],
-            "coherence": []
-        }
+def compute_frequency_response(cmd_time, cmd_pos, actual_time, actual_pos,
+                               segment=None, overlap=frf.DEFAULT_OVERLAP):
+    """Frequency response from the position command to the measured position.
 
-def analyze_frequency_response(sim_data=None, real_data=None):
+    Args:
+        cmd_time (array-like): Command timestamps (uniform grid)
+        cmd_pos (array-like): Commanded positions
+        actual_time (array-like): Measured timestamps
+        actual_pos (array-like): Measured positions
+        segment (int, optional): Welch segment length in samples
+        overlap (float): Segment overlap as a fraction of the segment length
+
+    Returns:
+        dict: H1 magnitude and phase, H2 and coherence (see frf.response_dict),
+            with empty lists if there is too little data
+    """
+    response = frf.tracking_frf(cmd_time, cmd_pos,
+                                {"position": resample(actual_time, actual_pos, cmd_time)},
+                                segment, overlap)
+    return response or {"freq": [], "magnitude": [], "phase": [], "coherence": []}
+
+def data_frequency_response(data, segment=None, overlap=frf.DEFAULT_OVERLAP):
+    """Frequency response of a data dict from the position command to every
+    recorded output channel (position, velocity, torque; see frf.CHANNELS).
+
+    Args:
+        data (dict): Data dict with cmd_time, cmd_pos, time and the channels
+        segment (int, optional): Welch segment length in samples
+        overlap (float): Segment overlap as a fraction of the segment length
+
+    Returns:
+        dict: Response in the frf.response_dict() layout, or an empty dict
+    """
+    if not data or "cmd_time" not in data or "time" not in data:
+        return {}
+    outputs = {name: resample(data["time"], data[name], data["cmd_time"])
+               for name in frf.CHANNELS if name in data}
+    if "position" not in outputs:
+        return {}
+    return frf.tracking_frf(data["cmd_time"], data["cmd_pos"], outputs, segment, overlap)
+
+def analyze_frequency_response(sim_data=None, real_data=None, segment=None,
+                               overlap=frf.DEFAULT_OVERLAP):
     """Analyze frequency response for both simulation and real system."""
     results = {}
-    
     if sim_data is not None:
-        print("\nAnalyzing Simulation Data:")
-        results["sim"] = compute_frequency_response(
-            sim_data["cmd_time"],
-            sim_data["cmd_pos"],
-            sim_data["time"],
-            sim_data["position"]
-        )
-    
+        results["sim"] = data_frequency_response(sim_data, segment, overlap)
     if real_data is not None:
-        print("\nAnalyzing Real System Data:")
-        results["real"] = compute_frequency_response(
-            real_data["cmd_time"],
-            real_data["cmd_pos"],
-            real_data["time"],
-            real_data["position"]
-        )
+        results["real"] = data_frequency_response(real_data, segment, overlap)
     return results
 
+def system_frequency_response(data, segment=None, overlap=frf.DEFAULT_OVERLAP):
+    """Frequency response of one system's valid samples.
+
+    Args:
+        data (dict): Data dict of the system
+        segment (int, optional): Welch segment length in samples
+        overlap (float): Segment overlap as a fraction of the segment length
+
+    Returns:
+        dict: freq, magnitude, phase, coherence and per-channel responses,
+            or an empty dict
+    """
+    return data_frequency_response(valid_samples(data), segment, overlap)
+
 def compute_bandwidth(freq, magnitude):
-    """Compute the -3dB bandwidth from frequency response data."""
-    if not freq or not magnitude or len(freq) == 0 or len(magnitude) == 0:
+    """Compute the -3dB bandwidth from frequency response data, relative to
+    the gain at the lowest frequency."""
+    if freq is None or magnitude is None or len(freq) == 0 or len(magnitude) == 0:
         print("Warning: Empty frequency response data")
         return None
 
-    # Convert magnitude to dB
+    # Convert magnitude to dB, normalized to 0dB at the lowest frequency
     mag_db = 20 * np.log10(np.abs(magnitude))
-    
-    # Normalize to 0dB at DC
     mag_db = mag_db - mag_db[0]
-    
-    # Debug prints
-    print(f"Frequency points: {len(freq)}")
-    print(f"Magnitude range: {mag_db.min():.1f}dB to {mag_db.max():.1f}dB")
-    
+
     # Find first crossing of -3dB
     cutoff_idx = np.where(mag_db <= -3)[0]
-    
     if len(cutoff_idx) > 0:
-        bandwidth = float(freq[cutoff_idx[0]])
-        print(f"Found -3dB point at {bandwidth:.1f}Hz")
-        return bandwidth
-    else:
-        print("No -3dB crossing found in data")
-        return None
+        return float(freq[cutoff_idx[0]])
+    return None
     
-def compute_step_metrics(time_array, pos_array, step_size, hold_time, step_count):
+def step_transitions(cmd_time, cmd_pos):
+    """Steps of a piecewise-constant command, read from the logged command.
+
+    Args:
+        cmd_time (array-like): Command timestamps
+        cmd_pos (array-like): Commanded positions
+
+    Returns:
+        tuple: Time of each step, and the position before and after it
     """
-    Compute comprehensive step response metrics.
-    
+    cmd_time = np.asarray(cmd_time, dtype=float)
+    cmd_pos = np.asarray(cmd_pos, dtype=float)
+    changes = np.flatnonzero(cmd_pos[1:] != cmd_pos[:-1]) + 1
+    return cmd_time[changes], cmd_pos[changes - 1], cmd_pos[changes]
+
+def _crossing_times(t, r, level, first, starts, ends):
+    """Time at which each step's normalized response first reaches level,
+    interpolated between the samples around the crossing; NaN if it never does."""
+    index = np.arange(len(r))
+    reached = np.minimum.reduceat(np.where(r >= level, index, len(r)), starts)
+    found = reached < ends
+    i = np.where(found, reached, 0)
+    # Interpolate from the previous sample of the same step
+    previous = np.maximum(i - 1, 0)
+    interior = found & (i > starts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.clip((level - r[previous]) / (r[i] - r[previous]), 0.0, 1.0)
+    times = np.where(interior, t[previous] + fraction * (t[i] - t[previous]), t[i])
+    return np.where(found, times - first, np.nan)
+
+def compute_step_metrics(cmd_time, cmd_pos, time_array, pos_array, settling_band=0.02):
+    """Step response metrics of every step in the logged command.
+
+    Steps are the transitions of the command as it was sent, so fixed and
+    random step sequences are measured alike. The response to step k is
+    the samples from its command time up to the next step (or the end of
+    the data), all located with one searchsorted, and normalized so that
+    0 is the previous target and 1 the new one. Every metric is then a
+    segmented reduction over all steps at once.
+
     Args:
-        time_array: Array of time stamps (seconds)
-        pos_array: Array of measured positions (degrees)
-        step_size: Size of each step (degrees)
-        hold_time: Duration to hold each position (seconds)
-        step_count: Number of steps to analyze
+        cmd_time (array-like): Command timestamps (seconds)
+        cmd_pos (array-like): Commanded positions (degrees)
+        time_array (array-like): Measured timestamps (seconds)
+        pos_array (array-like): Measured positions (degrees)
+        settling_band (float): Settling band as a fraction of the step size
+
+    Returns:
+        list: Per step dict with its 'time', 'start', 'target' and 'size'
+            (degrees), 'overshoot' (% of the step size), 'rise_time' (10% to
+            90%), 'settling_time' (until the response stays within the band)
+            and 'peak_time' (seconds from the step); None where not reached
+            or not measured
     """
-    time_array = np.array(time_array)
-    pos_array = np.array(pos_array)
-    start_pos = pos_array[0]
-
-    # Build step sequence
-    steps = [(start_pos, hold_time)]
-    for _ in range(step_count):
-        steps.append((start_pos + step_size, hold_time))
-        steps.append((start_pos, hold_time))
-
-    # Build array of step command times
-    step_times = [0.0]
-    for (target, duration) in steps:
-        step_times.append(step_times[-1] + duration)
-
-    step_metrics = []
-    print("\nStep Response Metrics:")
-    
-    for i in range(1, len(steps)):
-        old_target = steps[i-1][0]
-        new_target = steps[i][0]
-        command_time = step_times[i]
-        window_end = step_times[i] + hold_time
-
-        # Find data within step window
-        idx = np.where((time_array >= command_time) & 
-                      (time_array <= window_end))[0]
-        if len(idx) == 0:
-            continue
-            
-        t_window = time_array[idx] - command_time
-        p_window = pos_array[idx]
-        
-        # Calculate step metrics
-        metrics = {}
-        
-         # Overshoot calculation
-        step_size_actual = abs(step_size)  # Use the commanded step size
-        if step_size_actual > 0:
-            if step_size > 0:  # Positive step (moving up)
-                # If we go higher than target, that's overshoot
-                overshoot = max(0.0, (p_window.max() - new_target) / step_size_actual * 100.0)
-            else:  # Negative step (moving down)
-                # If we go lower than target, that's overshoot
-                overshoot = max(0.0, (new_target - p_window.min()) / step_size_actual * 100.0)
-        else:
-            overshoot = 0.0
-            
-        metrics['overshoot'] = overshoot
+    step_time, start, target = step_transitions(cmd_time, cmd_pos)
+    t = np.asarray(time_array, dtype=float)
+    p = np.asarray(pos_array, dtype=float)
+    if not len(step_time) or not len(t):
+        return []
 
-    
-        # Rise time (10% to 90%)
-        ten_pct = old_target + 0.1 * (new_target - old_target)
-        ninety_pct = old_target + 0.9 * (new_target - old_target)
-        
-        # Find crossing times
-        t_10 = t_window[np.where(np.diff(np.signbit(p_window - ten_pct)))[0]]
-        t_90 = t_window[np.where(np.diff(np.signbit(p_window - ninety_pct)))[0]]
-        
-        if len(t_10) > 0 and len(t_90) > 0:
-            metrics['rise_time'] = float(t_90[0] - t_10[0])
-        else:
-            metrics['rise_time'] = None
-
-        # Settling time (±2% of step size)
-        settling_band = step_size_actual * 0.02
-        settled_idx = np.where(abs(p_window - new_target) <= settling_band)[0]
-        if len(settled_idx) > 0:
-            metrics['settling_time'] = float(t_window[settled_idx[0]])
-        else:
-            metrics['settling_time'] = None
-
-        # Peak time
-        peak_idx = np.argmax(abs(p_window - new_target))
-        metrics['peak_time'] = float(t_window[peak_idx])
-        
-        # Debug prints
-        print(f"\nStep {i}:")
-        print(f"  Old target: {old_target:.2f}°")
-        print(f"  New target: {new_target:.2f}°")
-        print(f"  Step size: {step_size_actual:.2f}°")
-        print(f"  Overshoot: {metrics['overshoot']:.1f}%")
-        print(f"  Rise time: {metrics['rise_time']:.3f}s" if metrics['rise_time'] else "  Rise time: N/A")
-        print(f"  Settling time: {metrics['settling_time']:.3f}s" if metrics['settling_time'] else "  Settling time: N/A")
-        print(f"  Peak time: {metrics['peak_time']:.3f}s")
-        
-        step_metrics.append(metrics)
+    # Sample range of every step's window
+    bounds = np.searchsorted(t, np.append(step_time, np.inf))
+    starts, ends = bounds[:-1], bounds[1:]
+    measured = ends > starts
+    step_time, start, target = step_time[measured], start[measured], target[measured]
+    starts, ends = starts[measured], ends[measured]
+    if not len(starts):
+        return []
+
+    # Windows are back to back; normalize each sample against its own step
+    size = target - start
+    step_of = np.repeat(np.arange(len(starts)), ends - starts)
+    t, p = t[starts[0]:ends[-1]], p[starts[0]:ends[-1]]
+    r = (p - start[step_of]) / size[step_of]
+    local_starts, local_ends = starts - starts[0], ends - starts[0]
+    index = np.arange(len(r))
+
+    peak = np.fmax.reduceat(r, local_starts)
+    overshoot = np.maximum(0.0, peak - 1.0) * 100.0
+    peak_index = np.minimum.reduceat(np.where(r == peak[step_of], index, len(r)), local_starts)
+    peak_index = np.minimum(peak_index, local_ends - 1)
+    peak_time = np.where(np.isnan(peak), np.nan, t[peak_index] - step_time)
+
+    rise_time = (_crossing_times(t, r, 0.9, step_time, local_starts, local_ends)
+                 - _crossing_times(t, r, 0.1, step_time, local_starts, local_ends))
+
+    # Settled from the first sample after the last one outside the band
+    outside = ~(np.abs(r - 1.0) <= settling_band)
+    last_outside = np.maximum.reduceat(np.where(outside, index, -1), local_starts)
+    settled = np.maximum(last_outside + 1, local_starts)
+    settling_time = np.where(settled < local_ends,
+                             t[np.minimum(settled, len(r) - 1)] - step_time, np.nan)
 
-    return step_metrics
+    def optional(value):
+        return None if np.isnan(value) else float(value)
+
+    return [
+        {
+            "time": float(step_time[k]),
+            "start": float(start[k]),
+            "target": float(target[k]),
+            "size": float(size[k]),
+            "overshoot": float(overshoot[k]) if not np.isnan(overshoot[k]) else 0.0,
+            "rise_time": optional(rise_time[k]),
+            "settling_time": optional(settling_time[k]),
+            "peak_time": optional(peak_time[k]),
+        }
+        for k in range(len(starts))
+    ]
+
+def sysid_samples(data: Dict) -> Recorder:
+    """Per-sample columns of a system identification experiment.
+
+    A live experiment carries its Recorder under 'samples' and a binary log
+    its columns; a JSON log only has the exported 'entries', which are
+    loaded into a Recorder here.
+    """
+    if 'samples' in data:
+        return data['samples']
+    if isinstance(data['entries'], dict):
+        # Entries of a JSON log converted to a binary log
+        return data['entries']
+    return Recorder.from_records(data['entries'])
 
 def analyze_sysid_data(data: Dict) -> Dict:
     """Analyze system identification data quality
@@ -346,23 +353,22 @@ def analyze_sysid_data(data: Dict) -> Dict:
     Args:
         data: Dictionary containing experiment data and config
     """
-    # Extract timestamps and convert to numpy array
-    timestamps = np.array([entry['timestamp'] for entry in data['entries']])
+    timestamps = sysid_samples(data)['timestamp']
     dt = np.diff(timestamps)
     
     metrics = {
         # Sampling statistics
         'total_samples': len(timestamps),
-        'duration': timestamps[-1] - timestamps[0],
-        'dt_mean': np.mean(dt),
-        'dt_std': np.std(dt),
-        'dt_min': np.min(dt),
-        'dt_max': np.max(dt),
-        'actual_rate': 1.0/np.mean(dt),
+        'duration': float(timestamps[-1] - timestamps[0]),
+        'dt_mean': float(np.mean(dt)),
+        'dt_std': float(np.std(dt)),
+        'dt_min': float(np.min(dt)),
+        'dt_max': float(np.max(dt)),
+        'actual_rate': float(1.0/np.mean(dt)),
         'target_rate': data['sample_rate'],
         
         # Data completeness
-        'missing_samples': sum(dt > (2.0 * np.mean(dt))),  # Gaps > 2x mean dt
+        'missing_samples': int(np.sum(dt > (2.0 * np.mean(dt)))),  # Gaps > 2x mean dt
         
         # Trajectory info
         'trajectory_type': data['trajectory'],
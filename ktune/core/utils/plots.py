@@ -1,25 +1,30 @@
 import matplotlib.pyplot as plt
 import numpy as np
 from ktune import __version__
-from ktune.core.utils import metrics
+from ktune.core.utils import decimate, metrics
+from ktune.core.utils.analysis import analysis_contexts
 import os
 from pathlib import Path
 class Plot:
     """Handles plotting of test results."""
 
-    def __init__(self, config, sim_data=None, real_data=None):
+    def __init__(self, config, sim_data=None, real_data=None, analysis=None):
         """Initialize the TestPlotter.
         
         Args:
             config: Test configuration object
             sim_data (dict, optional): Simulation data
             real_data (dict, optional): Real robot data
+            analysis (dict, optional): AnalysisContext per system whose
+                metrics to reuse, built from the data otherwise
         """
         self.config = config
         self.mode = config.mode
-        self.sim_data = sim_data
-        self.real_data = real_data
-        print(f"**********sim_data keys: {self.sim_data.keys()}")
+        # Plots show the valid samples only
+        self.analysis = analysis_contexts(sim_data, real_data, analysis,
+                                          config.frf_segment, config.frf_overlap)
+        self.sim_data = self.analysis["sim"].data
+        self.real_data = self.analysis["real"].data
 
     def create_plots(self, timestamp: str, plot_dir: str):
         """Create and save all test plots.
@@ -43,29 +48,29 @@ class Plot:
         # Plot data based on mode
         if self.mode in ['compare', 'sim']:
             # Plot simulation data in blue
-            ax_pos.plot(self.sim_data["cmd_time"], self.sim_data["cmd_pos"], 'k--',
+            decimate.plot(ax_pos, self.sim_data["cmd_time"], self.sim_data["cmd_pos"], 'k--',
                     linewidth=1, label='Command')
-            ax_pos.plot(self.sim_data["time"], self.sim_data["position"], 'b-',
+            decimate.plot(ax_pos, self.sim_data["time"], self.sim_data["position"], 'b-',
                     linewidth=1, label='Sim')
             
             if self.config.test in ["sine", "chirp"]:
-                ax_vel.plot(self.sim_data["cmd_time"], self.sim_data["cmd_vel"], 'k--',
+                decimate.plot(ax_vel, self.sim_data["cmd_time"], self.sim_data["cmd_vel"], 'k--',
                         linewidth=1, label='Command')
-            ax_vel.plot(self.sim_data["time"], self.sim_data["velocity"], 'b-',
+            decimate.plot(ax_vel, self.sim_data["time"], self.sim_data["velocity"], 'b-',
                     linewidth=1, label='Sim')
 
         if self.mode in ['compare', 'real']:
             # Plot real data in red
             if self.mode != 'compare':  # Only plot command if not already plotted
-                ax_pos.plot(self.real_data["cmd_time"], self.real_data["cmd_pos"], 'k--',
+                decimate.plot(ax_pos, self.real_data["cmd_time"], self.real_data["cmd_pos"], 'k--',
                         linewidth=1, label='Command')
                 if self.config.test in ["sine", "chirp"]:
-                    ax_vel.plot(self.real_data["cmd_time"], self.real_data["cmd_vel"], 'k--',
+                    decimate.plot(ax_vel, self.real_data["cmd_time"], self.real_data["cmd_vel"], 'k--',
                             linewidth=1, label='Command')
             
-            ax_pos.plot(self.real_data["time"], self.real_data["position"], 'r-',
+            decimate.plot(ax_pos, self.real_data["time"], self.real_data["position"], 'r-',
                     linewidth=1, label='Real')
-            ax_vel.plot(self.real_data["time"], self.real_data["velocity"], 'r-',
+            decimate.plot(ax_vel, self.real_data["time"], self.real_data["velocity"], 'r-',
                     linewidth=1, label='Real')
 
         # Format position plot
@@ -162,9 +167,17 @@ class Plot:
                 # Plot phase
                 ax_phase.semilogx(freq, phase, '-', color=color, label=label)
 
+                # Streaming estimate recorded while the chirp ran
+                sweep = data.get("sweep_response") or {}
+                if len(sweep.get("freq", ())):
+                    ax_mag.semilogx(sweep["freq"], 20 * np.log10(sweep["magnitude"]), 'o',
+                                    color=color, markersize=3, label=f"{label} (sweep)")
+                    ax_phase.semilogx(sweep["freq"], sweep["phase"], 'o', color=color,
+                                      markersize=3, label=f"{label} (sweep)")
+
                 # Add bandwidth annotation if we can compute it
                 try:
-                    bandwidth = metrics.compute_bandwidth(freq, mag)
+                    bandwidth = self.analysis[label.lower()].bandwidth()
                     if bandwidth:
                         ax_mag.axvline(x=bandwidth, color=color, linestyle='--', alpha=0.5)
                         ax_mag.text(bandwidth, -3, f'{label} BW: {bandwidth:.1f}Hz', 
@@ -261,13 +274,7 @@ class Plot:
         metrics_strings = []
         
         if self.mode in ['compare', 'sim'] and self.sim_data:
-            sim_metrics = metrics.compute_step_metrics(
-                np.array(self.sim_data["time"]),
-                np.array(self.sim_data["position"]),
-                self.config.step_size,
-                self.config.step_hold_time,
-                self.config.step_count
-            )
+            sim_metrics = self.analysis["sim"].step_metrics()
             if sim_metrics:
                 sim_avg = {
                     'overshoot': np.mean([m['overshoot'] for m in sim_metrics]),
@@ -281,13 +288,7 @@ class Plot:
                 )
 
         if self.mode in ['compare', 'real'] and self.real_data:
-            real_metrics = metrics.compute_step_metrics(
-                np.array(self.real_data["time"]),
-                np.array(self.real_data["position"]),
-                self.config.step_size,
-                self.config.step_hold_time,
-                self.config.step_count
-            )
+            real_metrics = self.analysis["real"].step_metrics()
             if real_metrics:
                 real_avg = {
                     'overshoot': np.mean([m['overshoot'] for m in real_metrics]),
@@ -312,7 +313,7 @@ class PendulumPlot:
             data: Dictionary containing experiment data and config
         """
         self.data = data
-        self.entries = data['entries']
+        self.samples = metrics.sysid_samples(data)
 
     def create_plots(self, save_dir: str | Path, timestamp: str = None):
         """Create and save analysis plots.
@@ -322,36 +323,35 @@ class PendulumPlot:
             timestamp: Optional timestamp for file naming
         """
         # Extract time series data
-        t = np.array([entry['timestamp'] for entry in self.entries])
-        pos = np.array([entry['position'] for entry in self.entries])
-        vel = np.array([entry['speed'] for entry in self.entries])
-        torque = np.array([entry['torque'] for entry in self.entries])
-        goal_pos = np.array([entry['goal_position'] for entry in self.entries])
-        torque_enabled = np.array([entry['torque_enable'] for entry in self.entries])
+        t = self.samples['timestamp']
+        pos = self.samples['position']
+        vel = self.samples['speed']
+        torque = self.samples['torque']
+        goal_pos = self.samples['goal_position']
+        torque_enabled = self.samples['torque_enable']
 
         # Create main results plot
         fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
         fig.suptitle(f"Pendulum System ID - {self.data['trajectory']}", fontsize=14)
         
         # Position tracking plot
-        ax1.plot(t, np.rad2deg(goal_pos), 'k--', label='Command', linewidth=1)
-        ax1.plot(t, np.rad2deg(pos), 'b-', label='Actual', linewidth=1)
+        decimate.plot(ax1, t, np.rad2deg(goal_pos), 'k--', label='Command', linewidth=1)
+        decimate.plot(ax1, t, np.rad2deg(pos), 'b-', label='Actual', linewidth=1)
         ax1.set_ylabel('Position (deg)')
         ax1.grid(True)
         ax1.legend()
         
         # Velocity plot
-        ax2.plot(t, np.rad2deg(vel), 'g-', label='Velocity', linewidth=1)
+        decimate.plot(ax2, t, np.rad2deg(vel), 'g-', label='Velocity', linewidth=1)
         ax2.set_ylabel('Velocity (deg/s)')
         ax2.grid(True)
         ax2.legend()
         
         # Torque plot with enable status
-        ax3.plot(t, torque, 'r-', label='Torque', linewidth=1)
-        # Add shaded regions for torque disabled periods
-        for i in range(len(t)-1):
-            if not torque_enabled[i]:
-                ax3.axvspan(t[i], t[i+1], color='gray', alpha=0.3)
+        decimate.plot(ax3, t, torque, 'r-', label='Torque', linewidth=1)
+        # Add shaded regions for torque disabled periods, one per run of samples
+        for start, end in decimate.spans(t, ~np.asarray(torque_enabled, dtype=bool)):
+            ax3.axvspan(start, end, color='gray', alpha=0.3)
         ax3.set_ylabel('Torque')
         ax3.set_xlabel('Time (s)')
         ax3.grid(True)
@@ -383,7 +383,7 @@ class PendulumPlot:
         
         # Position error
         pos_error = np.rad2deg(goal_pos - pos)
-        ax1.plot(t, pos_error, 'b-', label='Position Error')
+        decimate.plot(ax1, t, pos_error, 'b-', label='Position Error')
         ax1.set_ylabel('Position Error (deg)')
         ax1.grid(True)
         ax1.legend()
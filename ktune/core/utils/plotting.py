@@ -0,0 +1,144 @@
+import atexit
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+
+# none: skip plots, deferred: render in worker processes, inline: render now
+PLOT_MODES = ("none", "deferred", "inline")
+
+
+def init_worker():
+    """Plot without a display in worker processes (ProcessPoolExecutor initializer)."""
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def render_tune_plots(config, sim_data, real_data, timestamp: str, plot_dir: str,
+                      analysis: dict = None) -> str:
+    """Render the plots of a tune test. Runs in a worker for deferred plots."""
+    from ktune.core.utils.plots import Plot
+    Plot(config, sim_data, real_data, analysis).create_plots(timestamp, plot_dir)
+    return plot_dir
+
+
+def render_pendulum_plots(data: dict, save_dir: str, timestamp: str) -> str:
+    """Render the plots of a sysid experiment. Runs in a worker for deferred plots."""
+    from ktune.core.utils.plots import PendulumPlot
+    PendulumPlot(data).create_plots(save_dir=save_dir, timestamp=timestamp)
+    return save_dir
+
+
+class PlotService:
+    """Renders plots according to a plot mode and hands back futures.
+
+    In deferred mode figures are rendered by a pool of worker processes
+    using the Agg backend, so the caller can move on to the next test while
+    they are drawn; wait() blocks until all of them are written. Workers are
+    spawned rather than forked, since the caller usually has live gRPC
+    channels, which are not safe to fork. Inline mode
+    renders in the calling process before returning, and none skips
+    plotting. Either way the caller gets a Future.
+
+    Example:
+        service = PlotService("deferred")
+        service.submit(render_tune_plots, config, sim, real, timestamp, plot_dir)
+        ...
+        service.wait()
+    """
+
+    def __init__(self, mode: str = "deferred", workers: int = None):
+        """Initialize the service.
+
+        Args:
+            mode (str): One of PLOT_MODES
+            workers (int, optional): Worker processes for deferred mode,
+                defaults to the CPU count (at most 4)
+        """
+        if mode not in PLOT_MODES:
+            raise ValueError(f"Unknown plot mode '{mode}', expected one of {PLOT_MODES}")
+        self.mode = mode
+        self.workers = workers or max(1, min(4, os.cpu_count() or 1))
+        self._executor = None
+        self._pending = []
+
+    def submit(self, render, *args) -> Future:
+        """Render plots with render(*args) according to the mode.
+
+        Arguments are pickled for deferred rendering, so pass data that is
+        not modified afterwards.
+
+        Returns:
+            Future: Resolves to render's return value, or None when skipped
+        """
+        if self.mode == "deferred":
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=init_worker,
+                    mp_context=multiprocessing.get_context("spawn"))
+            future = self._executor.submit(render, *args)
+            self._pending.append(future)
+            return future
+
+        future = Future()
+        if self.mode == "none":
+            future.set_result(None)
+            return future
+        try:
+            future.set_result(render(*args))
+        except Exception as e:
+            print(f"Warning: could not create plots: {e}")
+            future.set_exception(e)
+        return future
+
+    def wait(self) -> list:
+        """Wait until every deferred plot is written.
+
+        Returns:
+            list: Exceptions of the renders that failed
+        """
+        pending, self._pending = self._pending, []
+        if pending:
+            print(f"\nWaiting for {len(pending)} deferred plot jobs...")
+        errors = []
+        for future in pending:
+            error = future.exception()
+            if error is not None:
+                print(f"Warning: could not create plots: {error}")
+                errors.append(error)
+        return errors
+
+    def shutdown(self):
+        """Wait for pending plots and stop the workers."""
+        self.wait()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+# Process-wide service per mode, shared by every test of a run
+_services = {}
+
+
+def get_service(mode: str) -> PlotService:
+    """Shared PlotService for a plot mode."""
+    if mode not in _services:
+        _services[mode] = PlotService(mode)
+    return _services[mode]
+
+
+def wait_all() -> list:
+    """Wait for the deferred plots of every shared service.
+
+    Returns:
+        list: Exceptions of the renders that failed
+    """
+    errors = []
+    for service in _services.values():
+        errors.extend(service.wait())
+    return errors
+
+
+@atexit.register
+def _shutdown_services():
+    for service in _services.values():
+        service.shutdown()
@@ -0,0 +1,222 @@
+from collections.abc import MutableMapping
+import numpy as np
+
+
+class Recorder:
+    """Growable structured array of samples, one row per record.
+
+    Every field is stored in one preallocated NumPy structured array, so a
+    sample costs its dtype size (8 bytes for float64, 4 for float32) rather
+    than a Python float plus a list slot per value. Columns are exposed as
+    zero-copy views. A view stays valid until an append has to grow the
+    array; reserve() the expected number of rows up front to avoid that.
+
+    Hot loops can write a row in place instead: claim() it, then set each
+    value through columns, without building a tuple per row.
+
+    A recorder can also stream its rows to a sink in fixed-size chunks (see
+    stream_to()), in which case only the rows since the last chunk are kept
+    in memory and memory use no longer grows with the run length.
+
+    Example:
+        rec = Recorder([("time", "f8"), ("position", "f4")])
+        rec.append((0.01, 12.5))
+        rec["position"]  # array([12.5], dtype=float32)
+
+        row = rec.claim()
+        rec.columns[0][row] = 0.02
+        rec.columns[1][row] = 12.7
+    """
+
+    def __init__(self, fields, capacity: int = 1024):
+        """Initialize the recorder.
+
+        Args:
+            fields (list): (name, dtype) pairs, in row order
+            capacity (int): Number of rows to preallocate
+        """
+        self.dtype = np.dtype(list(fields))
+        self.names = self.dtype.names
+        self._data = np.zeros(max(int(capacity), 1), dtype=self.dtype)
+        # One view of the whole array per field, in field order
+        self.columns = [self._data[name] for name in self.names]
+        self._size = 0
+        # Streaming: chunk sink, rows per chunk and rows already handed off
+        self._sink = None
+        self._chunk_rows = 0
+        self._flushed = 0
+
+    @classmethod
+    def from_records(cls, records: list, fields=None) -> "Recorder":
+        """Build a recorder from a list of dicts, e.g. a loaded log.
+
+        Args:
+            records (list): One dict per row
+            fields (list, optional): (name, dtype) pairs. Defaults to every
+                key of the first record as float64.
+        """
+        if fields is None:
+            fields = [(name, "f8") for name in (records[0] if records else {})]
+        recorder = cls(fields, capacity=len(records))
+        names = recorder.names
+        for record in records:
+            recorder.append(tuple(record[name] for name in names))
+        return recorder
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "Recorder":
+        """Build a recorder holding a copy of a structured array's rows."""
+        recorder = cls(array.dtype.descr, capacity=len(array))
+        recorder._data[:len(array)] = array
+        recorder._size = len(array)
+        return recorder
+
+    def append(self, row: tuple):
+        """Write one row, with values in field order."""
+        if self._size == len(self._data):
+            self.reserve(2 * len(self._data))
+        self._data[self._size] = row
+        self._size += 1
+        if self._sink is not None and self._size - self._flushed >= self._chunk_rows:
+            self.flush()
+
+    def claim(self) -> int:
+        """Start a new row and return its index.
+
+        The caller sets every value of the row through columns before the
+        next claim() or append(). Read columns after claiming, since growing
+        the array replaces them.
+        """
+        # Hand off the chunk completed by the previous row first
+        if self._sink is not None and self._size - self._flushed >= self._chunk_rows:
+            self.flush()
+        if self._size == len(self._data):
+            self.reserve(2 * len(self._data))
+        self._size += 1
+        return self._size - 1
+
+    def stream_to(self, sink, chunk_rows: int = 256):
+        """Hand rows to sink in chunks as they are recorded.
+
+        Every chunk_rows appended rows are passed to sink as a structured
+        array and dropped from memory, except for the last row, so that
+        column[-1] still reads the latest sample.
+
+        Args:
+            sink: Callable taking a structured array of rows, which must copy
+                them before returning (e.g. JournalWriter.sink())
+            chunk_rows (int): Rows per chunk
+        """
+        self._sink = sink
+        self._chunk_rows = max(int(chunk_rows), 1)
+        self._flushed = 0
+
+    def flush(self):
+        """Hand the rows recorded since the last chunk to the sink."""
+        if self._sink is None or self._size == self._flushed:
+            return
+        self._sink(self._data[self._flushed:self._size])
+        self._data[0] = self._data[self._size - 1]
+        self._size = 1
+        self._flushed = 1
+
+    def detach(self):
+        """Flush the remaining rows and stop streaming."""
+        self.flush()
+        self._sink = None
+
+    def reserve(self, capacity: int):
+        """Grow the array to hold at least capacity rows."""
+        if capacity <= len(self._data):
+            return
+        data = np.zeros(capacity, dtype=self.dtype)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
+        self.columns = [data[name] for name in self.names]
+
+    def view(self) -> np.ndarray:
+        """The filled rows as a structured array, without copying."""
+        return self._data[:self._size]
+
+    def to_records(self) -> list:
+        """The filled rows as a list of dicts of Python scalars."""
+        return [dict(zip(self.names, row)) for row in self.view().tolist()]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the filled rows."""
+        return self._size * self.dtype.itemsize
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._data[name][:self._size]
+
+
+class ColumnMap(MutableMapping):
+    """Dict-like access by column name to the fields of several Recorders.
+
+    Lets code written against dict-of-list data (data["time"],
+    data.get("cmd_pos"), len(data["position"])) read recorder columns as
+    zero-copy arrays. Aliases map extra names onto existing fields, and
+    keys that are not recorder fields (e.g. an attached freq_response) are
+    kept as ordinary entries.
+    """
+
+    def __init__(self, recorders: dict, aliases: dict = None):
+        """Initialize the map.
+
+        Args:
+            recorders (dict): Recorder per stream name
+            aliases (dict, optional): Alias name -> field name
+        """
+        self.recorders = recorders
+        self.aliases = aliases or {}
+        self._extra = {}
+
+    def _recorder_for(self, key):
+        key = self.aliases.get(key, key)
+        for recorder in self.recorders.values():
+            if key in recorder:
+                return recorder, key
+        return None, key
+
+    def __getitem__(self, key):
+        recorder, field = self._recorder_for(key)
+        if recorder is not None:
+            return recorder[field]
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        recorder, field = self._recorder_for(key)
+        if recorder is not None:
+            recorder[field][:] = value
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        del self._extra[key]
+
+    def __iter__(self):
+        for recorder in self.recorders.values():
+            yield from recorder.names
+        yield from self.aliases
+        yield from self._extra
+
+    def __len__(self):
+        return (sum(len(recorder.names) for recorder in self.recorders.values())
+                + len(self.aliases) + len(self._extra))
+
+    def reserve(self, capacity: int):
+        """Reserve capacity rows in every recorder."""
+        for recorder in self.recorders.values():
+            recorder.reserve(capacity)
+
+    def to_dict(self) -> dict:
+        """All columns as JSON-serializable lists."""
+        return {key: value.tolist() if isinstance(value, np.ndarray) else value
+                for key, value in self.items()}
@@ -0,0 +1,148 @@
+import asyncio
+import time
+import numpy as np
+from ktune.core.utils.buffers import ColumnBuffer
+
+
+class Scheduler:
+    """Absolute-deadline loop scheduler on a monotonic clock.
+
+    Deadlines are laid out on a fixed grid from the start time, so time spent
+    in the loop body (RPCs, logging) does not accumulate as drift. A tick that
+    wakes up late runs immediately and is counted as an overrun; deadlines
+    that were missed entirely are skipped rather than bursted to catch up.
+
+    With a spin window, the last part of each wait is a busy-wait on the
+    clock instead of a sleep, trading CPU for a tighter wake-up. The spin
+    yields to the event loop on every pass, so it never holds up other tasks.
+    """
+
+    def __init__(self, rate: float, spin: float = 0.0):
+        """Initialize the scheduler.
+
+        Args:
+            rate (float): Target loop rate (Hz)
+            spin (float): Seconds before each deadline to busy-wait rather
+                than sleep. 0 disables spinning.
+        """
+        if rate <= 0:
+            raise ValueError(f"Scheduler rate must be positive, got {rate}")
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.spin = spin
+        self.tick = 0
+        self.overruns = 0
+        self.skipped_ticks = 0
+        self._start = None
+        self._new_columns()
+
+    def start(self, origin: float = None):
+        """Start the clock. The first deadline is the start time itself.
+
+        Args:
+            origin (float, optional): time.monotonic() value to use as the
+                start time, so several schedulers can share one time base
+        """
+        self._start = time.monotonic() if origin is None else origin
+        self.tick = 0
+        self.overruns = 0
+        self.skipped_ticks = 0
+        self._new_columns()
+        self._tick_times.append(0.0)
+
+    def _new_columns(self):
+        """Per-tick timing columns, preallocated so that recording a tick
+        does not allocate."""
+        self._tick_times = ColumnBuffer()
+        self._sleep_requested = ColumnBuffer()
+        self._sleep_actual = ColumnBuffer()
+        self._lateness = ColumnBuffer()
+
+    def elapsed(self) -> float:
+        """Seconds since start() on the monotonic clock."""
+        return time.monotonic() - self._start
+
+    def deadline(self) -> float:
+        """Scheduled time of the current tick, relative to start()."""
+        return self.tick * self.period
+
+    def remaining(self) -> float:
+        """Seconds left until the next tick's deadline (negative when late)."""
+        return self._start + (self.tick + 1) * self.period - time.monotonic()
+
+    async def wait(self):
+        """Sleep until the next absolute deadline."""
+        self.tick += 1
+        deadline = self._start + self.tick * self.period
+        now = time.monotonic()
+
+        if now >= deadline:
+            self.overruns += 1
+            requested = 0.0
+            missed = int((now - deadline) / self.period)
+            if missed:
+                self.skipped_ticks += missed
+                self.tick += missed
+            # Yield to the event loop even when late
+            await asyncio.sleep(0)
+        else:
+            requested = deadline - now
+            if self.spin:
+                # Sleep short of the deadline, then spin out the remainder,
+                # yielding on every pass so other tasks on the loop (pipelined
+                # writers and samplers, other robots of a fleet) still run
+                await asyncio.sleep(max(requested - self.spin, 0.0))
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(0)
+            else:
+                await asyncio.sleep(requested)
+
+        woke = time.monotonic()
+        self._sleep_requested.append(requested)
+        self._sleep_actual.append(woke - now)
+        # Measured against the deadline that was due, before any skip
+        self._lateness.append(woke - deadline)
+        self._tick_times.append(woke - self._start)
+
+    def latency_columns(self) -> dict:
+        """Per-tick sleep timing, one entry per wait() call.
+
+        Returns:
+            dict: sleep_requested, sleep_actual and lateness columns (seconds).
+                Lateness is wake-up time minus the deadline that was due.
+        """
+        return {
+            "sleep_requested": self._sleep_requested.tolist(),
+            "sleep_actual": self._sleep_actual.tolist(),
+            "lateness": self._lateness.tolist()
+        }
+
+    def stats(self) -> dict:
+        """Summarize achieved timing.
+
+        Returns:
+            dict: Target and achieved rate, interval jitter, overrun and
+                skipped tick counts
+        """
+        ticks = np.array(self._tick_times)
+        intervals = np.diff(ticks)
+        if len(intervals) == 0:
+            return {
+                "target_rate": self.rate,
+                "achieved_rate": None,
+                "jitter_ms": None,
+                "max_interval_ms": None,
+                "ticks": len(ticks),
+                "overruns": self.overruns,
+                "skipped_ticks": self.skipped_ticks
+            }
+
+        return {
+            "target_rate": self.rate,
+            "achieved_rate": float(len(intervals) / (ticks[-1] - ticks[0])),
+            "jitter_ms": float(np.std(intervals) * 1000.0),
+            "max_interval_ms": float(np.max(intervals) * 1000.0),
+            "ticks": len(ticks),
+            "overruns": self.overruns,
+            "skipped_ticks": self.skipped_ticks
+        }
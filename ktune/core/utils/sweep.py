@@ -0,0 +1,174 @@
+import math
+
+# Whole chirp cycles per frequency bin of the streaming estimate
+DEFAULT_CYCLES = 2
+
+
+class SweepMonitor:
+    """Frequency response of a linear chirp, estimated while it runs.
+
+    The chirp's phase is known at every instant, angle(t) = 2π (f0 t +
+    k t² / 2), so each sample of the command and of the measured position is
+    demodulated against exp(-j angle) at its own timestamp and summed. The
+    sweep is cut into bins of a few whole chirp cycles; when a bin ends, the
+    ratio of the response and command sums is the complex gain at the bin's
+    mean frequency. The first bin, where the response is still building up
+    from rest, is discarded. Each sample costs a few multiply-adds and each bin
+    one division, so the Bode estimate is complete when the chirp ends and
+    memory only grows by one point per bin.
+
+    Gain and phase limits are checked as each bin completes, so a sweep
+    can be stopped at a resonance, or once it is past the bandwidth.
+
+    Example:
+        monitor = SweepMonitor([11], init_freq=1.0, sweep_rate=0.5, max_gain=6.0)
+        monitor.update(t, cmd_time, [cmd_pos], [position])
+        if monitor.stopped: ...
+    """
+
+    def __init__(self, joints: list, init_freq: float, sweep_rate: float, center: float = 0.0,
+                 cycles: int = DEFAULT_CYCLES, max_gain: float = None, min_gain: float = None,
+                 max_lag: float = None):
+        """Initialize the monitor.
+
+        Args:
+            joints (list): Actuator IDs of the joints, primary joint first
+            init_freq (float): Initial chirp frequency (Hz)
+            sweep_rate (float): Chirp sweep rate (Hz/s)
+            center (float): Position the chirp oscillates about (degrees)
+            cycles (int): Chirp cycles per frequency bin
+            max_gain (float, optional): Gain (dB) of any joint above which
+                the sweep stops, e.g. at a resonance
+            min_gain (float, optional): Gain (dB) of any joint below which
+                the sweep stops, e.g. once past the bandwidth
+            max_lag (float, optional): Phase lag (degrees) of any joint
+                beyond which the sweep stops
+        """
+        if cycles < 1:
+            raise ValueError(f"Sweep bins need at least one cycle, got {cycles}")
+        self.joints = list(joints)
+        self.init_freq = init_freq
+        self.sweep_rate = sweep_rate
+        self.center = center
+        self.cycles = int(cycles)
+        self.max_gain = max_gain
+        self.min_gain = min_gain
+        self.max_lag = max_lag
+        joints = len(self.joints)
+        # Mean frequency of each completed bin, and gain and unwrapped phase
+        # (degrees) per joint
+        self.freq = []
+        self.gain = [[] for _ in range(joints)]
+        self.phase = [[] for _ in range(joints)]
+        # Current bin: index, first and last sample time, and the command
+        # and response sums (real, imaginary) per joint
+        self._bin = None
+        self._start = self._end = 0.0
+        self._sums = [[0.0, 0.0, 0.0, 0.0] for _ in range(joints)]
+        self._count = 0
+        self._bin_angle = 2.0 * math.pi * self.cycles
+        self.stopped = None
+
+    def _angle(self, time: float) -> float:
+        return 2.0 * math.pi * (self.init_freq + 0.5 * self.sweep_rate * time) * time
+
+    def update(self, time: float, command_time: float, commands, positions):
+        """Add one state sample.
+
+        Args:
+            time (float): Sample time (seconds from the start of the chirp)
+            command_time (float): Time of the command in effect
+            commands (list): Commanded position per joint (degrees)
+            positions (list): Measured position per joint, NaN to skip a joint
+        """
+        angle = self._angle(time)
+        index = int(angle // self._bin_angle)
+        if index != self._bin:
+            if self._count and self._bin:
+                self._close_bin()
+            else:
+                self._discard_bin()
+            self._bin = index
+            self._start = time
+        self._end = time
+        self._count += 1
+
+        cos_y, sin_y = math.cos(angle), math.sin(angle)
+        command_angle = self._angle(command_time)
+        cos_x, sin_x = math.cos(command_angle), math.sin(command_angle)
+        center = self.center
+        for sums, command, position in zip(self._sums, commands, positions):
+            if position != position:
+                continue
+            x = command - center
+            y = position - center
+            sums[0] += x * cos_x
+            sums[1] -= x * sin_x
+            sums[2] += y * cos_y
+            sums[3] -= y * sin_y
+
+    def _close_bin(self):
+        """Turn the sums of the current bin into a gain and phase per joint."""
+        freq = self.init_freq + self.sweep_rate * 0.5 * (self._start + self._end)
+        self.freq.append(freq)
+        for joint, sums in enumerate(self._sums):
+            xr, xi, yr, yi = sums
+            command = math.hypot(xr, xi)
+            if command > 0.0 and (yr or yi):
+                gain = math.hypot(yr, yi) / command
+                phase = math.degrees(math.atan2(yi, yr) - math.atan2(xi, xr))
+                # Unwrap against the previous bin
+                previous = next((p for p in reversed(self.phase[joint]) if p == p), 0.0)
+                phase += 360.0 * round((previous - phase) / 360.0)
+            else:
+                gain = phase = math.nan
+            self.gain[joint].append(gain)
+            self.phase[joint].append(phase)
+            if self.stopped is None:
+                self._check_limits(joint, freq, gain, phase)
+            sums[:] = (0.0, 0.0, 0.0, 0.0)
+        self._count = 0
+
+    def _check_limits(self, joint, freq, gain, phase):
+        if gain != gain:
+            return
+        gain_db = 20.0 * math.log10(gain) if gain > 0.0 else -math.inf
+        where = f"actuator {self.joints[joint]} at {freq:.2f} Hz"
+        if self.max_gain is not None and gain_db > self.max_gain:
+            self.stopped = f"{where}: gain {gain_db:+.1f} dB exceeds {self.max_gain:+.1f} dB"
+        elif self.min_gain is not None and gain_db < self.min_gain:
+            self.stopped = f"{where}: gain {gain_db:+.1f} dB below {self.min_gain:+.1f} dB"
+        elif self.max_lag is not None and -phase > self.max_lag:
+            self.stopped = f"{where}: phase lag {-phase:.0f}° exceeds {self.max_lag:.0f}°"
+
+    def finish(self):
+        """Close the last bin if it spans at least one chirp cycle."""
+        if (self._count and self._bin
+                and self._angle(self._end) - self._angle(self._start) >= 2.0 * math.pi):
+            self._close_bin()
+        self._discard_bin()
+
+    def _discard_bin(self):
+        self._count = 0
+        for sums in self._sums:
+            sums[:] = (0.0, 0.0, 0.0, 0.0)
+
+    def response(self, joint: int = 0) -> dict:
+        """Frequency response of a joint (index into joints) so far, with the
+        'freq', 'magnitude' and 'phase' keys of a Welch response."""
+        points = [(f, g, p) for f, g, p in zip(self.freq, self.gain[joint], self.phase[joint])
+                  if g == g]
+        return {
+            "freq": [f for f, _, _ in points],
+            "magnitude": [g for _, g, _ in points],
+            "phase": [p for _, _, p in points],
+            "estimator": "sweep",
+            "cycles": self.cycles,
+        }
+
+    def readout(self) -> str:
+        """One-line status of the primary joint for the live display."""
+        if not self.freq or self.gain[0][-1] != self.gain[0][-1]:
+            return "sweep -"
+        gain_db = 20.0 * math.log10(self.gain[0][-1]) if self.gain[0][-1] > 0.0 else -math.inf
+        return f"{self.freq[-1]:.2f} Hz {gain_db:+.1f} dB {self.phase[0][-1]:.0f}°"
@@ -0,0 +1,177 @@
+import os
+import socket
+import struct
+import time
+import numpy as np
+from ktune.core.utils import constants
+
+# Address `ktune watch` listens on by default
+DEFAULT_ADDRESS = constants.TELEMETRY_ADDRESS
+
+# Sample sources
+SIM, REAL, PENDULUM = 0, 1, 2
+SOURCE_NAMES = {SIM: "sim", REAL: "real", PENDULUM: "pendulum"}
+
+# One record per joint and sample: source, robot (index in a fleet run, 0
+# otherwise), actuator ID, time (s), position (deg), velocity (deg/s),
+# commanded position (deg, NaN if none)
+RECORD = struct.Struct("<BBHdddd")
+RECORD_DTYPE = np.dtype([("source", "u1"), ("robot", "u1"), ("actuator_id", "<u2"),
+                         ("time", "<f8"), ("position", "<f8"), ("velocity", "<f8"),
+                         ("command", "<f8")])
+# Records that fit in one UDP datagram
+MAX_RECORDS = 65507 // RECORD.size
+# Robot name datagram: this source byte and the robot index, followed by the
+# UTF-8 name, so a viewer can label the records of each robot
+NAME_SOURCE = 0xFF
+NAME = struct.Struct("<BB")
+# Seconds between name datagrams, for viewers started after the run
+ANNOUNCE_INTERVAL = 1.0
+
+
+def parse_address(address: str):
+    """Socket family and address of a telemetry address.
+
+    Args:
+        address (str): 'host:port' for UDP, or a filesystem path for a Unix
+            datagram socket
+
+    Returns:
+        tuple: (family, address) for socket.socket() and sendto()/bind()
+    """
+    host, sep, port = address.rpartition(":")
+    if sep and "/" not in address and port.isdigit():
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    if not hasattr(socket, "AF_UNIX"):
+        raise ValueError(f"Invalid telemetry address '{address}', expected host:port")
+    return socket.AF_UNIX, address
+
+
+class TelemetryPublisher:
+    """Publishes samples as binary datagrams for a `ktune watch` viewer.
+
+    Records are packed into a preallocated buffer and sent on a
+    non-blocking datagram socket. A send that would block, or that has no
+    receiver, drops the datagram instead of waiting, so publishing never
+    stalls the test loop; watching a run only costs the packing and one
+    system call per sample.
+
+    In a fleet run each robot's records carry its index, and its name is
+    sent every ANNOUNCE_INTERVAL seconds, so the viewer can tell robots apart.
+
+    Example:
+        publisher = TelemetryPublisher("127.0.0.1:9870")
+        publisher.pack(0, telemetry.REAL, 11, t, position, velocity, command)
+        publisher.send(1)
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, records: int = 1, robot: int = 0,
+                 name: str = None):
+        """Initialize the publisher.
+
+        Args:
+            address (str): Viewer address, see parse_address()
+            records (int): Records per datagram, e.g. one per joint
+            robot (int): Robot index stamped on every record (1-254), 0
+                outside a fleet run
+            name (str, optional): Robot name announced for the index, e.g.
+                its endpoint
+        """
+        if not 1 <= records <= MAX_RECORDS:
+            raise ValueError(f"Records per datagram must be between 1 and {MAX_RECORDS}")
+        if not 0 <= robot < NAME_SOURCE:
+            raise ValueError(f"Robot index must be between 0 and {NAME_SOURCE - 1}, got {robot}")
+        self.address = address
+        family, self._target = parse_address(address)
+        self._socket = socket.socket(family, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._buffer = bytearray(RECORD.size * records)
+        self._view = memoryview(self._buffer)
+        self.robot = robot
+        self._name = (NAME.pack(NAME_SOURCE, robot) + name.encode()) if name else None
+        self._announced = -ANNOUNCE_INTERVAL
+        self.sent = 0
+        self.dropped = 0
+
+    def pack(self, index: int, source: int, actuator_id: int, time: float,
+             position: float, velocity: float, command: float = float("nan")):
+        """Write one record into slot index of the next datagram."""
+        RECORD.pack_into(self._buffer, index * RECORD.size, source, self.robot, actuator_id,
+                         time, position, velocity, command)
+
+    def send(self, count: int):
+        """Send the first count packed records as one datagram."""
+        if self._name is not None and time.monotonic() - self._announced >= ANNOUNCE_INTERVAL:
+            self._announced = time.monotonic()
+            try:
+                self._socket.sendto(self._name, self._target)
+            except OSError:
+                pass
+        try:
+            self._socket.sendto(self._view[:count * RECORD.size], self._target)
+            self.sent += 1
+        except OSError:
+            # No viewer listening, or its buffer is full
+            self.dropped += 1
+
+    def close(self):
+        self._socket.close()
+
+
+class TelemetryReceiver:
+    """Receives the records of TelemetryPublisher without blocking.
+
+    Example:
+        receiver = TelemetryReceiver("127.0.0.1:9870")
+        records = receiver.receive()  # structured array of RECORD_DTYPE
+        receiver.robots               # {robot index: name} announced so far
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS):
+        """Bind to a telemetry address.
+
+        Args:
+            address (str): Address to listen on, see parse_address()
+        """
+        self.address = address
+        family, target = parse_address(address)
+        self._socket = socket.socket(family, socket.SOCK_DGRAM)
+        if family == socket.AF_UNIX:
+            # Replace the socket file of a previous viewer
+            if os.path.exists(target):
+                os.unlink(target)
+            self._path = target
+        else:
+            self._path = None
+        self._socket.bind(target)
+        self._socket.setblocking(False)
+        self._buffer = bytearray(RECORD.size * MAX_RECORDS)
+        self.robots = {}
+
+    def receive(self) -> np.ndarray:
+        """All records that arrived since the last call.
+
+        Returns:
+            np.ndarray: Structured array of RECORD_DTYPE, in arrival order
+        """
+        chunks = []
+        while True:
+            try:
+                size = self._socket.recv_into(self._buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+            if size >= NAME.size and self._buffer[0] == NAME_SOURCE:
+                self.robots[self._buffer[1]] = bytes(self._buffer[NAME.size:size]).decode(
+                    errors="replace")
+                continue
+            count = size // RECORD.size
+            if count:
+                chunks.append(np.frombuffer(self._buffer, dtype=RECORD_DTYPE, count=count).copy())
+        if not chunks:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.concatenate(chunks)
+
+    def close(self):
+        self._socket.close()
+        if self._path is not None and os.path.exists(self._path):
+            os.unlink(self._path)
@@ -0,0 +1,166 @@
+import math
+
+# Cycle length (seconds) for tests without a natural period
+DEFAULT_CYCLE = 1.0
+
+
+class RunningStats:
+    """Constant-memory statistics of a stream of errors.
+
+    Mean and variance are updated with Welford's algorithm, alongside the
+    running sums for the RMS and mean absolute error and the largest
+    absolute error, so summary() can be read at any time without keeping
+    the samples.
+    """
+
+    __slots__ = ("count", "mean", "m2", "sum_sq", "sum_abs", "max_abs")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sum_sq = 0.0
+        self.sum_abs = 0.0
+        self.max_abs = 0.0
+
+    def update(self, error: float):
+        """Add one error sample."""
+        self.count += 1
+        delta = error - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (error - self.mean)
+        self.sum_sq += error * error
+        magnitude = abs(error)
+        self.sum_abs += magnitude
+        if magnitude > self.max_abs:
+            self.max_abs = magnitude
+
+    @property
+    def rms(self) -> float:
+        return math.sqrt(self.sum_sq / self.count) if self.count else math.nan
+
+    def summary(self) -> dict:
+        """Same keys as metrics.error_statistics(), empty before the first sample."""
+        if not self.count:
+            return {}
+        return {
+            "rms_error": self.rms,
+            "max_error": self.max_abs,
+            "mean_error": self.mean,
+            "mean_abs_error": self.sum_abs / self.count,
+            "std_error": math.sqrt(self.m2 / self.count)
+        }
+
+
+class TrackingMonitor:
+    """Tracking errors of one system, updated on every state sample.
+
+    Keeps RunningStats of the position and velocity error per joint and
+    the position RMS error per cycle: the run is cut into cycles of fixed
+    length (e.g. the period of a sine test), and the RMS of the last
+    completed cycle is what the live readout shows and what the divergence
+    check looks at. Memory use does not grow with the length of the run.
+
+    Example:
+        monitor = TrackingMonitor([11], cycle=2.0, abort_error=10.0)
+        monitor.update(t, [cmd_pos - position], [cmd_vel - velocity])
+        if monitor.diverged: ...
+    """
+
+    def __init__(self, joints: list, cycle: float = DEFAULT_CYCLE,
+                 abort_error: float = None):
+        """Initialize the monitor.
+
+        Args:
+            joints (list): Actuator IDs of the joints, primary joint first
+            cycle (float): Cycle length in seconds
+            abort_error (float, optional): Cycle RMS position error
+                (degrees) of any joint above which the run diverged
+        """
+        self.joints = list(joints)
+        self.cycle = cycle
+        self.abort_error = abort_error
+        joints = len(self.joints)
+        self.position = [RunningStats() for _ in range(joints)]
+        self.velocity = [RunningStats() for _ in range(joints)]
+        self.time = None
+        # Completed cycles, end of the current one, and its sum of squared
+        # position errors and sample count per joint
+        self.cycles = 0
+        self._cycle_end = None
+        self._cycle_sq = [0.0] * joints
+        self._cycle_count = [0] * joints
+        # Position RMS of the last completed cycle and the largest so far, per joint
+        self.cycle_rms = [math.nan] * joints
+        self.max_cycle_rms = [math.nan] * joints
+        self.diverged = None
+
+    def update(self, time: float, position_errors, velocity_errors):
+        """Add the errors of one state sample.
+
+        Args:
+            time (float): Sample time (seconds from the start of the test)
+            position_errors (list): Position error per joint (command minus
+                state), NaN to skip a joint
+            velocity_errors (list): Velocity error per joint, NaN to skip a joint
+        """
+        if self._cycle_end is None:
+            self._cycle_end = time + self.cycle
+        elif time >= self._cycle_end:
+            self._close_cycle()
+            # Cycles without samples are skipped
+            self._cycle_end += self.cycle * (math.floor((time - self._cycle_end) / self.cycle) + 1)
+        self.time = time
+
+        for joint, error in enumerate(position_errors):
+            if error == error:
+                self.position[joint].update(error)
+                self._cycle_sq[joint] += error * error
+                self._cycle_count[joint] += 1
+        for joint, error in enumerate(velocity_errors):
+            if error == error:
+                self.velocity[joint].update(error)
+
+    def _close_cycle(self):
+        """Finish the current cycle and check it for divergence."""
+        self.cycles += 1
+        for joint, count in enumerate(self._cycle_count):
+            if not count:
+                continue
+            rms = math.sqrt(self._cycle_sq[joint] / count)
+            self.cycle_rms[joint] = rms
+            if not rms <= self.max_cycle_rms[joint]:
+                self.max_cycle_rms[joint] = rms
+            if (self.abort_error is not None and self.diverged is None
+                    and rms > self.abort_error):
+                self.diverged = (f"actuator {self.joints[joint]} cycle RMS error {rms:.2f}° exceeds "
+                                 f"{self.abort_error:.2f}° in cycle {self.cycles} "
+                                 f"(t={self.time:.1f}s)")
+            self._cycle_sq[joint] = 0.0
+            self._cycle_count[joint] = 0
+
+    def rms_error(self, joint: int = 0) -> float:
+        """Position RMS error of a joint (index into joints) over the run so far."""
+        return self.position[joint].rms
+
+    def summary(self, joint: int = 0) -> dict:
+        """Tracking metrics of a joint (index into joints) so far, in the layout
+        of metrics.compute_tracking_metrics() plus the cycle RMS errors."""
+        result = {}
+        if self.position[joint].count:
+            result["position"] = self.position[joint].summary()
+            # None until the first cycle completes
+            for key, values in (("cycle_rms_error", self.cycle_rms),
+                                ("max_cycle_rms_error", self.max_cycle_rms)):
+                result["position"][key] = None if math.isnan(values[joint]) else values[joint]
+        if self.velocity[joint].count:
+            result["velocity"] = self.velocity[joint].summary()
+        return result
+
+    def readout(self) -> str:
+        """One-line status of the primary joint for the live display."""
+        if self.time is None:
+            return "waiting"
+        cycle = "-" if math.isnan(self.cycle_rms[0]) else f"{self.cycle_rms[0]:.2f}°"
+        return (f"rms {self.rms_error():.2f}° cycle {cycle} "
+                f"max {self.position[0].max_abs:.2f}°")
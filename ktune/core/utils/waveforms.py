@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+import numpy as np
+
+
+@dataclass
+class Waveform:
+    """Command trajectory sampled on the scheduler grid.
+
+    Sample k is the command for tick k, at time k / sample_rate. Positions
+    are in degrees and include the start position, velocities in deg/s.
+    """
+    time: np.ndarray
+    position: np.ndarray
+    velocity: np.ndarray
+
+    def __len__(self):
+        return len(self.time)
+
+    def scaled(self, scale: float, center: float = 0.0) -> "Waveform":
+        """Return the trajectory with its excursion about center scaled."""
+        return Waveform(
+            time=self.time,
+            position=center + (self.position - center) * scale,
+            velocity=self.velocity * scale
+        )
+
+    def to_dict(self) -> dict:
+        """Return the trajectory as JSON-serializable lists."""
+        return {
+            "time": self.time.tolist(),
+            "position": self.position.tolist(),
+            "velocity": self.velocity.tolist()
+        }
+
+
+def time_grid(duration: float, sample_rate: float) -> np.ndarray:
+    """Tick times from 0 to duration (inclusive) at sample_rate."""
+    n = int(np.floor(duration * sample_rate + 1e-9)) + 1
+    return np.arange(n) / sample_rate
+
+
+def compile_sine(amp: float, freq: float, duration: float, sample_rate: float,
+                 start_pos: float = 0.0, phase: float = 0.0) -> Waveform:
+    """Compile a sine trajectory.
+
+    Args:
+        amp (float): Amplitude (degrees)
+        freq (float): Frequency (Hz)
+        duration (float): Motion duration (seconds)
+        sample_rate (float): Command rate (Hz)
+        start_pos (float): Center position (degrees)
+        phase (float): Phase offset (degrees)
+    """
+    t = time_grid(duration, sample_rate)
+    omega = 2.0 * np.pi * freq
+    angle = omega * t + np.deg2rad(phase)
+    return Waveform(
+        time=t,
+        position=amp * np.sin(angle) + start_pos,
+        velocity=amp * omega * np.cos(angle)
+    )
+
+
+def compile_chirp(amp: float, init_freq: float, sweep_rate: float, duration: float,
+                  sample_rate: float, start_pos: float = 0.0, phase: float = 0.0) -> Waveform:
+    """Compile a linear chirp trajectory.
+
+    Args:
+        amp (float): Amplitude (degrees)
+        init_freq (float): Initial frequency (Hz)
+        sweep_rate (float): Frequency sweep rate (Hz/s)
+        duration (float): Motion duration (seconds)
+        sample_rate (float): Command rate (Hz)
+        start_pos (float): Center position (degrees)
+        phase (float): Phase offset (degrees)
+    """
+    t = time_grid(duration, sample_rate)
+    angle = 2.0 * np.pi * (init_freq * t + 0.5 * sweep_rate * t * t) + np.deg2rad(phase)
+    # Instantaneous angular velocity
+    omega = 2.0 * np.pi * (init_freq + sweep_rate * t)
+    return Waveform(
+        time=t,
+        position=amp * np.sin(angle) + start_pos,
+        velocity=amp * omega * np.cos(angle)
+    )
+
+
+def compile_sin_sin(param_sets: list, duration: float, sample_rate: float,
+                    start_pos: float = 0.0, reset_interval: float = None,
+                    transition_time: float = 3.0, phase: float = 0.0) -> Waveform:
+    """Compile a superposition of two sine waves.
+
+    Parameter set k (a dict with freq1, freq2, amp1, amp2) is active from
+    k * reset_interval onwards, blended in from set k - 1 with a smooth step
+    over transition_time seconds.
+
+    Args:
+        param_sets (list): Parameter sets, one per reset interval. Only the
+            first is used when reset_interval is None.
+        duration (float): Motion duration (seconds)
+        sample_rate (float): Command rate (Hz)
+        start_pos (float): Center position (degrees)
+        reset_interval (float, optional): Seconds between parameter sets
+        transition_time (float): Blend duration between sets (seconds)
+        phase (float): Phase offset applied to both components (degrees)
+    """
+    t = time_grid(duration, sample_rate)
+    keys = ('freq1', 'freq2', 'amp1', 'amp2')
+    table = np.array([[params[key] for key in keys] for params in param_sets])
+
+    if reset_interval is None:
+        current = np.broadcast_to(table[0], (len(t), len(keys)))
+    else:
+        segment = np.minimum((t // reset_interval).astype(int), len(table) - 1)
+        previous = np.maximum(segment - 1, 0)
+        # Smooth step from the previous set, progress 0 to 1
+        progress = np.clip((t - segment * reset_interval) / transition_time, 0.0, 1.0)
+        blend = (progress * progress * (3 - 2 * progress))[:, None]
+        current = table[previous] + (table[segment] - table[previous]) * blend
+
+    freq1, freq2, amp1, amp2 = current.T
+    omega1 = 2.0 * np.pi * freq1
+    omega2 = 2.0 * np.pi * freq2
+    offset = np.deg2rad(phase)
+    phase1 = omega1 * t + offset
+    phase2 = omega2 * t + offset
+    return Waveform(
+        time=t,
+        position=amp1 * np.sin(phase1) + amp2 * np.sin(phase2) + start_pos,
+        velocity=amp1 * omega1 * np.cos(phase1) + amp2 * omega2 * np.cos(phase2)
+    )
+
+
+def compile_steps(steps: list, sample_rate: float, start_pos: float = 0.0) -> Waveform:
+    """Compile a step sequence into a piecewise-constant trajectory.
+
+    Args:
+        steps (list): (position, velocity, hold_time) tuples, positions
+            relative to start_pos
+        sample_rate (float): Command rate (Hz)
+        start_pos (float): Start position (degrees)
+    """
+    levels = np.array([step[0] for step in steps], dtype=float)
+    step_ends = np.cumsum([step[2] for step in steps])
+    t = time_grid(step_ends[-1], sample_rate)
+    step_idx = np.minimum(np.searchsorted(step_ends, t, side='left'), len(steps) - 1)
+    return Waveform(
+        time=t,
+        position=levels[step_idx] + start_pos,
+        # No velocity command for steps
+        velocity=np.zeros_like(t)
+    )
@@ -0,0 +1,180 @@
+# ktune/core/watch.py
+import time
+from typing import Dict, Tuple
+import numpy as np
+from ktune.core.utils import telemetry
+
+# Traces of the viewer: label and the value plotted per record
+TRACES = (
+    ("Position (deg)", lambda records: records["position"]),
+    ("Velocity (deg/s)", lambda records: records["velocity"]),
+    ("Tracking error (deg)", lambda records: records["command"] - records["position"]),
+)
+
+
+class Stream:
+    """Rolling window of the records of one robot, source and actuator."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self.time = np.zeros(0)
+        self.values = [np.zeros(0) for _ in TRACES]
+
+    def extend(self, records: np.ndarray):
+        """Append records and drop those older than the window."""
+        if len(self.time) and records["time"][0] < self.time[-1]:
+            # Time went back: a new run started
+            self.time = np.zeros(0)
+            self.values = [np.zeros(0) for _ in TRACES]
+        self.time = np.concatenate([self.time, records["time"]])
+        self.values = [np.concatenate([values, trace(records)])
+                       for values, (_, trace) in zip(self.values, TRACES)]
+        start = np.searchsorted(self.time, self.time[-1] - self.window)
+        if start:
+            self.time = self.time[start:]
+            self.values = [values[start:] for values in self.values]
+
+
+class TelemetryViewer:
+    """Live plot of the samples a run publishes with --telemetry.
+
+    Rolling position, velocity and tracking error traces per source (sim,
+    real, pendulum) and actuator, and per robot in a fleet run, over the
+    last `window` seconds. Frames
+    are drawn with blitting: the axes, ticks and labels are rendered once
+    into a cached background, and each frame only restores it and redraws
+    the lines. The time axis is relative to the newest sample, so it never
+    moves; the full figure is only redrawn when a new trace appears or a
+    trace leaves its y range.
+
+    The viewer runs in its own process and only listens on the socket, so
+    it has no effect on the timing of the run it watches.
+
+    Example:
+        TelemetryViewer("127.0.0.1:9870", window=10.0).run()
+    """
+
+    def __init__(self, address: str = telemetry.DEFAULT_ADDRESS, window: float = 10.0,
+                 fps: float = 30.0):
+        """Initialize the viewer.
+
+        Args:
+            address (str): Address to listen on (see telemetry.parse_address)
+            window (float): Seconds of history to show
+            fps (float): Frame rate limit
+        """
+        import matplotlib.pyplot as plt
+        self.plt = plt
+        self.window = window
+        self.interval = 1.0 / fps
+        self.receiver = telemetry.TelemetryReceiver(address)
+        self.streams: Dict[Tuple[int, int, int], Stream] = {}
+        self.lines = {}
+
+        self.fig, self.axes = plt.subplots(len(TRACES), 1, sharex=True, figsize=(10, 8))
+        self.fig.suptitle(f"ktune watch ({address})")
+        for ax, (label, _) in zip(self.axes, TRACES):
+            ax.set_ylabel(label)
+            ax.set_xlim(-window, 0.0)
+            ax.set_ylim(-1.0, 1.0)
+            ax.grid(True)
+        self.axes[-1].set_xlabel("Time relative to newest sample (s)")
+        self.status = self.axes[0].text(0.01, 0.95, "Waiting for samples...",
+                                        transform=self.axes[0].transAxes, va="top",
+                                        animated=True)
+        self.background = None
+        self._stale = True
+        # Recapture the background whenever the figure is fully drawn (e.g. resized)
+        self.fig.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for lines in self.lines.values():
+            for ax, line in zip(self.axes, lines):
+                ax.draw_artist(line)
+        self.axes[0].draw_artist(self.status)
+
+    def _line_label(self, key):
+        robot, source, actuator_id = key
+        label = f"{telemetry.SOURCE_NAMES.get(source, source)} {actuator_id}"
+        if robot:
+            label = f"{self.receiver.robots.get(robot, f'robot {robot}')} {label}"
+        return label
+
+    def update(self):
+        """Read the pending records and update the lines. Returns the number of records."""
+        records = self.receiver.receive()
+        if not len(records):
+            return 0
+        keys = np.stack([records["robot"].astype(np.int64),
+                         records["source"].astype(np.int64),
+                         records["actuator_id"].astype(np.int64)], axis=1)
+        for key in np.unique(keys, axis=0):
+            key = (int(key[0]), int(key[1]), int(key[2]))
+            selected = records[(records["robot"] == key[0]) & (records["source"] == key[1])
+                               & (records["actuator_id"] == key[2])]
+            if key not in self.streams:
+                self.streams[key] = Stream(self.window)
+                self.lines[key] = [ax.plot([], [], label=self._line_label(key), animated=True)[0]
+                                   for ax in self.axes]
+                self.axes[0].legend(loc="upper right")
+                self._stale = True
+            self.streams[key].extend(selected)
+        self._relabel()
+
+        newest = max(stream.time[-1] for stream in self.streams.values())
+        for key, stream in self.streams.items():
+            for ax, line, values in zip(self.axes, self.lines[key], stream.values):
+                line.set_data(stream.time - newest, values)
+                self._fit(ax, values)
+        self.status.set_text(f"t={newest:.1f}s, {len(records)} new records")
+        return len(records)
+
+    def _relabel(self):
+        """Name the lines of robots whose name arrived after their first records."""
+        for key, lines in self.lines.items():
+            label = self._line_label(key)
+            if lines[0].get_label() != label:
+                for line in lines:
+                    line.set_label(label)
+                self.axes[0].legend(loc="upper right")
+                self._stale = True
+
+    def _fit(self, ax, values):
+        """Widen the y range to fit values, marking the figure for a full redraw."""
+        finite = values[np.isfinite(values)]
+        if not len(finite):
+            return
+        low, high = ax.get_ylim()
+        if finite.min() < low or finite.max() > high:
+            margin = 0.1 * max(finite.max() - finite.min(), 1.0)
+            ax.set_ylim(min(low, finite.min() - margin), max(high, finite.max() + margin))
+            self._stale = True
+
+    def draw(self):
+        """Draw one frame: a full redraw if the axes changed, else a blit."""
+        canvas = self.fig.canvas
+        if self._stale or self.background is None:
+            self._stale = False
+            # Triggers _on_draw, which caches the new background
+            canvas.draw()
+        else:
+            canvas.restore_region(self.background)
+            self._draw_artists()
+            canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+
+    def run(self):
+        """Show the viewer until its window is closed."""
+        self.plt.show(block=False)
+        try:
+            while self.plt.fignum_exists(self.fig.number):
+                start = time.perf_counter()
+                self.update()
+                self.draw()
+                time.sleep(max(0.0, self.interval - (time.perf_counter() - start)))
+        finally:
+            self.receiver.close()
@@ -0,0 +1,88 @@
+# tests/test_binlog.py
+import json
+import numpy as np
+from ktune.core.utils import binlog
+from ktune.core.utils.recorder import ColumnMap, Recorder
+
+N = binlog.MIN_COLUMN_LENGTH
+
+
+def _states(rows=N):
+    recorder = Recorder([("time", "f8"), ("position_11", "f4"), ("valid", "u1")])
+    for i in range(rows):
+        recorder.append((0.01 * i, float(i), 1))
+    return recorder
+
+
+def test_round_trip_columns_and_header(tmp_path):
+    data = {
+        "header": {"gains": [20.0, 5.0], "name": "bench", "a/b": {"c~d": 1}},
+        "ints": list(range(N)),
+        "floats": [0.5 * i for i in range(N)],
+        "flags": [i % 2 == 0 for i in range(N)],
+        "strings": ["x"] * N,
+    }
+    path = binlog.save(str(tmp_path / "run.ktlog"), data)
+    layout = binlog.read_header(path)["columns"]
+    assert set(layout) == {"ints", "floats", "flags"}
+
+    for mmap in (True, False):
+        log = binlog.load(path, mmap=mmap)
+        assert log["header"] == data["header"]
+        assert log["strings"] == data["strings"]
+        assert log["ints"].dtype == np.int64 and log["ints"].tolist() == data["ints"]
+        assert log["floats"].tolist() == data["floats"]
+        assert log["flags"].tolist() == data["flags"]
+
+
+def test_keys_with_separators_round_trip(tmp_path):
+    data = {"odd/key": np.arange(N, dtype=float), "x~1": {"y/z": np.arange(N)}}
+    log = binlog.load(binlog.save(str(tmp_path / "run.ktlog"), data))
+    assert set(log) == {"odd/key", "x~1"}
+    assert list(log["x~1"]) == ["y/z"]
+    assert log["odd/key"].tolist() == data["odd/key"].tolist()
+
+
+def test_table_fields_are_escaped(tmp_path):
+    entries = [{"time": 0.1 * i, "x/y": float(i)} for i in range(N)]
+    path = binlog.save(str(tmp_path / "run.ktlog"), {"entries": entries})
+    header = binlog.read_header(path)
+    assert header["tables"] == ["entries"]
+    log = binlog.load(path)
+    assert set(log["entries"]) == {"time", "x/y"}
+    assert log["entries"]["x/y"].tolist() == [float(i) for i in range(N)]
+
+
+def test_lists_with_missing_values_stay_in_header(tmp_path):
+    data = {"none": [None] * N, "mixed": [None] + [1.0] * (N - 1)}
+    path = binlog.save(str(tmp_path / "run.ktlog"), data)
+    assert binlog.read_header(path)["columns"] == {}
+    assert binlog.load(path) == data
+
+
+def test_column_map_aliases_are_stored_once(tmp_path):
+    states = _states()
+    data_dict = ColumnMap({"states": states}, {"position": "position_11"})
+    data_dict["freq_response"] = {"freq": [1.0, 2.0]}
+    path = binlog.save(str(tmp_path / "run.ktlog"), {"real_data": data_dict})
+    header = binlog.read_header(path)
+    assert sorted(header["columns"]) == ["real_data/position_11", "real_data/time",
+                                         "real_data/valid"]
+    assert header["aliases"] == {"real_data": {"position": "position_11"}}
+
+    real = binlog.load(path)["real_data"]
+    assert real["position"] is real["position_11"]
+    assert real["position_11"].dtype == np.float32
+    assert real["position"].tolist() == states["position_11"].tolist()
+    assert real["freq_response"] == {"freq": [1.0, 2.0]}
+
+
+def test_convert_json_log(tmp_path):
+    data = {"header": {"test_type": "sine"}, "time": [0.01 * i for i in range(N)]}
+    json_path = tmp_path / "run.json"
+    json_path.write_text(json.dumps(data))
+    path = binlog.convert(str(json_path))
+    assert path == str(tmp_path / "run.ktlog")
+    log = binlog.load(path)
+    assert log["header"] == data["header"]
+    assert log["time"].tolist() == data["time"]
@@ -0,0 +1,83 @@
+# tests/test_catalog.py
+import json
+import os
+import pytest
+from ktune.core.utils import catalog
+from ktune.core.utils.catalog import Catalog
+
+
+def _tune_header(**fields):
+    header = {
+        "test_type": "sine", "mode": "real", "actuator_id": 11, "robot_name": "bench",
+        "timestamp": "20250101_120000", "sample_rate": 100.0,
+        "gains": {"real": {"kp": 20.0, "kd": 5.0, "ki": 0.0}, "sim": {"kp": 20.0, "Kd": 5.0}},
+        "tracking_metrics": {"real": {"position": {"rms_error": 0.5, "max_error": 1.0}}},
+    }
+    header.update(fields)
+    return header
+
+
+def _save(directory, name, header):
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        json.dump(header, f)
+    return path
+
+
+def test_header_row_of_tune_run(tmp_path):
+    path = _save(tmp_path, "run.json", _tune_header())
+    row = catalog.header_row(path, _tune_header())
+    assert row["kind"] == "tune" and row["format"] == "json"
+    assert row["timestamp"] == "2025-01-01 12:00:00"
+    assert row["sim_kd"] == 5.0 and row["real_pos_rms"] == 0.5
+    assert row["actuator_ids"] == [11]
+    assert catalog.header_row(path, {"unrelated": 1}) is None
+
+
+def test_query_filters_and_order(tmp_path):
+    with Catalog(str(tmp_path / "catalog.sqlite")) as runs:
+        for name, kp in (("a.json", 10.0), ("b.json", 30.0), ("c.json", 20.0)):
+            header = _tune_header(gains={"real": {"kp": kp}})
+            assert runs.add(_save(tmp_path, name, header))
+        assert len(runs) == 3
+        found = runs.query([("kp", ">=", 20)], order_by="kp", descending=False)
+        assert [row["kp"] for row in found] == [20.0, 30.0]
+        with pytest.raises(ValueError):
+            runs.query([("nope", "=", 1)])
+        with pytest.raises(ValueError):
+            runs.query([("kp", "~", 1)])
+
+
+def test_batched_run_is_found_by_every_joint(tmp_path):
+    with Catalog(str(tmp_path / "catalog.sqlite")) as runs:
+        runs.add(_save(tmp_path, "batch.json", _tune_header(actuator_ids=[11, 12, 13])))
+        runs.add(_save(tmp_path, "single.json", _tune_header(actuator_id=14)))
+        for aid in (11, 12, 13):
+            found = runs.query([("actuator_id", "=", aid)])
+            assert [os.path.basename(row["path"]) for row in found] == ["batch.json"]
+        assert len(runs.query([("actuator_id", "=", 14)])) == 1
+        assert runs.query([("actuator_id", "=", 15)]) == []
+
+
+def test_rebuild_adds_and_removes(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    first = _save(data, "first.json", _tune_header(actuator_ids=[21, 22]))
+    _save(data, "other.json", [1, 2, 3])
+    with Catalog(str(tmp_path / "catalog.sqlite")) as runs:
+        counts = runs.rebuild([str(data)])
+        assert counts == {"added": 1, "unchanged": 0, "skipped": 1, "removed": 0}
+        assert runs.rebuild([str(data)])["unchanged"] == 1
+        os.remove(first)
+        assert runs.rebuild([str(data)])["removed"] == 1
+        assert len(runs) == 0
+        assert runs.query([("actuator_id", "=", 22)]) == []
+
+
+def test_record_only_warns_on_failure(tmp_path, capsys):
+    path = _save(tmp_path, "run.json", _tune_header())
+    # A directory where the database file should be
+    blocked = tmp_path / "blocked"
+    blocked.mkdir()
+    catalog.record(path, _tune_header(), str(blocked))
+    assert "could not update run catalog" in capsys.readouterr().out
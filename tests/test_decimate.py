@@ -0,0 +1,75 @@
+# tests/test_decimate.py
+import numpy as np
+import pytest
+from ktune.core.utils import decimate
+
+N = 10000
+
+
+def _trace():
+    rng = np.random.default_rng(0)
+    x = np.linspace(0.0, 10.0, N)
+    y = np.sin(2 * np.pi * x) + 0.1 * rng.standard_normal(N)
+    # A one-sample spike that must survive decimation
+    y[1234] = 5.0
+    y[8765] = -5.0
+    return x, y
+
+
+@pytest.mark.parametrize("method", decimate.METHODS)
+def test_endpoints_are_kept(method):
+    x, y = _trace()
+    dx, dy = decimate.decimate(x, y, 200, method)
+    assert len(dx) < N
+    assert (dx[0], dy[0]) == (x[0], y[0])
+    assert (dx[-1], dy[-1]) == (x[-1], y[-1])
+    assert np.all(np.diff(dx) > 0)
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    x, y = _trace()
+    buckets = 200
+    dx, dy = decimate.minmax(x, y, buckets)
+    assert len(dx) <= 4 * buckets
+    assert dy.max() == 5.0 and dy.min() == -5.0
+    bucket = np.clip(((x - x[0]) * (buckets / (x[-1] - x[0]))).astype(int), 0, buckets - 1)
+    kept_bucket = np.clip(((dx - x[0]) * (buckets / (x[-1] - x[0]))).astype(int), 0, buckets - 1)
+    for b in range(buckets):
+        assert dy[kept_bucket == b].max() == y[bucket == b].max()
+        assert dy[kept_bucket == b].min() == y[bucket == b].min()
+
+
+def test_lttb_point_count_and_spikes():
+    x, y = _trace()
+    dx, dy = decimate.lttb(x, y, 400)
+    assert len(dx) == 400
+    # Samples are a subset of the trace
+    assert np.all(np.isin(dx, x))
+    assert 5.0 in dy and -5.0 in dy
+
+
+@pytest.mark.parametrize("method", decimate.METHODS)
+def test_short_traces_are_unchanged(method):
+    x = np.arange(10.0)
+    dx, dy = decimate.decimate(x, x * 2, 200, method)
+    assert len(dx) == 10
+    np.testing.assert_array_equal(dy, x * 2)
+
+
+def test_float32_values_keep_their_type():
+    x, y = _trace()
+    dx, dy = decimate.minmax(x, y.astype(np.float32), 100)
+    assert dy.dtype == np.float32
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        decimate.decimate([0.0, 1.0], [0.0, 1.0], 10, "every_nth")
+
+
+def test_spans():
+    x = np.arange(6.0)
+    mask = [False, True, True, False, True, True]
+    # The last sample has no end and is ignored
+    assert decimate.spans(x, mask) == [(1.0, 3.0), (4.0, 5.0)]
+    assert decimate.spans(x, [False] * 6) == []
@@ -0,0 +1,120 @@
+# tests/test_frf.py
+import numpy as np
+import pytest
+from scipy.signal import lfilter
+from ktune.core.utils import frf
+
+TAU = 0.05
+RATE = 100.0
+SAMPLES = 4096
+
+
+def _first_order(x):
+    """y[n+1] = y[n] + alpha (x[n] - y[n]): a first-order lag sampled at RATE."""
+    alpha = 1.0 - np.exp(-1.0 / (RATE * TAU))
+    return lfilter([0.0, alpha], [1.0, alpha - 1.0], x), alpha
+
+
+def _expected(freq, alpha):
+    """Exact response of the sampled system."""
+    z = np.exp(2j * np.pi * freq / RATE)
+    return alpha / (z - (1.0 - alpha))
+
+
+def _run(seed, samples=SAMPLES, noise=0.0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal(samples)
+    y, alpha = _first_order(x)
+    y = y + noise * rng.standard_normal(samples)
+    t = np.arange(samples) / RATE
+    return t, x, {"position": y, "velocity": np.gradient(y, t)}, alpha
+
+
+def test_welch_frf_of_first_order_system():
+    _, x, outputs, alpha = _run(0)
+    result = frf.welch_frf([x], [np.stack([outputs["position"]])], RATE, segment=256)
+    assert result["freq"][0] == pytest.approx(RATE / 256)
+    assert result["excited"].all()
+    h1 = result["h1"][0]
+    expected = _expected(result["freq"], alpha)
+    np.testing.assert_allclose(np.abs(h1), np.abs(expected), rtol=0.05)
+    np.testing.assert_allclose(np.angle(h1 / expected, deg=True), 0.0, atol=3.0)
+    assert result["coherence"][0].min() > 0.95
+    # Without noise H1 and H2 agree
+    np.testing.assert_allclose(np.abs(result["h2"][0]), np.abs(h1), rtol=0.05)
+
+
+def test_h1_is_unbiased_by_output_noise():
+    _, x, outputs, alpha = _run(1, samples=4 * SAMPLES, noise=0.2)
+    result = frf.welch_frf([x], [np.stack([outputs["position"]])], RATE, segment=256)
+    expected = np.abs(_expected(result["freq"], alpha))
+    h1_error = np.median(np.abs(np.abs(result["h1"][0]) / expected - 1.0))
+    h2_error = np.median(np.abs(np.abs(result["h2"][0]) / expected - 1.0))
+    assert h1_error < 0.05
+    assert h2_error > h1_error
+
+
+def test_per_run_estimates():
+    runs = [_run(seed) for seed in (2, 3)]
+    result = frf.welch_frf([x for _, x, _, _ in runs],
+                           [np.stack([outputs["position"]]) for _, _, outputs, _ in runs],
+                           RATE, segment=256, average=False)
+    assert result["h1"].shape == (2, 1, 128)
+    assert result["excited"].shape == (2, 128)
+    assert list(result["segments"]) == [31, 31]
+
+
+def test_campaign_average_of_repeated_runs():
+    runs = [_run(seed)[:3] for seed in (4, 5, 6)]
+    # Too short to estimate, kept in place as None
+    runs.append((np.arange(3) / RATE, np.zeros(3), {"position": np.zeros(3)}))
+    campaign = frf.campaign_frf(runs, segment=256)
+    assert [response is None for response in campaign["runs"]] == [False, False, False, True]
+    assert campaign["segments"] == 3 * 31
+
+    average = campaign["average"]
+    assert set(average["channels"]) == {"position", "velocity"}
+    freq = np.array(average["freq"])
+    expected = np.abs(_expected(freq, _run(4)[3]))
+    np.testing.assert_allclose(average["magnitude"], expected, rtol=0.05)
+    assert average["overlap"] == 0.5
+
+
+def test_tracking_frf_matches_a_single_run_campaign():
+    t, x, outputs, _ = _run(7)
+    single = frf.tracking_frf(t, x, outputs, segment=256)
+    campaign = frf.campaign_frf([(t, x, outputs)], segment=256)
+    np.testing.assert_allclose(single["magnitude"], campaign["average"]["magnitude"])
+    np.testing.assert_allclose(single["phase"], campaign["runs"][0]["phase"])
+
+
+def test_gaps_are_bridged():
+    t, x, outputs, _ = _run(8)
+    outputs = dict(outputs, position=outputs["position"].copy())
+    outputs["position"][:10] = np.nan
+    outputs["position"][1000] = np.nan
+    response = frf.tracking_frf(t, x, outputs, segment=256)
+    assert np.all(np.isfinite(response["magnitude"]))
+
+
+def test_unexcited_bins_are_left_out():
+    t = np.arange(SAMPLES) / RATE
+    # A pure 5 Hz tone only excites the bins around it
+    x = np.sin(2 * np.pi * 5.0 * t)
+    y, _ = _first_order(x)
+    response = frf.tracking_frf(t, x, {"position": y}, segment=256)
+    assert 0 < len(response["freq"]) < 10
+    assert min(response["freq"]) < 5.0 < max(response["freq"])
+
+
+def test_campaign_rejects_mixed_rates():
+    t, x, outputs, _ = _run(9)
+    with pytest.raises(ValueError, match="sample rate"):
+        frf.campaign_frf([(t, x, outputs), (2 * t, x, outputs)], segment=256)
+
+
+def test_segment_settings():
+    assert frf.segment_settings(1000) == (frf.DEFAULT_SEGMENT, 128)
+    assert frf.segment_settings(100, 256, 0.75) == (100, 25)
+    with pytest.raises(ValueError):
+        frf.segment_settings(1000, overlap=1.0)
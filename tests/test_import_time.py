@@ -0,0 +1,29 @@
+# tests/test_import_time.py
+import os
+import subprocess
+import sys
+import time
+
+# Wall-clock budget (seconds) for `import ktune.cli.command` in a fresh
+# interpreter; it measured ~0.16 s once heavy imports moved into the commands
+IMPORT_BUDGET = 1.0
+# Modules that only the commands using them may load
+HEAVY_MODULES = ("pykos", "numpy", "scipy", "matplotlib")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cli_import_is_light():
+    """Loading the CLI stays within budget and leaves the heavy modules unloaded."""
+    code = ("import ktune.cli.command, sys; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        p for p in (ROOT, os.environ.get("PYTHONPATH")) if p))
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=30)
+    elapsed = time.perf_counter() - start
+    assert result.returncode == 0, result.stderr
+    loaded = result.stdout.strip()
+    assert not loaded, f"import ktune.cli.command loaded {loaded}"
+    assert elapsed < IMPORT_BUDGET, f"import ktune.cli.command took {elapsed:.2f} s"
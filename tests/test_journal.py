@@ -0,0 +1,86 @@
+# tests/test_journal.py
+import os
+import numpy as np
+import pytest
+from ktune.core.utils import journal
+from ktune.core.utils.recorder import Recorder
+
+DTYPE = np.dtype([("time", "f8"), ("position", "f4")])
+
+
+def _write(path, chunks, close=True):
+    writer = journal.JournalWriter(str(path), {"real/states": DTYPE},
+                                   meta={"test": "sine"}, fsync=False)
+    for c in range(chunks):
+        rows = np.zeros(4, dtype=DTYPE)
+        rows["time"] = np.arange(4) + 4 * c
+        rows["position"] = c
+        writer.write("real/states", rows)
+    if close:
+        writer.close()
+    else:
+        # Let the thread drain the queue without writing the end marker
+        writer._queue.put(None)
+        writer._thread.join()
+        writer._file.close()
+    return writer
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "run.journal"
+    writer = _write(path, 3)
+    assert writer.chunks == 3
+
+    result = journal.recover(str(path))
+    assert result["complete"]
+    assert result["meta"] == {"test": "sine"}
+    assert result["chunks"] == 3
+    rows = result["streams"]["real/states"]
+    assert rows.dtype == DTYPE
+    np.testing.assert_array_equal(rows["time"], np.arange(12))
+
+
+def test_recorder_stream(tmp_path):
+    path = tmp_path / "run.journal"
+    recorder = Recorder([("time", "f8"), ("position", "f4")])
+    writer = journal.JournalWriter(str(path), {"real/states": recorder.dtype}, fsync=False)
+    recorder.stream_to(writer.sink("real/states"), chunk_rows=4)
+    for i in range(10):
+        recorder.append((0.01 * i, float(i)))
+    recorder.detach()
+    writer.close()
+
+    rows = journal.recover(str(path))["streams"]["real/states"]
+    np.testing.assert_array_equal(rows["position"], np.arange(10))
+
+
+def test_truncated_frame_keeps_complete_chunks(tmp_path):
+    path = tmp_path / "run.journal"
+    _write(path, 3, close=False)
+    # Cut the last chunk short, as a crash mid-write would
+    os.truncate(path, os.path.getsize(path) - 5)
+
+    result = journal.recover(str(path))
+    assert not result["complete"]
+    assert result["chunks"] == 2
+    np.testing.assert_array_equal(result["streams"]["real/states"]["time"], np.arange(8))
+
+
+def test_corrupt_frame_stops_reading(tmp_path):
+    path = tmp_path / "run.journal"
+    _write(path, 3)
+    content = bytearray(path.read_bytes())
+    # Flip a payload byte of the last chunk
+    content[-journal.FRAME.size - len(journal.END_STREAM) - 1] ^= 0xFF
+    path.write_bytes(bytes(content))
+
+    result = journal.recover(str(path))
+    assert not result["complete"]
+    assert result["chunks"] == 2
+
+
+def test_not_a_journal(tmp_path):
+    path = tmp_path / "run.journal"
+    path.write_bytes(b"nope")
+    with pytest.raises(ValueError):
+        journal.recover(str(path))
@@ -0,0 +1,30 @@
+# tests/test_plotting.py
+import os
+import pytest
+from ktune.core.utils.plotting import PlotService
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        PlotService("later")
+
+
+def test_none_and_inline_modes():
+    assert PlotService("none").submit(os.getpid).result() is None
+    assert PlotService("inline").submit(os.getpid).result() == os.getpid()
+
+
+def test_inline_failure_is_returned_as_the_future_exception():
+    future = PlotService("inline").submit(int, "not a number")
+    assert isinstance(future.exception(), ValueError)
+
+
+def test_deferred_renders_in_spawned_workers():
+    service = PlotService("deferred", workers=1)
+    try:
+        future = service.submit(os.getpid)
+        assert service.wait() == []
+        assert future.result() != os.getpid()
+        assert service._executor._mp_context.get_start_method() == "spawn"
+    finally:
+        service.shutdown()
@@ -0,0 +1,61 @@
+# tests/test_realtime.py
+import asyncio
+import gc
+import os
+import pytest
+from ktune.core.utils import realtime
+from ktune.core.utils.realtime import Realtime
+from ktune.core.utils.scheduler import Scheduler
+
+
+def test_gc_is_restored_after_nested_sections():
+    assert gc.isenabled()
+    with Realtime(enabled=True):
+        assert not gc.isenabled()
+        with Realtime(enabled=True):
+            assert not gc.isenabled()
+        # The outer section is still active
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+
+def test_disabled_section_changes_nothing():
+    with Realtime(enabled=False):
+        assert gc.isenabled()
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="needs sched_setaffinity")
+def test_failed_restore_does_not_mask_the_error(monkeypatch):
+    cpu = min(os.sched_getaffinity(0))
+    section = Realtime(enabled=True, cpu=cpu)
+    with pytest.raises(RuntimeError, match="test failed"):
+        with section:
+            def refuse(pid, cpus):
+                raise OSError("restore refused")
+            monkeypatch.setattr(realtime.os, "sched_setaffinity", refuse)
+            raise RuntimeError("test failed")
+    monkeypatch.undo()
+    assert gc.isenabled()
+
+
+def test_spin_yields_to_other_tasks():
+    async def run():
+        scheduler = Scheduler(100.0, spin=realtime.SPIN_WINDOW)
+        passes = 0
+
+        async def other():
+            nonlocal passes
+            while True:
+                passes += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(other())
+        scheduler.start()
+        for _ in range(20):
+            await scheduler.wait()
+        task.cancel()
+        return scheduler, passes
+
+    scheduler, passes = asyncio.run(run())
+    assert passes > 20
+    assert scheduler.stats()["ticks"] == 21
@@ -0,0 +1,105 @@
+# tests/test_recorder.py
+import numpy as np
+import pytest
+from ktune.core.utils.recorder import ColumnMap, Recorder
+
+FIELDS = [("time", "f8"), ("position", "f4")]
+
+
+def test_append_grows_and_keeps_rows():
+    recorder = Recorder(FIELDS, capacity=2)
+    for i in range(5):
+        recorder.append((0.01 * i, float(i)))
+    assert len(recorder) == 5
+    assert recorder["position"].dtype == np.float32
+    np.testing.assert_array_equal(recorder["position"], np.arange(5))
+    assert recorder.nbytes == 5 * 12
+
+
+def test_columns_are_views():
+    recorder = Recorder(FIELDS, capacity=4)
+    recorder.append((0.0, 1.0))
+    recorder["position"][0] = 7.0
+    assert recorder.view()["position"][0] == 7.0
+
+
+def test_claim_writes_in_place():
+    recorder = Recorder(FIELDS, capacity=1)
+    for i in range(3):
+        row = recorder.claim()
+        # Growing the array replaces the columns, so read them after claiming
+        time, position = recorder.columns
+        time[row] = 0.01 * i
+        position[row] = 2.0 * i
+    assert recorder.to_records() == [
+        {"time": 0.0, "position": 0.0},
+        {"time": 0.01, "position": 2.0},
+        {"time": 0.02, "position": 4.0},
+    ]
+
+
+def test_reserve_keeps_rows():
+    recorder = Recorder(FIELDS, capacity=1)
+    recorder.append((1.0, 2.0))
+    recorder.reserve(100)
+    assert len(recorder.columns[0]) == 100
+    assert recorder.to_records() == [{"time": 1.0, "position": 2.0}]
+
+
+def test_from_records_and_from_array():
+    records = [{"time": 0.0, "position": 1.5}, {"time": 0.1, "position": 2.5}]
+    recorder = Recorder.from_records(records)
+    assert recorder.dtype == np.dtype([("time", "f8"), ("position", "f8")])
+    assert recorder.to_records() == records
+
+    copy = Recorder.from_array(recorder.view())
+    copy["position"][0] = 0.0
+    assert recorder["position"][0] == 1.5
+    assert len(Recorder.from_records([])) == 0
+
+
+@pytest.mark.parametrize("claim", [False, True])
+def test_stream_in_chunks(claim):
+    chunks = []
+    recorder = Recorder(FIELDS, capacity=4)
+    recorder.stream_to(lambda rows: chunks.append(rows.copy()), chunk_rows=4)
+    for i in range(10):
+        if claim:
+            row = recorder.claim()
+            recorder.columns[0][row] = 0.01 * i
+            recorder.columns[1][row] = float(i)
+        else:
+            recorder.append((0.01 * i, float(i)))
+        # The latest sample stays readable
+        assert recorder["position"][-1] == i
+    # Memory holds one chunk at most
+    assert len(recorder) <= 5
+    recorder.detach()
+
+    # Every row is handed off once, in order
+    streamed = np.concatenate(chunks)
+    np.testing.assert_array_equal(streamed["position"], np.arange(10))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+
+
+def test_column_map():
+    states = Recorder(FIELDS)
+    commands = Recorder([("cmd_time", "f8"), ("cmd_pos", "f8")])
+    states.append((0.0, 1.0))
+    commands.append((0.0, 2.0))
+    data = ColumnMap({"states": states, "commands": commands}, aliases={"pos": "position"})
+
+    assert data["cmd_pos"][0] == 2.0
+    assert data["pos"][0] == 1.0
+    data["freq_response"] = {"freq": []}
+    assert "freq_response" in data
+    assert len(data) == 6
+    assert list(data) == ["time", "position", "cmd_time", "cmd_pos", "pos", "freq_response"]
+
+    # Writing a field writes the recorder
+    data["position"] = [5.0]
+    assert states["position"][0] == 5.0
+    assert data.to_dict() == {"time": [0.0], "position": [5.0], "cmd_time": [0.0],
+                              "cmd_pos": [2.0], "pos": [5.0], "freq_response": {"freq": []}}
+    del data["freq_response"]
+    assert "freq_response" not in data
@@ -0,0 +1,101 @@
+# tests/test_scheduler.py
+import asyncio
+import types
+import pytest
+from ktune.core.utils import scheduler as scheduler_module
+from ktune.core.utils.scheduler import Scheduler
+
+# Clock advance of one pass of a spin loop (asyncio.sleep(0))
+SPIN_PASS = 0.0005
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the test or a sleep moves it."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = 0
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps += 1
+        self.now += seconds if seconds > 0 else SPIN_PASS
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler_module, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(scheduler_module, "asyncio", types.SimpleNamespace(sleep=clock.sleep))
+    return clock
+
+
+def _run(scheduler, clock, body_times):
+    """Run one wait() per entry of body_times, after advancing the clock by it."""
+    async def loop():
+        scheduler.start()
+        for body in body_times:
+            clock.now += body
+            await scheduler.wait()
+    asyncio.run(loop())
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        Scheduler(0.0)
+
+
+def test_deadlines_do_not_drift(clock):
+    scheduler = Scheduler(100.0)
+    _run(scheduler, clock, [0.003] * 50)
+    assert scheduler.tick == 50
+    assert scheduler.elapsed() == pytest.approx(0.5)
+    assert scheduler.overruns == 0
+    latency = scheduler.latency_columns()
+    assert latency["sleep_requested"] == pytest.approx([0.007] * 50)
+    assert latency["lateness"] == pytest.approx([0.0] * 50)
+
+
+def test_late_tick_is_an_overrun_and_missed_deadlines_are_skipped(clock):
+    scheduler = Scheduler(100.0)
+    # The second body runs 25 ms: its deadline (20 ms) and the next one are missed
+    _run(scheduler, clock, [0.001, 0.025, 0.001])
+    assert scheduler.overruns == 1
+    assert scheduler.skipped_ticks == 1
+    assert scheduler.tick == 4
+    # Late by 15 ms, plus the yield to the event loop
+    assert scheduler.latency_columns()["lateness"][1] == pytest.approx(0.015 + SPIN_PASS)
+    # Back on the grid after the skip
+    assert scheduler.elapsed() == pytest.approx(0.04)
+
+
+def test_spin_yields_until_the_deadline(clock):
+    scheduler = Scheduler(100.0, spin=0.002)
+    _run(scheduler, clock, [0.001] * 10)
+    assert scheduler.overruns == 0
+    # One sleep up to the spin window, then one yield per spin pass
+    assert clock.sleeps == 10 * (1 + round(0.002 / SPIN_PASS))
+    assert scheduler.latency_columns()["lateness"] == pytest.approx([0.0] * 10, abs=1e-9)
+
+
+def test_remaining(clock):
+    scheduler = Scheduler(50.0)
+    scheduler.start()
+    clock.now += 0.005
+    assert scheduler.remaining() == pytest.approx(0.015)
+    assert scheduler.deadline() == 0.0
+
+
+def test_stats(clock):
+    scheduler = Scheduler(100.0)
+    scheduler.start()
+    assert scheduler.stats()["achieved_rate"] is None
+
+    _run(scheduler, clock, [0.002] * 20)
+    stats = scheduler.stats()
+    assert stats["ticks"] == 21
+    assert stats["achieved_rate"] == pytest.approx(100.0)
+    assert stats["jitter_ms"] == pytest.approx(0.0, abs=1e-6)
+    assert stats["overruns"] == 0
@@ -0,0 +1,64 @@
+# tests/test_step_metrics.py
+import numpy as np
+import pytest
+from ktune.core.utils import metrics
+from ktune.core.utils.datalog import DataLog
+
+TAU = 0.05
+RATE = 1000.0
+
+
+def _step_run(targets, hold=1.0):
+    """Command holding each target for hold seconds, and the exact response
+    of a first-order lag sampled at RATE."""
+    cmd_time = np.arange(0.0, hold * len(targets), 0.01)
+    cmd_pos = np.asarray(targets, dtype=float)[(cmd_time // hold).astype(int)]
+    t = np.arange(0.0, hold * len(targets), 1.0 / RATE)
+    position = np.full_like(t, cmd_pos[0])
+    step_time, _, target = metrics.step_transitions(cmd_time, cmd_pos)
+    for ts, goal in zip(step_time, target):
+        after = t >= ts
+        level = position[np.searchsorted(t, ts) - 1]
+        position[after] = goal + (level - goal) * np.exp(-(t[after] - ts) / TAU)
+    return cmd_time, cmd_pos, t, position
+
+
+def test_first_order_steps():
+    steps = metrics.compute_step_metrics(*_step_run([0.0, 10.0, -5.0]))
+    assert [(s["start"], s["target"]) for s in steps] == [(0.0, 10.0), (10.0, -5.0)]
+    for step in steps:
+        assert step["overshoot"] == pytest.approx(0.0, abs=1e-6)
+        assert step["rise_time"] == pytest.approx(TAU * np.log(9.0), abs=2.0 / RATE)
+        assert step["settling_time"] == pytest.approx(TAU * np.log(50.0), abs=2.0 / RATE)
+
+
+def test_overshoot_and_peak():
+    cmd_time, cmd_pos, t, position = _step_run([0.0, 10.0])
+    # 20% overshoot peaking 0.5 s after the step
+    bump = np.where(t >= 1.0, 2.0 * np.exp(-((t - 1.5) / 0.05) ** 2), 0.0)
+    step, = metrics.compute_step_metrics(cmd_time, cmd_pos, t, position + bump)
+    assert step["overshoot"] == pytest.approx(20.0, rel=0.01)
+    assert step["peak_time"] == pytest.approx(0.5, abs=2.0 / RATE)
+
+
+def test_unsettled_step():
+    cmd_time, cmd_pos, t, position = _step_run([0.0, 10.0])
+    # Stops short of the target
+    position = np.minimum(position, 5.0)
+    step, = metrics.compute_step_metrics(cmd_time, cmd_pos, t, position)
+    assert step["rise_time"] is None
+    assert step["settling_time"] is None
+
+
+def test_no_steps():
+    cmd_time, cmd_pos, t, position = _step_run([3.0])
+    assert metrics.compute_step_metrics(cmd_time, cmd_pos, t, position) == []
+
+
+def test_statistics_without_rise_or_settling():
+    step = {"overshoot": 0.0, "rise_time": None, "settling_time": None}
+    statistics = DataLog._compute_step_statistics(None, [step, step])
+    assert statistics["steps"] == 2
+    assert statistics["avg_overshoot"] == 0.0
+    assert statistics["avg_rise_time"] is None
+    assert statistics["avg_settling_time"] is None
@@ -0,0 +1,68 @@
+# tests/test_sweep.py
+import math
+import numpy as np
+import pytest
+from ktune.core.utils import metrics
+from ktune.core.utils.sweep import SweepMonitor
+
+TAU = 0.05
+INIT_FREQ, SWEEP_RATE, DURATION, RATE = 0.5, 1.0, 6.0, 1000.0
+
+
+def _first_order_chirp(monitor, amplitude=10.0, center=5.0):
+    """Feed a chirp through y' = (x - y) / TAU, sampled at RATE."""
+    dt = 1.0 / RATE
+    alpha = 1.0 - math.exp(-dt / TAU)
+    y = center
+    for n in range(int(DURATION * RATE)):
+        t = n * dt
+        x = center + amplitude * math.sin(monitor._angle(t))
+        monitor.update(t, t, [x], [y])
+        y += alpha * (x - y)
+    monitor.finish()
+
+
+def test_gain_and_phase_of_first_order_system():
+    monitor = SweepMonitor([11], INIT_FREQ, SWEEP_RATE, center=5.0)
+    _first_order_chirp(monitor)
+    response = monitor.response()
+    assert response["estimator"] == "sweep"
+    freq = np.array(response["freq"])
+    assert len(freq) > 5 and np.all(np.diff(freq) > 0)
+    expected = 1.0 / (1.0 + 2j * np.pi * freq * TAU)
+    gain_db = 20 * np.log10(response["magnitude"])
+    assert np.allclose(gain_db, 20 * np.log10(np.abs(expected)), atol=0.5)
+    # The discrete system lags by about half a sample more than the continuous one
+    assert np.allclose(response["phase"], np.degrees(np.angle(expected)), atol=5.0)
+
+
+def test_limits_stop_the_sweep():
+    monitor = SweepMonitor([11], INIT_FREQ, SWEEP_RATE, center=5.0, max_lag=30.0)
+    _first_order_chirp(monitor)
+    assert monitor.stopped is not None and "phase lag" in monitor.stopped
+    # tan(30°) / (2π TAU): where the first-order lag passes 30°
+    assert monitor.freq[-1] >= math.tan(math.radians(30.0)) / (2 * math.pi * TAU) - 0.5
+
+
+def test_skipped_joint_has_no_response():
+    monitor = SweepMonitor([11, 12], INIT_FREQ, SWEEP_RATE)
+    for n in range(4000):
+        t = n / RATE
+        x = math.sin(monitor._angle(t))
+        monitor.update(t, t, [x, x], [x, math.nan])
+    monitor.finish()
+    assert len(monitor.response(0)["freq"]) > 0
+    assert monitor.response(1)["freq"] == []
+
+
+def test_cycles_must_be_positive():
+    with pytest.raises(ValueError):
+        SweepMonitor([11], INIT_FREQ, SWEEP_RATE, cycles=0)
+
+
+def test_bandwidth_of_array_response():
+    # Binary logs load responses as arrays
+    freq = np.arange(1.0, 21.0)
+    assert metrics.compute_bandwidth(freq, np.ones(20)) is None
+    magnitude = np.where(freq < 8.0, 1.0, 0.5)
+    assert metrics.compute_bandwidth(freq, magnitude) == 8.0
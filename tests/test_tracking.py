@@ -0,0 +1,80 @@
+# tests/test_tracking.py
+import math
+import numpy as np
+import pytest
+from ktune.core.utils import metrics
+from ktune.core.utils.tracking import RunningStats, TrackingMonitor
+
+
+def test_running_stats_match_numpy():
+    rng = np.random.default_rng(1)
+    # Large offset, small spread: where a naive sum of squares loses precision
+    errors = 1e6 + rng.standard_normal(10000)
+    stats = RunningStats()
+    for error in errors:
+        stats.update(float(error))
+
+    assert stats.count == len(errors)
+    assert stats.mean == pytest.approx(np.mean(errors), rel=1e-12)
+    assert math.sqrt(stats.m2 / stats.count) == pytest.approx(np.std(errors), rel=1e-6)
+    assert stats.summary() == pytest.approx(metrics.error_statistics(errors), rel=1e-6)
+
+
+def test_running_stats_empty():
+    stats = RunningStats()
+    assert stats.summary() == {}
+    assert math.isnan(stats.rms)
+
+
+def test_monitor_matches_batch_metrics():
+    rng = np.random.default_rng(2)
+    t = np.arange(0.0, 3.0, 0.01)
+    position = rng.standard_normal((len(t), 2))
+    velocity = rng.standard_normal((len(t), 2))
+    monitor = TrackingMonitor([11, 12], cycle=1.0)
+    for k in range(len(t)):
+        monitor.update(t[k], position[k].tolist(), velocity[k].tolist())
+
+    for joint in range(2):
+        summary = monitor.summary(joint)
+        expected = metrics.error_statistics(position[:, joint])
+        for key, value in expected.items():
+            assert summary["position"][key] == pytest.approx(value)
+        assert summary["velocity"]["std_error"] == pytest.approx(np.std(velocity[:, joint]))
+        # Two cycles closed; the third is still open
+        last_cycle = position[(t >= 1.0) & (t < 2.0), joint]
+        assert summary["position"]["cycle_rms_error"] == pytest.approx(
+            np.sqrt(np.mean(last_cycle ** 2)))
+    assert monitor.cycles == 2
+
+
+def test_nan_errors_are_skipped():
+    monitor = TrackingMonitor([11, 12])
+    monitor.update(0.0, [1.0, math.nan], [math.nan, math.nan])
+    assert monitor.position[0].count == 1
+    assert monitor.position[1].count == 0
+    assert monitor.summary(1) == {}
+    assert "velocity" not in monitor.summary(0)
+
+
+def test_divergence_is_reported_once_per_run():
+    monitor = TrackingMonitor([11], cycle=1.0, abort_error=2.0)
+    for k in range(100):
+        monitor.update(0.01 * k, [1.0], [0.0])
+    assert monitor.diverged is None
+    for k in range(100, 300):
+        monitor.update(0.01 * k, [3.0], [0.0])
+    assert monitor.diverged.startswith("actuator 11 cycle RMS error 3.00°")
+    assert "cycle 2 " in monitor.diverged
+
+
+def test_cycles_without_samples_are_skipped():
+    monitor = TrackingMonitor([11], cycle=1.0)
+    monitor.update(0.0, [1.0], [0.0])
+    monitor.update(3.5, [2.0], [0.0])
+    assert monitor.cycles == 1
+    assert monitor.cycle_rms[0] == 1.0
+    # The current cycle runs from 3.0 to 4.0
+    monitor.update(4.0, [2.0], [0.0])
+    assert monitor.cycles == 2
+    assert monitor.cycle_rms[0] == 2.0
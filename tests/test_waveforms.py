@@ -0,0 +1,74 @@
+# tests/test_waveforms.py
+import numpy as np
+import pytest
+from ktune.core.utils import waveforms
+
+RATE = 1000.0
+
+
+def _derivative(waveform):
+    return np.gradient(waveform.position, waveform.time)
+
+
+def test_time_grid_includes_both_ends():
+    t = waveforms.time_grid(0.3, 10.0)
+    # 0.3 * 10 is just below 3 in floating point
+    np.testing.assert_allclose(t, [0.0, 0.1, 0.2, 0.3])
+    assert len(waveforms.time_grid(1.0, 100.0)) == 101
+
+
+def test_sine():
+    waveform = waveforms.compile_sine(5.0, 2.0, 1.0, RATE, start_pos=10.0, phase=90.0)
+    t = waveform.time
+    np.testing.assert_allclose(waveform.position, 10.0 + 5.0 * np.cos(4.0 * np.pi * t), atol=1e-9)
+    np.testing.assert_allclose(waveform.velocity[1:-1], _derivative(waveform)[1:-1], rtol=1e-3, atol=0.05)
+
+
+def test_chirp_velocity_is_the_derivative():
+    waveform = waveforms.compile_chirp(5.0, 1.0, 4.0, 2.0, RATE)
+    assert waveform.position[0] == pytest.approx(0.0)
+    np.testing.assert_allclose(waveform.velocity[1:-1], _derivative(waveform)[1:-1], atol=0.5)
+
+
+def test_sin_sin_without_reset():
+    params = {"freq1": 1.0, "freq2": 3.0, "amp1": 4.0, "amp2": 2.0}
+    waveform = waveforms.compile_sin_sin([params], 2.0, RATE, start_pos=-5.0)
+    t = waveform.time
+    expected = 4.0 * np.sin(2 * np.pi * t) + 2.0 * np.sin(6 * np.pi * t) - 5.0
+    np.testing.assert_allclose(waveform.position, expected, atol=1e-9)
+
+
+def test_sin_sin_blends_between_parameter_sets():
+    first = {"freq1": 1.0, "freq2": 2.0, "amp1": 4.0, "amp2": 0.0}
+    second = {"freq1": 1.0, "freq2": 2.0, "amp1": 8.0, "amp2": 0.0}
+    waveform = waveforms.compile_sin_sin([first, second], 6.0, RATE,
+                                         reset_interval=2.0, transition_time=1.0)
+    t = waveform.time
+    before = t < 2.0
+    after = t >= 3.0
+    np.testing.assert_allclose(waveform.position[before], 4.0 * np.sin(2 * np.pi * t[before]), atol=1e-9)
+    np.testing.assert_allclose(waveform.position[after], 8.0 * np.sin(2 * np.pi * t[after]), atol=1e-9)
+    # Smooth step 3p^2 - 2p^3 of the amplitude, at sine peaks inside the transition
+    for time, progress, sign in ((2.25, 0.25, 1.0), (2.75, 0.75, -1.0)):
+        blend = progress * progress * (3 - 2 * progress)
+        k = int(round(time * RATE))
+        assert waveform.position[k] == pytest.approx(sign * (4.0 + 4.0 * blend))
+
+
+def test_steps():
+    waveform = waveforms.compile_steps([(5.0, 0.0, 0.5), (-5.0, 0.0, 0.5)], 100.0, start_pos=1.0)
+    assert len(waveform) == 101
+    assert np.all(waveform.position[:51] == 6.0)
+    assert np.all(waveform.position[51:] == -4.0)
+    assert not waveform.velocity.any()
+
+
+def test_scaled_and_to_dict():
+    waveform = waveforms.compile_sine(2.0, 1.0, 1.0, 10.0, start_pos=3.0)
+    scaled = waveform.scaled(0.5, center=3.0)
+    np.testing.assert_allclose(scaled.position - 3.0, 0.5 * (waveform.position - 3.0), atol=1e-12)
+    np.testing.assert_allclose(scaled.velocity, 0.5 * waveform.velocity)
+
+    data = scaled.to_dict()
+    assert set(data) == {"time", "position", "velocity"}
+    assert isinstance(data["position"], list) and len(data["position"]) == len(waveform)